@@ -12,12 +12,17 @@ import argparse
 import os
 import importlib
 import inspect
+from datetime import datetime
 from typing import Dict, Type, List
 
 from vida.definiciones import *
 from vida.petri import Petri
 from vida.microorganismo import Microorganismo
 from vida.ranking import RankingSystem
+from vida.terminacion import ReglaDominancia, ReglaEstancamiento, ReglaLimite
+from vida.dinamica import Rebrote, Difusion, Decaimiento
+from vida.distribuciones import registro_distribuciones
+
 
 def obtener_clases_mo() -> Dict[int, Type[Microorganismo]]:
     """Descubre dinámicamente las clases de microorganismos en la carpeta mos"""
@@ -65,28 +70,146 @@ def main():
     epilog='''
 Ejemplos:
   python comvida.py --listar-mos
+  python comvida.py --listar-distribuciones
   python comvida.py --distribucion 4 --colonias 3 4
   python comvida.py --distribucion 1 --colonias 2 1
+  python comvida.py --distribucion 5 --colonias 0 1 2 3 4 5 6 7
   python comvida.py --actualizar-global global_ranking.txt
+  python comvida.py --torneo 200 --colonias 0 1 6 7
+  python comvida.py --lote partidas.txt --max-pasos 2000
+  python comvida.py --radio 500 --paralelo 4 --colonias 1 6 7 --sin-grafico
+  python comvida.py --aislar --limite-cpu 60 --colonias 6 7
+  python comvida.py --radio 200 --colonias 1 6 7 --sin-grafico --guardar partida.npz --guardar-cada 500
+  python comvida.py --reanudar partida.npz --sin-grafico
+  python comvida.py --reanudar partida.npz --bifurcar 32 --max-pasos 3000
+  python comvida.py --coordinar liga.db --semillas 4 --procesos 8 --max-pasos 3000
+  python comvida.py --trabajar liga.db
+  python comvida.py --colonias 1 6 7 --espectadores --grabar partida.vida
+  python comvida.py --repetir partida.vida --pasos-por-segundo 60
     '''
     )
     
-    parser.add_argument('--distribucion', '-d', dest='distribucion', type=int, default=MAX_DNUTRI,
-                       help=f'Distribución de nutrientes, entre 1 y {MAX_DNUTRI}')
+    parser.add_argument('--distribucion', '-d', dest='distribucion', type=int, default=None,
+                       help=f'Distribución de nutrientes, 1 a {MAX_DNUTRI} o una de distribuciones/ (por omisión {MAX_DNUTRI})')
     parser.add_argument('--colonias', '-c', dest='colonias', type=int, nargs='+',
                        help='Lista de microorganismos (números separados por espacios)')
     parser.add_argument('--listar-mos', dest='listar_mos', action='store_true',
                        help='Listar todos los microorganismos disponibles y salir')
+    parser.add_argument('--listar-distribuciones', dest='listar_distribuciones', action='store_true',
+                       help='Listar todas las distribuciones de nutrientes disponibles y salir')
     parser.add_argument('--actualizar-global', dest='actualizar_global', type=str, metavar='ARCHIVO_RANKING_GLOBAL',
                        help='Actualizar el archivo de ranking global con todos los resultados disponibles')
     parser.add_argument('--sin-grafico', '--sin-graficos', dest='sin_grafico', action='store_true',
                        help='Ejecutar la simulación en modo sin gráficos (headless)')
+    parser.add_argument('--terminal', dest='terminal', action='store_true',
+                       help='Mostrar la competencia en la terminal (colores ANSI, sin matplotlib; sirve por SSH)')
+    parser.add_argument('--fps', dest='fps', type=float, default=20.0, metavar='N',
+                       help='Con --terminal: cuadros por segundo como máximo (por omisión 20)')
+    parser.add_argument('--densidad', dest='densidad', action='store_true',
+                       help='Dibujar el plato como un mapa de densidad de cada colonia en lugar de un punto por MO')
+    parser.add_argument('--max-pixeles', dest='max_pixeles', type=int, default=400, metavar='N',
+                       help='Con --densidad: píxeles por lado del plato; los platos más grandes se promedian por bloques (0: sin reducir)')
+    parser.add_argument('--espectadores', dest='espectadores', type=str, nargs='?', const='',
+                       metavar='HOST:PUERTO',
+                       help='Transmitir la competencia a navegadores en http://HOST:PUERTO/ (por omisión 127.0.0.1:8765)')
+    parser.add_argument('--pasos-por-segundo', dest='pasos_por_segundo', type=float, default=30.0, metavar='N',
+                       help='Con --espectadores o --repetir: pasos de tiempo por segundo (por omisión 30; 0: sin pausa)')
+    parser.add_argument('--grabar', dest='grabar', type=str, metavar='ARCHIVO',
+                       help='Con --espectadores: grabar la transmisión en ARCHIVO para verla después con --repetir')
+    parser.add_argument('--repetir', dest='repetir', type=str, metavar='ARCHIVO',
+                       help='Volver a transmitir a los espectadores la partida grabada en ARCHIVO y salir')
+    parser.add_argument('--radio', '-r', dest='radio', type=int, default=R,
+                       help=f'Radio del plato de Petri en celdas (por omisión {R})')
+    parser.add_argument('--paralelo', dest='paralelo', type=int, metavar='N',
+                       help='Simular el plato en N procesos (franjas verticales), para platos grandes')
+    parser.add_argument('--aislar', dest='aislar', action='store_true',
+                       help='Ejecutar el código de cada colonia en un proceso aislado, con límites de tiempo, CPU y memoria')
+    parser.add_argument('--limite-cpu', dest='limite_cpu', type=float, metavar='S',
+                       help='Con --aislar: segundos de CPU de cada colonia en toda la competencia')
+    parser.add_argument('--limite-memoria', dest='limite_memoria', type=int, default=1024, metavar='MB',
+                       help='Con --aislar: memoria máxima del proceso de cada colonia (por omisión 1024 MB)')
+    parser.add_argument('--instrumentar', dest='instrumentar', action='store_true',
+                       help='Medir el tiempo de cada fase del motor y los eventos de cada colonia (resumen y traza en resultados/)')
+    parser.add_argument('--perfilar-colonia', dest='perfilar_colonia', type=int, metavar='N',
+                       help='Perfilar (cProfile y tracemalloc) las decisiones de los MOs de la N-ésima colonia de --colonias')
+    parser.add_argument('--reciclar-mos', dest='reciclar_mos', type=int, nargs='?', const=1000, metavar='N',
+                       help='Reciclar los MOs muertos en los nacimientos (hasta N guardados por colonia, por omisión 1000)')
+    parser.add_argument('--torneo', dest='torneo', type=int, metavar='PRESUPUESTO',
+                       help='Jugar una liga adaptativa de a lo sumo PRESUPUESTO partidas entre las --colonias (o todas)')
+    parser.add_argument('--lote', dest='lote', type=str, metavar='ARCHIVO',
+                       help='Jugar en un mismo proceso las partidas de ARCHIVO (una por línea: distribución y colonias)')
+    parser.add_argument('--sin-cache', dest='sin_cache', action='store_true',
+                       help='Con --torneo o --coordinar: simular todas las partidas, sin usar los resultados guardados en resultados/cache_partidas')
+    parser.add_argument('--coordinar', dest='coordinar', type=str, metavar='COLA',
+                       help='Poner en la cola COLA (SQLite) la liga de las --colonias (o todas) y registrar los resultados de los trabajadores')
+    parser.add_argument('--trabajar', dest='trabajar', type=str, metavar='COLA',
+                       help='Jugar partidas de la cola COLA (archivo SQLite o HOST:PUERTO) hasta que termine')
+    parser.add_argument('--semillas', dest='semillas', type=int, default=4, metavar='N',
+                       help='Con --coordinar: partidas de cada pareja en cada distribución (por omisión 4)')
+    parser.add_argument('--procesos', dest='procesos', type=int, metavar='N',
+                       help='Trabajadores locales de --coordinar (por omisión uno por núcleo) o de --trabajar (por omisión 1)')
+    parser.add_argument('--escuchar', dest='escuchar', type=str, metavar='HOST:PUERTO',
+                       help='Con --coordinar: servir la cola por TCP para trabajadores de otros equipos (clave en COMVIDA_CLAVE)')
+    parser.add_argument('--plazo', dest='plazo', type=float, default=300.0, metavar='S',
+                       help='Segundos sin noticias de un trabajador antes de devolver su partida a la cola (por omisión 300)')
+    parser.add_argument('--confianza', dest='confianza', type=float, default=0.95,
+                       help='Nivel de confianza para dar por decidida una pareja en --torneo (por omisión 0.95)')
+    parser.add_argument('--dominancia', dest='dominancia', type=float, nargs=2, metavar=('RAZON', 'PASOS'),
+                       help='Terminar cuando la colonia líder supera RAZON veces en población a la segunda durante PASOS pasos')
+    parser.add_argument('--estancamiento', dest='estancamiento', type=int, metavar='VENTANA',
+                       help='Terminar cuando poblaciones y energías no cambian (más de 1%%) durante VENTANA pasos')
+    parser.add_argument('--max-pasos', dest='max_pasos', type=int, metavar='N',
+                       help='Terminar la competencia después de N pasos de tiempo')
+    parser.add_argument('--max-segundos', dest='max_segundos', type=float, metavar='S',
+                       help='Terminar la competencia después de S segundos de reloj')
+    parser.add_argument('--rebrote', dest='rebrote', type=float, metavar='TASA',
+                       help='Los nutrientes recuperan en cada paso una fracción TASA de lo que les falta para la distribución inicial')
+    parser.add_argument('--difusion', dest='difusion', type=float, metavar='COEF',
+                       help='Los nutrientes difunden a las celdas vecinas con coeficiente COEF (hasta 0.25)')
+    parser.add_argument('--decaimiento', dest='decaimiento', type=float, metavar='TASA',
+                       help='Los nutrientes pierden una fracción TASA en cada paso')
+    parser.add_argument('--guardar', dest='guardar', type=str, metavar='ARCHIVO',
+                       help='Guardar un punto de control de la partida en ARCHIVO (.npz) cada --guardar-cada pasos')
+    parser.add_argument('--guardar-cada', dest='guardar_cada', type=int, default=500, metavar='N',
+                       help='Pasos de tiempo entre puntos de control (por omisión 500)')
+    parser.add_argument('--reanudar', dest='reanudar', type=str, metavar='ARCHIVO',
+                       help='Reanudar la partida guardada en ARCHIVO con --guardar (colonias y distribución salen del archivo)')
+    parser.add_argument('--bifurcar', dest='bifurcar', type=int, metavar='K',
+                       help='Con --reanudar: jugar K continuaciones con distintas semillas en paralelo y resumir sus resultados')
+    parser.add_argument('--verificar', dest='verificar', action='store_true',
+                       help='Con --bifurcar: comprobar antes que continuar el punto de control reproduce la partida original')
+    parser.add_argument('--dinamica-cada', dest='dinamica_cada', type=int, default=1, metavar='K',
+                       help='Aplicar --rebrote, --difusion y --decaimiento cada K pasos (por omisión 1)')
     
     args = parser.parse_args()
     
-    # Descubrir las clases de microorganismos disponibles
+    # Reglas de terminación anticipada
+    reglas = []
+    if args.dominancia:
+        reglas.append(ReglaDominancia(args.dominancia[0], int(args.dominancia[1])))
+    if args.estancamiento:
+        reglas.append(ReglaEstancamiento(args.estancamiento))
+    if args.max_pasos or args.max_segundos:
+        reglas.append(ReglaLimite(args.max_pasos, args.max_segundos))
+
+    # Dinámica de los nutrientes
+    dinamicas = []
+    try:
+        if args.rebrote:
+            dinamicas.append(Rebrote(args.rebrote, cada=args.dinamica_cada))
+        if args.difusion:
+            dinamicas.append(Difusion(args.difusion, cada=args.dinamica_cada))
+        if args.decaimiento:
+            dinamicas.append(Decaimiento(args.decaimiento, cada=args.dinamica_cada))
+    except ValueError as e:
+        print(f"\nError: {e}")
+        return 1
+
+    # Descubrir las clases de microorganismos y las distribuciones disponibles
     clases_mo = obtener_clases_mo()
     max_cols = len(clases_mo) - 1  # 0-indexed
+    registro = registro_distribuciones()
+    max_dist = registro.maximo()
     
     # Listar microorganismos y salir
     if args.listar_mos:
@@ -95,56 +218,306 @@ Ejemplos:
             instance = cls()
             print(f"  {i}: {instance.nombre()} por {instance.autor()}")
         return 0
+
+    # Listar distribuciones y salir
+    if args.listar_distribuciones:
+        print("Distribuciones de nutrientes disponibles:")
+        for linea in registro.listar():
+            print(f"  {linea}")
+        return 0
     
     # Actualizar ranking global y salir
     if args.actualizar_global:
         ranking_system = RankingSystem()
         return ranking_system.update_global_ranking(args.actualizar_global)
 
-    # Validar que se definan las colonias a competir
-    if not args.colonias:
+    # Jugar una liga adaptativa y salir
+    if args.torneo is not None:
+        from vida.torneo import PlanificadorTorneo
+        participantes = args.colonias if args.colonias else sorted(clases_mo)
+        if any(col not in clases_mo for col in participantes) or len(set(participantes)) != len(participantes) \
+                or len(participantes) < 2 or args.torneo < 1 or not 0 < args.confianza < 1 \
+                or (args.distribucion is not None and args.distribucion not in registro.distribuciones):
+            print("\nError: hay parámetros inválidos")
+            print("Se requieren al menos 2 organismos distintos, un presupuesto de al menos 1 partida, --confianza "
+                  "entre 0 y 1 (sin incluirlos) y una distribución de --listar-distribuciones. "
+                  f"Microorganismos disponibles: 0-{max_cols}")
+            return 1
+        # Sin --distribucion se alternan todas las distribuciones registradas
+        distribuciones = sorted(registro.distribuciones) if args.distribucion is None else [args.distribucion]
+        from vida.cache_resultados import CacheResultados
+        cache = None if args.sin_cache else CacheResultados()
+        planificador = PlanificadorTorneo(clases_mo, participantes, distribuciones, args.torneo,
+                                          confianza=args.confianza, ranking=RankingSystem(), reglas=reglas,
+                                          dinamicas=dinamicas, cache=cache)
+        planificador.ejecutar()
+        print(planificador.informe())
+        return 0
+
+    # Torneo distribuido: coordinador y trabajadores
+    if args.coordinar:
+        from vida.cola import ColaTrabajos, servir
+        from vida.coordinacion import Coordinador, lanzar_trabajadores
+        from vida.cache_resultados import CacheResultados
+        participantes = args.colonias if args.colonias else sorted(clases_mo)
+        if any(col not in clases_mo for col in participantes) or len(set(participantes)) != len(participantes) \
+                or len(participantes) < 2 or args.semillas < 1 \
+                or (args.distribucion is not None and args.distribucion not in registro.distribuciones):
+            print("\nError: hay parámetros inválidos")
+            print("Se requieren al menos 2 organismos distintos, --semillas >= 1 y una distribución de "
+                  f"--listar-distribuciones. Microorganismos disponibles: 0-{max_cols}")
+            return 1
+        distribuciones = sorted(registro.distribuciones) if args.distribucion is None else [args.distribucion]
+        cola = ColaTrabajos(args.coordinar, plazo=args.plazo)
+        coordinador = Coordinador(cola, clases_mo, radio=args.radio, reglas=reglas, dinamicas=dinamicas,
+                                  ranking=RankingSystem(), cache=None if args.sin_cache else CacheResultados())
+        nuevas = coordinador.encolar(participantes, distribuciones, args.semillas)
+        print(f"Cola {args.coordinar}: {nuevas} partidas nuevas, {sum(cola.resumen().values())} en total")
+        try:
+            if args.escuchar:
+                servir(cola, args.escuchar)
+                print(f"Cola servida en {args.escuchar}")
+        except (OSError, ValueError) as e:
+            print(f"\nError: no se pudo servir la cola: {e}")
+            return 1
+        procesos = os.cpu_count() if args.procesos is None else args.procesos
+        trabajadores = lanzar_trabajadores(args.coordinar, clases_mo, procesos)
+        if procesos:
+            print(f"{procesos} trabajadores locales")
+        coordinador.esperar()
+        for trabajador in trabajadores:
+            trabajador.join()
+        for id, colonias, error in cola.fallidos():
+            print(f"Partida {id} ({' vs '.join(colonias)}) fallida: {error.strip().splitlines()[-1] if error else ''}")
+        print(f"Resultados registrados: {coordinador.registrados}")
+        return 0
+
+    if args.trabajar:
+        from vida.coordinacion import trabajar, lanzar_trabajadores
+        try:
+            if args.procesos and args.procesos > 1:
+                for trabajador in lanzar_trabajadores(args.trabajar, clases_mo, args.procesos):
+                    trabajador.join()
+            else:
+                print(f"Partidas jugadas: {trabajar(args.trabajar, clases_mo)}")
+        except (OSError, ValueError) as e:
+            print(f"\nError: no se pudo abrir la cola: {e}")
+            return 1
+        return 0
+
+    # Jugar las partidas de un archivo de lote y salir
+    if args.lote:
+        from vida.lote import CorredorLote, leer_lote
+        try:
+            partidas = leer_lote(args.lote, len(clases_mo), registro.distribuciones)
+        except (OSError, ValueError) as e:
+            print(f"\nError: no se pudo leer el lote: {e}")
+            return 1
+        if args.paralelo or args.aislar or args.instrumentar or args.perfilar_colonia is not None:
+            print("Advertencia: --lote usa el motor secuencial sin instrumentación ni perfilado")
+        print(f"Lote de {len(partidas)} partidas ({args.lote})...")
+        corredor = CorredorLote(clases_mo, radio=args.radio, ranking=RankingSystem(), reglas=reglas,
+                                dinamicas=dinamicas)
+        corredor.ejecutar(partidas)
+        return 0
+
+    # Jugar continuaciones de una partida guardada y salir
+    if args.bifurcar:
+        from vida.bifurcacion import Bifurcador
+        if not args.reanudar or args.bifurcar < 1:
+            print("\nError: --bifurcar K requiere K >= 1 y el punto de control de --reanudar")
+            return 1
+        try:
+            bifurcador = Bifurcador(args.reanudar, clases_mo, reglas=reglas)
+        except (OSError, ValueError) as e:
+            print(f"\nError: no se pudo leer el punto de control: {e}")
+            return 1
+        if args.verificar:
+            print(f"Verificando las continuaciones desde el paso {bifurcador.desde}...")
+            diferencias = bifurcador.verificar()
+            if diferencias:
+                print("\nError: las continuaciones no reproducen la partida original:")
+                for diferencia in diferencias:
+                    print(f"  {diferencia}")
+                return 1
+            print("Las continuaciones reproducen la partida original")
+        print(f"{args.bifurcar} continuaciones desde el paso {bifurcador.desde} "
+              f"({min(bifurcador.procesos, args.bifurcar)} procesos)...")
+        resultados = bifurcador.ejecutar(range(1, args.bifurcar + 1))
+        print(bifurcador.informe(resultados))
+        return 0
+
+    # Volver a transmitir una partida grabada y salir
+    if args.repetir:
+        from vida.espectadores import DIRECCION, leer_grabacion, repeticion, servir
+        try:
+            info, estados = leer_grabacion(args.repetir)
+        except (OSError, ValueError) as e:
+            print(f"\nError: no se pudo leer la grabación: {e}")
+            return 1
+        print(f"Repitiendo {args.repetir}: {' vs '.join(info['nombres'])}")
+        servir(args.espectadores or DIRECCION, info, repeticion(estados, args.pasos_por_segundo))
+        return 0
+
+    if args.distribucion is None:
+        args.distribucion = MAX_DNUTRI
+
+    # Los puntos de control son sólo del motor secuencial
+    if (args.guardar or args.reanudar) and (args.paralelo or args.aislar):
+        print("\nError: --guardar y --reanudar no se pueden usar con --paralelo ni con --aislar")
+        return 1
+    if args.guardar_cada < 1:
+        print("\nError: --guardar-cada debe ser al menos 1")
+        return 1
+
+    # Validar que se definan las colonias a competir (al reanudar salen del punto de control)
+    if not args.colonias and not args.reanudar:
         print("\nError: --colonias es necesario para iniciar la competencia")
-        print(f"Uso: {sys.argv[0]} --distribucion <1-{MAX_DNUTRI}> --colonias <organismo1_ID> <organismo2_ID>")
+        print(f"Uso: {sys.argv[0]} --distribucion <1-{max_dist}> --colonias <organismo1_ID> <organismo2_ID> [...]")
         print(f"Microorganismos disponibles: 0-{max_cols}")
         print("Puede usar --listar-mos para ver todos los microorganismos disponibles.")
         return 1
     
     # Verificar parámetros de entrada para la competencia simple
     error = False
-    if args.distribucion > MAX_DNUTRI or len(args.colonias) != 2:
+    if not args.reanudar:
+        # Las colonias se identifican por su MO en el ranking y en los informes: no se repiten
+        if args.distribucion not in registro.distribuciones \
+                or not 2 <= len(args.colonias) <= MAX_COLS or len(set(args.colonias)) != len(args.colonias):
+            error = True
+        else:
+            for col in args.colonias:
+                if col > max_cols:
+                    error = True
+                    break
+    # (al reanudar, las colonias salen del punto de control: se verifica después de leerlo)
+    if args.perfilar_colonia is not None and not args.reanudar \
+            and not 1 <= args.perfilar_colonia <= len(args.colonias):
         error = True
-    else:
-        for col in args.colonias:
-            if col > max_cols:
-                error = True
-                break
     if error:
         print("\nError: hay parámetros inválidos")
-        print(f"Uso: {sys.argv[0]} --distribucion <1-{MAX_DNUTRI}> --colonias <organismo1_ID> <organismo2_ID>")
-        print(f"Se requieren exactamente 2 organismos. Microorganismos disponibles: 0-{max_cols}")
+        print(f"Uso: {sys.argv[0]} --distribucion <1-{max_dist}> --colonias <organismo1_ID> <organismo2_ID> [...]")
+        print(f"Se requieren entre 2 y {MAX_COLS} organismos distintos. Microorganismos disponibles: 0-{max_cols}")
         print("Use --listar-mos para ver todos los microorganismos disponibles.")
         return 1
     
     # Ejecutar la simulación
     petri = None
     graficadora = None
+    guardado = None
     try:
         # Crear cápsula de Petri con colonias seleccionadas
-        petri = Petri(R, args.distribucion, args.colonias, clases_mo)
+        if args.aislar:
+            from vida.aislamiento import PetriAislado
+            petri = PetriAislado(args.radio, args.distribucion, args.colonias, clases_mo,
+                                 limite_cpu=args.limite_cpu, limite_memoria=args.limite_memoria)
+        elif args.paralelo:
+            from vida.paralelo import PetriParalelo
+            petri = PetriParalelo(args.radio, args.distribucion, args.colonias, clases_mo,
+                                  n_franjas=args.paralelo)
+        elif args.reanudar:
+            petri = Petri.reanudar(args.reanudar, clases_mo)
+            print(f"Partida reanudada en el paso {petri.tiempo} desde {args.reanudar}")
+            if args.perfilar_colonia is not None and not 1 <= args.perfilar_colonia <= len(petri.colonias):
+                print(f"\nError: --perfilar-colonia debe estar entre 1 y {len(petri.colonias)} "
+                      f"(colonias del punto de control)")
+                return 1
+        else:
+            petri = Petri(args.radio, args.distribucion, args.colonias, clases_mo)
+        # Al reanudar se mantienen las dinámicas guardadas, salvo que se indiquen otras
+        if dinamicas or not args.reanudar:
+            petri.definir_dinamicas(dinamicas)
+
+        # Puntos de control periódicos (se escriben en segundo plano)
+        if args.guardar:
+            from vida.guardado import GuardadoPeriodico
+            guardado = GuardadoPeriodico(args.guardar, args.guardar_cada)
+            petri.puntos_de_control(guardado)
+
+        # Instrumentación opcional del motor secuencial
+        instr = None
+        if args.instrumentar:
+            if args.paralelo or args.aislar:
+                print("Advertencia: --instrumentar sólo mide el motor secuencial")
+            else:
+                from vida.instrumentacion import Instrumentacion
+                instr = Instrumentacion(len(petri.colonias))
+                petri.instrumentar(instr)
+
+        # Reserva de MOs muertos para los nacimientos
+        if args.reciclar_mos:
+            if args.paralelo or args.aislar:
+                print("Advertencia: --reciclar-mos sólo funciona con el motor secuencial")
+            else:
+                petri.reciclar_mos(args.reciclar_mos)
+
+        # Perfilado opcional de una colonia
+        perfilador = None
+        if args.perfilar_colonia is not None:
+            if args.paralelo or args.aislar:
+                print("Advertencia: --perfilar-colonia sólo funciona con el motor secuencial")
+            else:
+                perfilador = petri.perfilar_colonia(args.perfilar_colonia)
+
+        if args.grabar and args.espectadores is None:
+            print("Advertencia: --grabar sólo graba transmisiones de --espectadores")
 
         # Definir el backend de matplotlib para el modo sin gráficos antes de importar Graficadora
-        if args.sin_grafico:
+        if args.sin_grafico and not args.terminal:
             import matplotlib
             matplotlib.use('Agg')
 
-        # Crear y ejecutar visualización (modo headless)
-        from vida.graficacion import Graficadora
-        graficadora = Graficadora(headless=args.sin_grafico)
-        graficadora.crear_ventanas(petri)
+        # Crear y ejecutar visualización (modo headless, o en la terminal sin matplotlib)
+        if args.espectadores is not None:
+            # La partida corre en otro hilo mientras el servidor atiende a los navegadores
+            from vida.espectadores import DIRECCION, Transmision, info_partida, servir
+            graficadora = Transmision(reglas=reglas, pasos_por_segundo=args.pasos_por_segundo)
+
+            def producir(emisor):
+                graficadora.emisor = emisor
+                graficadora.crear_ventanas(petri)
+
+            servir(args.espectadores or DIRECCION, info_partida(petri), producir, grabar=args.grabar)
+            if not graficadora.iniciado:
+                print("La transmisión no llegó a empezar")
+                return 1
+        elif args.terminal:
+            from vida.terminal import VisorTerminal
+            graficadora = VisorTerminal(reglas=reglas, fps=args.fps)
+        else:
+            from vida.graficacion import Graficadora
+            graficadora = Graficadora(headless=args.sin_grafico, reglas=reglas, densidad=args.densidad,
+                                      max_pixeles=args.max_pixeles or None)
+        if args.espectadores is None:
+            graficadora.crear_ventanas(petri)
 
         # Obtener datos de resultados de la competencia
         contest_data = graficadora.resultado_competencia()
 
+        if guardado is not None:
+            guardado.terminar()
+            print(f"Último punto de control en: {args.guardar} ({guardado.guardados} guardados)")
+
+        if instr is not None:
+            print(instr.informe(graficadora.nombres))
+            os.makedirs('resultados', exist_ok=True)
+            marca = datetime.now().strftime('%y%m%d_%H%M%S')
+            resumen = os.path.join('resultados', f'instrumentacion_{marca}.json')
+            traza = os.path.join('resultados', f'traza_{marca}.json')
+            instr.exportar_resumen(resumen, graficadora.nombres)
+            instr.exportar_traza(traza)
+            print(f"Instrumentación guardada en: {resumen} (traza por paso: {traza})")
+
+        if petri.max_reciclados:
+            for nombre, (aciertos, fallos) in zip(graficadora.nombres, petri.reciclados()):
+                print(f"MOs reciclados de {nombre}: {aciertos} de {aciertos + fallos} nacimientos")
+
+        if perfilador is not None:
+            perfilador.terminar()
+            print(perfilador.informe())
+            archivo = perfilador.guardar('resultados', datetime.now().strftime('%y%m%d_%H%M%S'))
+            print(f"Perfil guardado en: {archivo} (y .prof para snakeviz)")
+
         if contest_data.get('completada', False):
             ranking_system = RankingSystem()
             ranking_system.guardar_resultado_competencia(contest_data)
@@ -161,7 +534,9 @@ Ejemplos:
         print(f"Error durante la simulación: {e}")
         return 1
     finally:
-        # Limpieza...
+        # Limpieza... (si se interrumpe, se espera a que termine de escribirse el punto de control)
+        if guardado is not None:
+            guardado.terminar()
         if 'graficadora' in locals() and graficadora:
             try:
                 graficadora.limpiar()
@@ -169,6 +544,8 @@ Ejemplos:
                 pass
         if petri:
             try:
+                if hasattr(petri, 'cerrar'):
+                    petri.cerrar()
                 del petri
             except:
                 pass
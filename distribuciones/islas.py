@@ -0,0 +1,26 @@
+# =====================================================================
+# ISLAS: Ejemplo de distribución de nutrientes agregada
+# Cinco manchas gaussianas en posiciones fijas. El registro la normaliza
+# para que tenga, en promedio, los mismos nutrientes que las incorporadas.
+# =====================================================================
+
+import numpy as np
+from vida.distribuciones import Distribucion
+
+
+class Islas(Distribucion):
+    """Cinco islas de nutrientes de distinto tamaño"""
+
+    nombre = "Islas"
+    version = 1
+
+    # (centro x, centro y, radio), relativos al tamaño del plato
+    ISLAS = [(0.3, 0.3, 0.08), (0.7, 0.3, 0.06), (0.5, 0.5, 0.10), (0.3, 0.7, 0.06), (0.7, 0.7, 0.08)]
+
+    def generar(self, max_x: int, max_y: int) -> np.ndarray:
+        x = np.arange(max_x)[:, None] / max_x
+        y = np.arange(max_y)[None, :] / max_y
+        campo = np.zeros((max_x, max_y))
+        for cx, cy, r in self.ISLAS:
+            campo += np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / (r * r))
+        return campo
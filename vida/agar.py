@@ -3,8 +3,27 @@
 #       trabajos microbiológicos
 # =====================================================================
 
-from typing import List, Tuple
+import os
+import mmap
+import contextlib
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
+from multiprocessing import shared_memory
+import numpy as np
+
+# Campos del agar que pueden vivir en memoria compartida, con su tipo
+CAMPOS = (('ocup', np.int8), ('ener', np.float64), ('nutri', np.float64))
+
+# Descripción de un agar compartido: nombre del bloque de cada campo y 'forma'
+Descriptor = Dict[str, Union[str, Tuple[int, int]]]
+
+# Distancia de las celdas desde las que no se llega a ninguna fuente
+SIN_FUENTE = -1
+
+# Pasos de movimiento (dx, dy) que se comparan para elegir la dirección
+# (quedarse va primero para que gane los empates)
+PASOS = ((0, 0),) + tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy)
 
 @dataclass
 class Posicion:
@@ -18,16 +37,6 @@ class Movimiento:
     dx: int
     dy: int
 
-@dataclass
-class Celda:
-    """Celda que contiene información del microorganismo y nutrientes"""
-    id_mo: int = 0           # identificador del microorganismo
-    energia_mo: float = 0.0  # energía del microorganismo
-    nutrientes: float = 0.0  # cantidad de nutrientes en esta posición
-
-# Alias de tipo para la grilla de celdas
-Celdas = List[List[Celda]]
-
 class Agar:
     """
     En la simulación el agar se usa sólo como interfaz con los microorganismos.
@@ -40,11 +49,261 @@ class Agar:
     def __init__(self):
         self.mx_x: int = 0
         self.mx_y: int = 0
+        # Tablas de índices de nutrientes para el desplazamiento actual (ver tablas())
+        self._ix: Optional[List[int]] = None
+        self._iy: Optional[List[int]] = None
+        self._ax: Optional[np.ndarray] = None
+        self._ay: Optional[np.ndarray] = None
         self.rx: int = 0  # desplazamiento relativo de los nutrientes
         self.ry: int = 0
         self.dist_n: int = 0  # copia de la distribución de nutrientes
-        self.celdas: Celdas = []  # información sobre MOs y nutrientes
-        
+        # Información sobre MOs y nutrientes, una matriz [x, y] por campo
+        self.ocup = np.zeros((0, 0), dtype=np.int8)  # identificador del MO de cada celda
+        self.ener = np.zeros((0, 0))                 # energía del MO de cada celda
+        self.nutri = np.zeros((0, 0))                # nutrientes de cada celda
+        # Memoria compartida (ver compartir() y adjuntar())
+        self._memorias: list = []
+        self._propias: bool = False
+        # Campos de distancia y de dirección (dx, dy) del paso actual (ver nuevo_paso())
+        self._campos: Dict[tuple, np.ndarray] = {}
+        self._rumbos: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+        self._plato: Optional[np.ndarray] = None
+
+    def dimensionar(self, mx_x: int, mx_y: int) -> None:
+        """Reserva las matrices para un agar vacío de mx_x por mx_y"""
+        self.liberar()
+        self.soltar()
+        self.mx_x = mx_x
+        self.mx_y = mx_y
+        self._olvidar_tablas()
+        self._plato = None
+        self.nuevo_paso()
+        self.ocup = np.zeros((mx_x, mx_y), dtype=np.int8)
+        self.ener = np.zeros((mx_x, mx_y))
+        self.nutri = np.zeros((mx_x, mx_y))
+
+    def vaciar(self) -> None:
+        """Deja todas las celdas vacías y sin nutrientes, sin volver a reservar las matrices"""
+        self.ocup.fill(0)
+        self.ener.fill(0.0)
+        self.nutri.fill(0.0)
+        self.rx = 0
+        self.ry = 0
+        self.dist_n = 0
+        self.nuevo_paso()
+
+    # -----------------------------------------------------------------
+    # Desplazamiento de los nutrientes
+    # -----------------------------------------------------------------
+    # La deriva sólo cambia rx, ry: los nutrientes de la celda x,y del plato
+    # están en nutri[(x + rx) % mx_x, (y + ry) % mx_y]. Las tablas con esos
+    # índices se calculan la primera vez que se piden después de cada cambio.
+    @property
+    def rx(self) -> int:
+        return self._rx
+
+    @rx.setter
+    def rx(self, valor: int) -> None:
+        self._rx = valor
+        self._olvidar_tablas()
+
+    @property
+    def ry(self) -> int:
+        return self._ry
+
+    @ry.setter
+    def ry(self, valor: int) -> None:
+        self._ry = valor
+        self._olvidar_tablas()
+
+    def _olvidar_tablas(self) -> None:
+        self._ix = self._iy = None
+        self._ax = self._ay = None
+
+    def tablas(self) -> Tuple[List[int], List[int]]:
+        """
+        Índices de la matriz de nutrientes para cada x y cada y del plato.
+
+        Cubren x en [-2*mx_x, 2*mx_x) (lo mismo para y), con los índices
+        negativos de Python, así las consultas fuera del plato por pocas
+        celdas tampoco necesitan el módulo.
+        """
+        if self._ix is None:
+            mx_x, mx_y = self.mx_x, self.mx_y
+            self._ix = [(x + self._rx) % mx_x for x in range(2 * mx_x)] if mx_x else []
+            self._iy = [(y + self._ry) % mx_y for y in range(2 * mx_y)] if mx_y else []
+        return self._ix, self._iy
+
+    def tablas_np(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Índices de nutrientes para x en [0, mx_x) e y en [0, mx_y), para operaciones vectorizadas"""
+        if self._ax is None:
+            ix, iy = self.tablas()
+            self._ax = np.array(ix[:self.mx_x], dtype=np.intp)
+            self._ay = np.array(iy[:self.mx_y], dtype=np.intp)
+        return self._ax, self._ay
+
+    def nutrientes_alineados(self) -> np.ndarray:
+        """Copia de los nutrientes en coordenadas del plato: [x, y] vale nutrientes(x, y)"""
+        ax, ay = self.tablas_np()
+        return self.nutri[np.ix_(ax, ay)]
+
+    # -----------------------------------------------------------------
+    # Campos de distancia (comida y enemigos más cercanos)
+    # -----------------------------------------------------------------
+    # Un campo se calcula para todo el plato la primera vez que algún MO lo
+    # pide en el paso, con una transformada de distancia desde todas las
+    # fuentes a la vez, lineal en la cantidad de celdas (ver _distancias()).
+    # El campo de dirección se calcula aparte, sólo si se pide una
+    # dirección. Después cada consulta es una lectura. La distancia se mide en pasos de
+    # movimiento (max(|dx|, |dy|)), sin contar los MOs que hay en el camino,
+    # y el campo es una foto del agar en el momento de la primera consulta:
+    # no ve los movimientos posteriores del mismo paso.
+    def nuevo_paso(self) -> None:
+        """Descarta los campos calculados; lo llama Petri al empezar cada paso de tiempo"""
+        self._campos.clear()
+        self._rumbos.clear()
+
+    def plato(self) -> np.ndarray:
+        """Celdas dentro del plato (el círculo inscripto, como Petri.esta_en_plato)"""
+        if self._plato is None:
+            r = self.mx_x // 2
+            x = np.arange(self.mx_x)[:, None]
+            y = np.arange(self.mx_y)[None, :]
+            self._plato = (r - x) ** 2 + (r - y) ** 2 < r * r
+        return self._plato
+
+    def campo_nutrientes(self, umbral: float = 0.0) -> np.ndarray:
+        """
+        Distancia de cada celda [x, y] del plato a la celda más cercana con
+        más de `umbral` nutrientes (SIN_FUENTE si no hay ninguna).
+        """
+        return self._campo(('nutrientes', umbral))
+
+    def campo_enemigos(self, id: int) -> np.ndarray:
+        """
+        Distancia de cada celda [x, y] al MO más cercano de una colonia
+        distinta de `id` (SIN_FUENTE si no hay ninguno).
+
+        Cada colonia tiene su propio campo de enemigos (y cada umbral, su
+        campo de nutrientes): si todas lo piden, en cada paso se calculan
+        tantos campos como colonias, cada uno de unos 10 ms con radio 200 (y
+        unos 5 ms más si también se piden direcciones).
+        """
+        return self._campo(('enemigos', id))
+
+    def distancia_nutrientes(self, x: int, y: int, umbral: float = 0.0) -> int:
+        """Pasos desde x,y hasta la celda más cercana con más de `umbral` nutrientes"""
+        return self._campo(('nutrientes', umbral)).item(x % self.mx_x, y % self.mx_y)
+
+    def direccion_nutrientes(self, x: int, y: int, umbral: float = 0.0) -> Movimiento:
+        """Primer paso desde x,y hacia la celda más cercana con más de `umbral` nutrientes"""
+        return self._direccion(('nutrientes', umbral), x, y)
+
+    def distancia_enemigo(self, x: int, y: int, id: int) -> int:
+        """Pasos desde x,y hasta el MO más cercano de una colonia distinta de `id`"""
+        return self._campo(('enemigos', id)).item(x % self.mx_x, y % self.mx_y)
+
+    def direccion_enemigo(self, x: int, y: int, id: int) -> Movimiento:
+        """Primer paso desde x,y hacia el MO más cercano de una colonia distinta de `id`"""
+        return self._direccion(('enemigos', id), x, y)
+
+    def _direccion(self, clave: tuple, x: int, y: int) -> Movimiento:
+        rumbo = self._rumbos.get(clave)
+        if rumbo is None:
+            rumbo = self._rumbos[clave] = _direcciones(self._campo(clave))
+        dx, dy = rumbo
+        x, y = x % self.mx_x, y % self.mx_y
+        return Movimiento(dx.item(x, y), dy.item(x, y))
+
+    def _campo(self, clave: tuple) -> np.ndarray:
+        """Campo de distancia de una clave, calculado una vez por paso"""
+        distancia = self._campos.get(clave)
+        if distancia is None:
+            tipo, valor = clave
+            if tipo == 'nutrientes':
+                fuentes = (self.nutrientes_alineados() > valor) & self.plato()
+            else:
+                fuentes = (self.ocup != 0) & (self.ocup != valor)
+            distancia = self._campos[clave] = _distancias(fuentes)
+        return distancia
+
+    # -----------------------------------------------------------------
+    # Memoria compartida entre procesos
+    # -----------------------------------------------------------------
+    def compartir(self) -> Descriptor:
+        """
+        Pasa las matrices a memoria compartida (sin cambiar su contenido).
+
+        Returns:
+            Descriptor para que otros procesos se adjunten con adjuntar() o VistaAgar
+        """
+        if self._memorias:
+            return self.descriptor()
+        for nombre, _ in CAMPOS:
+            matriz = getattr(self, nombre)
+            shm = shared_memory.SharedMemory(create=True, size=max(matriz.nbytes, 1))
+            compartida = np.ndarray(matriz.shape, dtype=matriz.dtype, buffer=shm.buf)
+            compartida[...] = matriz
+            setattr(self, nombre, compartida)
+            self._memorias.append(shm)
+        self._propias = True
+        return self.descriptor()
+
+    def descriptor(self) -> Descriptor:
+        """Nombres de los bloques de memoria compartida y forma de las matrices"""
+        if not self._memorias or not self._propias:
+            raise ValueError("El agar no está en memoria compartida propia (ver compartir())")
+        descriptor: Descriptor = {nombre: shm.name for (nombre, _), shm in zip(CAMPOS, self._memorias)}
+        descriptor['forma'] = (self.mx_x, self.mx_y)
+        return descriptor
+
+    def liberar(self) -> None:
+        """Vuelve a matrices propias y libera la memoria compartida creada por compartir()"""
+        if not self._propias:
+            return
+        for nombre, _ in CAMPOS:
+            setattr(self, nombre, getattr(self, nombre).copy())
+        for shm in self._memorias:
+            try:
+                shm.close()
+            except BufferError:
+                pass  # alguna vista sigue viva; el mapeo se libera al salir
+            shm.unlink()
+        self._memorias = []
+        self._propias = False
+
+    def adjuntar(self, descriptor: Descriptor, solo_lectura: bool = True) -> None:
+        """
+        Usa las matrices de un agar compartido por otro proceso, sin copiarlas.
+
+        Con solo_lectura, en POSIX el bloque se mapea con PROT_READ: ni cambiando
+        los flags de numpy se puede escribir. En otros sistemas la vista de
+        numpy se marca como no escribible.
+        """
+        self.soltar()
+        forma = tuple(descriptor['forma'])
+        self.mx_x, self.mx_y = forma
+        self._olvidar_tablas()
+        self._plato = None
+        self.nuevo_paso()
+        for nombre, dtype in CAMPOS:
+            memoria, matriz = _mapear(descriptor[nombre], forma, dtype, solo_lectura)
+            self._memorias.append(memoria)
+            setattr(self, nombre, matriz)
+
+    def soltar(self) -> None:
+        """Deja de usar un agar adjuntado con adjuntar() (no lo libera)"""
+        if self._propias or not self._memorias:
+            return
+        for nombre, _ in CAMPOS:
+            setattr(self, nombre, np.zeros((0, 0)))
+        for memoria in self._memorias:
+            try:
+                memoria.close()
+            except BufferError:
+                pass
+        self._memorias = []
+
     def max_x(self) -> int:
         """Devuelve el ancho del Agar"""
         return self.mx_x
@@ -59,15 +318,196 @@ class Agar:
         
     def ocupacion(self, x: int, y: int) -> int:
         """Devuelve el identificador del MO en la posición x,y"""
-        return self.celdas[x % self.mx_x][y % self.mx_y].id_mo
+        return self.ocup.item(x % self.mx_x, y % self.mx_y)
         
     def energia(self, x: int, y: int) -> float:
         """Devuelve la energía vital del MO en la posición x,y"""
-        return self.celdas[x % self.mx_x][y % self.mx_y].energia_mo
+        return self.ener.item(x % self.mx_x, y % self.mx_y)
         
     def nutrientes(self, x: int, y: int) -> float:
         """Devuelve la cantidad total de nutrientes en la posición x,y"""
-        return self.celdas[(x + self.rx) % self.mx_x][(y + self.ry) % self.mx_y].nutrientes
+        try:
+            return self.nutri.item(self._ix[x], self._iy[y])
+        except TypeError:
+            if self._ix is not None:
+                raise
+            self.tablas()  # primera consulta con este desplazamiento
+            return self.nutrientes(x, y)
+        except IndexError:  # lejos del plato
+            return self.nutri.item((x + self._rx) % self.mx_x, (y + self._ry) % self.mx_y)
+
+
+class VistaAgar(Agar):
+    """
+    Vista de sólo lectura de un agar compartido por otro proceso.
+
+    Tiene la misma interfaz que Agar para los MOs (ocupacion, energia,
+    nutrientes, max_x, max_y, dist_nutri) y no copia las matrices: se adjunta
+    por nombre a la memoria compartida. El desplazamiento de los nutrientes y
+    la distribución los actualiza quien la usa con sincronizar().
+    """
+
+    def __init__(self, descriptor: Descriptor):
+        super().__init__()
+        self.adjuntar(descriptor, solo_lectura=True)
+
+    def sincronizar(self, rx: int, ry: int, dist_n: int) -> None:
+        """Se llama al empezar cada paso, con el estado de los nutrientes del agar original"""
+        self.rx, self.ry, self.dist_n = rx, ry, dist_n
+        self.nuevo_paso()
+
+    def dimensionar(self, mx_x: int, mx_y: int) -> None:
+        raise TypeError("Una VistaAgar es de sólo lectura")
+
+    def compartir(self) -> Descriptor:
+        raise TypeError("Una VistaAgar es de sólo lectura")
+
+    def cerrar(self) -> None:
+        self.soltar()
+
+
+def _distancias(fuentes: np.ndarray) -> np.ndarray:
+    """
+    Distancia (en pasos de movimiento) de cada celda a la fuente más cercana.
+
+    Transformada de distancia en O(celdas), sin importar qué tan lejos
+    estén las fuentes: dos pasadas por filas (hacia x creciente y hacia x
+    decreciente) en las que cada celda toma la mejor de las tres vecinas de
+    la fila anterior, y que resuelven las fuentes con |dx| >= |dy|; después
+    dos pasadas a lo largo de cada fila (mínimos acumulados, vectorizados)
+    completan las que están más lejos en y que en x.
+    """
+    if not fuentes.any():
+        return np.full(fuentes.shape, SIN_FUENTE, dtype=np.int32)
+    mx_x, mx_y = fuentes.shape
+    lejos = mx_x + mx_y  # más que cualquier distancia en el plato
+    distancia = np.where(fuentes, 0, lejos).astype(np.int32)
+    vecinas = np.empty(mx_y, dtype=np.int32)
+    for filas, anterior in ((range(1, mx_x), -1), (range(mx_x - 2, -1, -1), 1)):
+        for x in filas:
+            previa = distancia[x + anterior]
+            vecinas[:] = previa
+            np.minimum(vecinas[1:], previa[:-1], out=vecinas[1:])
+            np.minimum(vecinas[:-1], previa[1:], out=vecinas[:-1])
+            vecinas += 1
+            np.minimum(distancia[x], vecinas, out=distancia[x])
+    # d(y) = min sobre y' de d(y') + |y - y'|, desde la izquierda y desde la derecha
+    y = np.arange(mx_y, dtype=np.int32)
+    izquierda = np.minimum.accumulate(distancia - y, axis=1) + y
+    derecha = np.minimum.accumulate((distancia + y)[:, ::-1], axis=1)[:, ::-1] - y
+    np.minimum(distancia, izquierda, out=distancia)
+    np.minimum(distancia, derecha, out=distancia)
+    return distancia
+
+
+def _direcciones(distancia: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Paso (dx, dy) hacia la vecina más cercana a una fuente, para cada celda.
+    En las fuentes y en las celdas sin fuente el paso es (0, 0).
+    """
+    mx_x, mx_y = distancia.shape
+    lejos = np.iinfo(np.int32).max
+    relleno = np.full((mx_x + 2, mx_y + 2), lejos, dtype=np.int32)
+    relleno[1:-1, 1:-1] = np.where(distancia == SIN_FUENTE, lejos, distancia)
+    # Mínimo entre la celda y sus vecinas, en el orden de PASOS (gana la primera)
+    mejor = relleno[1:-1, 1:-1].copy()
+    dx = np.zeros((mx_x, mx_y), dtype=np.int8)
+    dy = np.zeros((mx_x, mx_y), dtype=np.int8)
+    menor = np.empty((mx_x, mx_y), dtype=bool)
+    for px, py in PASOS[1:]:
+        vecina = relleno[1 + px:1 + px + mx_x, 1 + py:1 + py + mx_y]
+        np.less(vecina, mejor, out=menor)
+        np.copyto(mejor, vecina, where=menor)
+        dx[menor] = px
+        dy[menor] = py
+    return dx, dy
+
+
+def _mapear(nombre: str, forma: Tuple[int, int], dtype, solo_lectura: bool):
+    """Mapea un bloque de memoria compartida existente; devuelve (memoria, matriz)"""
+    try:
+        import _posixshmem
+    except ImportError:
+        shm = shared_memory.SharedMemory(name=nombre)
+        matriz = np.ndarray(forma, dtype=dtype, buffer=shm.buf)
+        matriz.flags.writeable = not solo_lectura
+        return shm, matriz
+    # En POSIX se mapea directamente, sin registrar el bloque en el resource
+    # tracker (el bloque es de otro proceso, que es quien lo libera)
+    flags = os.O_RDONLY if solo_lectura else os.O_RDWR
+    fd = _posixshmem.shm_open('/' + nombre, flags, mode=0o600)
+    try:
+        prot = mmap.PROT_READ if solo_lectura else mmap.PROT_READ | mmap.PROT_WRITE
+        mapa = mmap.mmap(fd, 0, prot=prot)
+    finally:
+        os.close(fd)
+    return mapa, np.ndarray(forma, dtype=dtype, buffer=mapa)
+
+# ---------------------------------------------------------------------
+# Agar actual
+# ---------------------------------------------------------------------
+# Cada Petri tiene su propio agar y lo activa mientras corren los MOs. El
+# agar activo es local al contexto (hilo o tarea), así que pueden convivir
+# varias simulaciones en un mismo proceso. Los generadores aleatorios, en
+# cambio, son del proceso: las partidas con semilla sólo se repiten igual
+# si corren de a una (no en hilos a la vez).
+_por_omision = Agar()
+_actual: ContextVar[Agar] = ContextVar('agar_actual', default=_por_omision)
+
+
+def agar_actual() -> Agar:
+    """Devuelve el agar activo en este contexto"""
+    return _actual.get()
+
+
+def activar_agar(instancia: Agar) -> None:
+    """Deja `instancia` como agar actual de este contexto fuera de los bloques usar_agar"""
+    _actual.set(instancia)
+
+
+@contextlib.contextmanager
+def usar_agar(instancia: Agar):
+    """Activa `instancia` como agar actual dentro del bloque with"""
+    token = _actual.set(instancia)
+    try:
+        yield instancia
+    finally:
+        _actual.reset(token)
+
+
+class _AgarActual:
+    """
+    Representante del agar activo, para que `from vida.agar import agar`
+    siga funcionando: cada acceso se resuelve en el agar de la simulación
+    que está corriendo. Las consultas de los MOs se delegan directamente.
+    """
+
+    __slots__ = ()
+
+    def max_x(self) -> int:
+        return _actual.get().mx_x
+
+    def max_y(self) -> int:
+        return _actual.get().mx_y
+
+    def dist_nutri(self) -> int:
+        return _actual.get().dist_n
+
+    def ocupacion(self, x: int, y: int) -> int:
+        return _actual.get().ocupacion(x, y)
+
+    def energia(self, x: int, y: int) -> float:
+        return _actual.get().energia(x, y)
+
+    def nutrientes(self, x: int, y: int) -> float:
+        return _actual.get().nutrientes(x, y)
+
+    def __getattr__(self, nombre: str):
+        return getattr(_actual.get(), nombre)
+
+    def __setattr__(self, nombre: str, valor) -> None:
+        setattr(_actual.get(), nombre, valor)
+
 
-# Esta instancia es la interfaz para proveer información a los MOs
-agar = Agar()
\ No newline at end of file
+# Esta es la interfaz para proveer información a los MOs (el agar activo)
+agar = _AgarActual()
\ No newline at end of file
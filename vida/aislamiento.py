@@ -0,0 +1,291 @@
+# =====================================================================
+# AISLAMIENTO: Ejecución de los MOs de cada colonia en su propio proceso
+# =====================================================================
+"""
+Modo aislado del motor.
+
+El código de los MOs de cada colonia corre en un proceso trabajador propio
+(iniciado con 'spawn', así no hereda nada del proceso principal). El
+trabajador ve el agar a través de un mapeo de sólo lectura de la memoria
+compartida y no tiene acceso a Petri ni a las otras colonias.
+
+Cada paso de tiempo:
+
+1. Alimentación (proceso principal, vectorizada), igual que en el modo
+   paralelo.
+2. Decisiones: cada trabajador recibe en un único mensaje los cambios del
+   paso anterior que afectan a sus MOs (nacimientos, muertes, movimientos)
+   y devuelve en un único mensaje las decisiones de todos ellos, tomadas
+   sobre la misma foto del agar.
+3. Reglas (proceso principal): las decisiones de todas las colonias se
+   aplican en un orden aleatorio con las reglas del modo paralelo.
+
+Límites por colonia:
+    - limite_segundos: tiempo de reloj para devolver las decisiones de un paso
+    - limite_cpu: segundos de CPU para toda la competencia (RLIMIT_CPU)
+    - limite_memoria: megabytes de memoria del trabajador (RLIMIT_AS)
+
+Una colonia que se pasa de un límite, o cuyo código falla, queda
+descalificada: su trabajador se termina y sus MOs ya no deciden (se quedan
+quietos hasta morir de hambre). Los límites de CPU y memoria sólo se aplican
+en sistemas POSIX.
+
+Los MOs iniciales y el prototipo de cada colonia (nombre y autor) se crean
+en el proceso principal, como en el motor secuencial; desde el primer paso
+las instancias viven sólo en los trabajadores.
+"""
+
+import time
+import random
+import traceback
+import multiprocessing as mp
+from multiprocessing import connection
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .definiciones import *
+from .agar import Descriptor, Posicion, Movimiento, VistaAgar, usar_agar
+from .microorganismo import Microorganismo
+from .petri import Petri
+from .paralelo import Reglas, Tenencia, _semilla, alimentar, registrar_eventos
+
+
+class Ficha:
+    """Representa a un MO del lado del motor; la instancia real vive en el trabajador."""
+    __slots__ = ()
+
+
+def _limitar(limite_cpu: Optional[float], limite_memoria: Optional[int]) -> None:
+    """Aplica los límites de CPU (segundos) y memoria (MB) al proceso actual"""
+    if resource is None:
+        return
+    if limite_cpu is not None:
+        segundos = max(1, int(limite_cpu))
+        resource.setrlimit(resource.RLIMIT_CPU, (segundos, segundos + 1))
+    if limite_memoria is not None:
+        tope = limite_memoria * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (tope, tope))
+
+
+def _trabajador_colonia(conexion, identidad: int, clase: Type[Microorganismo], semilla: int,
+                        descriptor: Descriptor, limite_cpu: Optional[float],
+                        limite_memoria: Optional[int]) -> None:
+    """
+    Proceso trabajador de una colonia.
+
+    Mensajes que recibe: (tiempo, rx, ry, dist_n, eventos) o None para terminar.
+    Respuestas: ('ok', decisiones) con una matriz de filas (x, y, dx, dy, mitosis),
+    o ('error', traceback).
+    """
+    vista = VistaAgar(descriptor)
+    _limitar(limite_cpu, limite_memoria)
+
+    mos: Dict[Tuple[int, int], Microorganismo] = {}
+    # Los MOs de la colonia consultan la vista de sólo lectura
+    with usar_agar(vista):
+        try:
+            while True:
+                mensaje = conexion.recv()
+                if mensaje is None:
+                    break
+                tiempo, rx, ry, dist_n, eventos = mensaje
+                vista.sincronizar(rx, ry, dist_n)
+                # Cambios del paso anterior, en el orden en que ocurrieron
+                for evento in eventos:
+                    if evento[0] == 'nace':
+                        mos[(evento[1], evento[2])] = clase()
+                    elif evento[0] == 'muere':
+                        mos.pop((evento[1], evento[2]), None)
+                    else:
+                        _, x, y, nx, ny, _ = evento
+                        if (x, y) in mos:
+                            mos[(nx, ny)] = mos.pop((x, y))
+
+                random.seed(_semilla(semilla, tiempo, identidad))
+                decisiones = np.zeros((len(mos), 5), dtype=np.int64)
+                for i, ((x, y), mo) in enumerate(sorted(mos.items())):
+                    mov = Movimiento(0, 0)
+                    mo.actualizar(identidad, Posicion(x, y), vista.ener.item(x, y))
+                    mo.decidir_movimiento(mov)
+                    decisiones[i] = (x, y, int(mov.dx), int(mov.dy), bool(mo.quiere_mitosis()))
+                conexion.send(('ok', decisiones))
+        except (EOFError, KeyboardInterrupt):
+            pass
+        except BaseException:
+            try:
+                conexion.send(('error', traceback.format_exc()))
+            except (OSError, ValueError):
+                pass
+        finally:
+            vista.cerrar()
+
+
+class PetriAislado(Petri):
+    """
+    Cápsula de Petri que ejecuta el código de cada colonia en un proceso aislado.
+
+    Ver la documentación del módulo para la semántica de cada paso y los límites.
+    """
+
+    def __init__(self, radio: int, dist: int, colonias_seleccionadas: List[int],
+                 clases_mo: Dict[int, Type[Microorganismo]], semilla: Optional[int] = None,
+                 limite_segundos: Optional[float] = None, limite_cpu: Optional[float] = None,
+                 limite_memoria: Optional[int] = 1024):
+        """
+        Args:
+            limite_segundos: segundos de reloj por paso para cada colonia
+                             (por omisión el tiempo máximo por movimiento de colonia)
+            limite_cpu: segundos de CPU de cada colonia en toda la competencia (None: sin límite)
+            limite_memoria: megabytes de memoria de cada trabajador (None: sin límite)
+        """
+        super().__init__(radio, dist, colonias_seleccionadas, clases_mo, semilla)
+        self.limite_segundos = self.max_tx_col if limite_segundos is None else limite_segundos
+        self.procesos: List[Optional[mp.Process]] = []
+        self.conexiones: List[Optional[connection.Connection]] = []
+        self.descalificadas: Dict[int, str] = {}  # identidad -> motivo
+        descriptor = self.agar.compartir()
+        self.compartido = True
+
+        # Las instancias iniciales se descartan: cada trabajador crea las suyas
+        self.fichas: Tenencia = {}
+        self.pendientes: List[list] = [[] for _ in self.colonias]
+        for colonia in self.colonias:
+            for x, y, _ in colonia.extraer():
+                self.fichas[(x, y)] = (colonia.identidad, Ficha())
+                self.pendientes[colonia.identidad - 1].append(('nace', x, y, colonia.identidad))
+
+        self.reglas = Reglas(self.agar.ocup, self.agar.ener, self.radio, [Ficha] * len(self.colonias))
+        contexto = mp.get_context('spawn')
+        for colonia in self.colonias:
+            padre, hijo = contexto.Pipe()
+            proceso = contexto.Process(
+                target=_trabajador_colonia, daemon=True,
+                args=(hijo, colonia.identidad, colonia.clase_mo, self.semilla, descriptor,
+                      limite_cpu, limite_memoria))
+            proceso.start()
+            hijo.close()
+            self.procesos.append(proceso)
+            self.conexiones.append(padre)
+
+    def descalificar(self, identidad: int, motivo: str) -> None:
+        """Termina el trabajador de una colonia; sus MOs dejan de decidir."""
+        c = identidad - 1
+        if identidad not in self.descalificadas:
+            self.descalificadas[identidad] = motivo
+            print(f"\nColonia {identidad} ({self.nombre_colonia(identidad)}) descalificada: {motivo}")
+        if self.procesos[c] is not None:
+            self.procesos[c].terminate()
+            self.procesos[c].join(timeout=1)
+            self.conexiones[c].close()
+            self.procesos[c] = None
+            self.conexiones[c] = None
+
+    def pedir_decisiones(self) -> Dict[Tuple[int, int], Tuple[int, int, bool]]:
+        """Manda a cada trabajador los cambios pendientes y espera sus decisiones."""
+        esperando = {}
+        for c, conexion in enumerate(self.conexiones):
+            if conexion is None:
+                continue
+            try:
+                conexion.send((self.tiempo, self.agar.rx, self.agar.ry, self.agar.dist_n, self.pendientes[c]))
+                esperando[conexion] = c
+            except (OSError, ValueError):
+                self.descalificar(c + 1, "el proceso terminó")
+        self.pendientes = [[] for _ in self.colonias]
+
+        decisiones = {}
+        limite = time.monotonic() + self.limite_segundos
+        while esperando:
+            listas = connection.wait(list(esperando), timeout=max(0.0, limite - time.monotonic()))
+            if not listas:
+                for c in esperando.values():
+                    self.descalificar(c + 1, f"superó {self.limite_segundos} s en un paso")
+                break
+            for conexion in listas:
+                c = esperando.pop(conexion)
+                try:
+                    estado, datos = conexion.recv()
+                except (EOFError, OSError):
+                    self.descalificar(c + 1, "el proceso terminó (límite de CPU o memoria)")
+                    continue
+                if estado != 'ok':
+                    self.descalificar(c + 1, f"error en el código del MO\n{datos}")
+                    continue
+                for x, y, dx, dy, dup in datos.tolist():
+                    # Sólo se aceptan decisiones de MOs propios
+                    if self.fichas.get((x, y), (None,))[0] == c + 1:
+                        decisiones[(x, y)] = (dx, dy, bool(dup))
+        return decisiones
+
+    def mover_colonias(self) -> None:
+        """Un paso de tiempo: alimentación, decisiones en los trabajadores y reglas."""
+        self.tiempo += 1
+
+        # 1. Alimentación y costo de vivir (vectorizado)
+        alimentar(self)
+
+        # 2. Decisiones de todas las colonias
+        decisiones = self.pedir_decisiones()
+
+        # 3. Reglas en orden aleatorio; los MOs sin decisión se quedan quietos
+        orden = [(x, y, id_mo, ficha) for (x, y), (id_mo, ficha) in sorted(self.fichas.items())]
+        self.reglas.rng.seed(_semilla(self.semilla, self.tiempo, -1))
+        self.reglas.rng.shuffle(orden)
+        eventos = []
+        for x, y, id_mo, ficha in orden:
+            if self.fichas.get((x, y), (None, None))[1] is ficha:
+                dx, dy, dup = decisiones.get((x, y), (0, 0, False))
+                self.reglas.aplicar(x, y, id_mo, dx, dy, dup, self.fichas, eventos)
+        registrar_eventos(self, eventos)
+        for evento in eventos:
+            id_mo = evento[3] if evento[0] != 'mueve' else evento[5]
+            self.pendientes[id_mo - 1].append(evento)
+
+        # Mover nutrientes
+        self.mover_nutrientes()
+
+    def reiniciar(self, dist: int, colonias_seleccionadas: List[int], semilla: Optional[int] = None) -> None:
+        """Los trabajadores tienen el estado de la partida: para otra, crear un PetriAislado nuevo."""
+        raise NotImplementedError("PetriAislado no se puede reiniciar")
+
+    def capturar(self):
+        """Los MOs viven en los trabajadores: los puntos de control son sólo del motor secuencial."""
+        raise NotImplementedError("PetriAislado no admite puntos de control")
+
+    def restaurar(self, punto) -> None:
+        raise NotImplementedError("PetriAislado no admite puntos de control")
+
+    def cerrar(self) -> None:
+        """Termina los trabajadores y libera la memoria compartida."""
+        for conexion in self.conexiones:
+            if conexion is not None:
+                try:
+                    conexion.send(None)
+                except (OSError, ValueError):
+                    pass
+        for c, proceso in enumerate(self.procesos):
+            if proceso is not None:
+                proceso.join(timeout=5)
+                if proceso.is_alive():
+                    proceso.terminate()
+                self.conexiones[c].close()
+        self.procesos = []
+        self.conexiones = []
+        if self.compartido:
+            self.reglas = None
+            self.agar.liberar()
+            self.compartido = False
+
+    def __del__(self):
+        """Destructor"""
+        try:
+            self.cerrar()
+        except (AttributeError, TypeError):
+            pass
+        super().__del__()
@@ -0,0 +1,255 @@
+# =====================================================================
+# BENCH: Banco de pruebas de rendimiento del motor
+# Corre una matriz fija de enfrentamientos con semillas fijas y compara
+# contra una corrida de referencia para detectar regresiones.
+#
+# Uso (desde la raíz del proyecto):
+#   python -m vida.bench
+#   python -m vida.bench --radios 25 --salida base.json
+#   python -m vida.bench --base base.json --tolerancia 0.15
+# =====================================================================
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import contextlib
+import concurrent.futures
+import multiprocessing as mp
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .definiciones import *
+
+# Enfrentamientos de la matriz (nombres de módulo.clase dentro de mos/)
+PAREJAS: List[Tuple[str, str]] = [
+    ('aleatorio.Aleatorio', 'buscan.BuscaN'),
+    ('tacticas1.Tacticas1', 'tacticas2.Tacticas2'),
+    ('moxx.MOxx', 'moyy.MOyy'),
+    ('buscan.BuscaN', 'tacticas1.Tacticas1'),
+]
+RADIOS: List[int] = [25, 50, 100]
+PASOS: int = 200
+SEMILLA: int = 1234
+
+# Métricas que se comparan contra la base: (clave, True si más es mejor)
+METRICAS: List[Tuple[str, bool]] = [
+    ('pasos_por_seg', True),
+    ('actualizaciones_por_seg', True),
+    ('rss_pico_kb', False),
+]
+
+
+def _clase(nombre: str):
+    """Importa mos.<modulo>.<Clase>"""
+    import importlib
+    modulo, clase = nombre.rsplit('.', 1)
+    return getattr(importlib.import_module(f'mos.{modulo}'), clase)
+
+
+def _rss_pico_kb() -> Optional[int]:
+    """Memoria residente máxima del proceso, en KB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # En macOS ru_maxrss está en bytes, en Linux en KB
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def correr_caso(pareja: Tuple[str, str], dist: int, radio: int, pasos: int, semilla: int) -> dict:
+    """
+    Corre un caso de la matriz y mide su rendimiento.
+
+    Se llama en un proceso nuevo para cada caso, así la memoria pico medida
+    es la de ese caso solamente.
+
+    Args:
+        pareja: nombres módulo.Clase de los dos microorganismos
+        dist: distribución de nutrientes
+        radio: radio del plato
+        pasos: pasos de tiempo a simular (aunque se extingan las colonias)
+        semilla: semilla de la corrida
+
+    Returns:
+        Diccionario con los tiempos por fase y las métricas del caso
+    """
+    from .petri import Petri
+
+    clases = {0: _clase(pareja[0]), 1: _clase(pareja[1])}
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        petri = Petri(radio, dist, [0, 1], clases, semilla=semilla)
+    t_inicio = time.perf_counter() - t0
+
+    t_pasos = 0.0
+    t_estadisticas = 0.0
+    actualizaciones = 0
+    for _ in range(pasos):
+        t0 = time.perf_counter()
+        petri.mover_colonias()
+        t1 = time.perf_counter()
+        # Las mismas estadísticas que calcula la Graficadora en cada paso
+        poblaciones = petri.teselado.vivos_por_colonia()
+        petri.teselado.energia_por_colonia(petri.agar.ocup, petri.agar.ener)
+        petri.teselado.total_nutrientes(petri.agar.nutri)
+        t_pasos += t1 - t0
+        t_estadisticas += time.perf_counter() - t1
+        actualizaciones += len(petri.vivos)
+
+    t_total = t_pasos + t_estadisticas
+
+    # Fases del motor en una pasada aparte (la instrumentación agrega su propio
+    # costo, así que no entra en las métricas que se comparan contra la base)
+    from .instrumentacion import Instrumentacion
+    with contextlib.redirect_stdout(io.StringIO()):
+        petri = Petri(radio, dist, [0, 1], clases, semilla=semilla)
+    instr = Instrumentacion(len(petri.colonias), traza=False)
+    petri.instrumentar(instr)
+    for _ in range(pasos):
+        petri.mover_colonias()
+    fases_motor = instr.resumen()
+
+    return {
+        'caso': f'{pareja[0]}-{pareja[1]}-d{dist}-r{radio}',
+        'pareja': list(pareja),
+        'distribucion': dist,
+        'radio': radio,
+        'pasos': pasos,
+        'semilla': semilla,
+        'fases_seg': {
+            'inicializacion': round(t_inicio, 6),
+            'mover_colonias': round(t_pasos, 6),
+            'estadisticas': round(t_estadisticas, 6),
+        },
+        # Dentro de mover_colonias, medido con Instrumentacion (ver vida/instrumentacion.py)
+        'fases_motor_seg': {fase: d['segundos'] for fase, d in fases_motor['fases'].items()},
+        'fases_motor_sin_medir_seg': fases_motor['sin_medir'],
+        'pasos_por_seg': round(pasos / t_total, 3) if t_total > 0 else None,
+        'actualizaciones': actualizaciones,
+        'actualizaciones_por_seg': round(actualizaciones / t_pasos, 3) if t_pasos > 0 else None,
+        'rss_pico_kb': _rss_pico_kb(),
+        # Sirve para detectar cambios de comportamiento (no sólo de tiempo)
+        'poblacion_final': poblaciones,
+    }
+
+
+def correr_matriz(radios: List[int], distribuciones: List[int], pasos: int, semilla: int,
+                  repeticiones: int = 3) -> List[dict]:
+    """
+    Corre todos los casos, cada uno en un proceso nuevo.
+
+    Cada caso se repite `repeticiones` veces y se queda la corrida más rápida,
+    que es la menos afectada por el resto de la máquina.
+    """
+    casos = [(pareja, dist, radio) for radio in radios for pareja in PAREJAS for dist in distribuciones]
+    resultados = []
+    contexto = mp.get_context('spawn')
+    for i, (pareja, dist, radio) in enumerate(casos, 1):
+        corridas = []
+        for _ in range(max(1, repeticiones)):
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=contexto) as ejecutor:
+                corridas.append(ejecutor.submit(correr_caso, pareja, dist, radio, pasos, semilla).result())
+        caso = max(corridas, key=lambda c: c['pasos_por_seg'] or 0)
+        caso['repeticiones'] = len(corridas)
+        resultados.append(caso)
+        print(f"  [{i}/{len(casos)}] {caso['caso']:<50} {caso['pasos_por_seg']:>9.1f} pasos/s "
+              f"{caso['actualizaciones_por_seg']:>11.0f} act/s {caso['rss_pico_kb'] or 0:>8} KB")
+    return resultados
+
+
+def comparar(actual: List[dict], base: List[dict], tolerancia: float) -> List[str]:
+    """
+    Compara una corrida contra la base.
+
+    Args:
+        actual: casos de la corrida actual
+        base: casos de la corrida de referencia
+        tolerancia: empeoramiento relativo admitido (0.1 = 10%)
+
+    Returns:
+        Lista de regresiones encontradas (vacía si no hay)
+    """
+    regresiones = []
+    por_caso = {c['caso']: c for c in base}
+    for caso in actual:
+        ref = por_caso.get(caso['caso'])
+        if ref is None:
+            continue
+        for clave, mas_es_mejor in METRICAS:
+            v, r = caso.get(clave), ref.get(clave)
+            if not v or not r:
+                continue
+            cambio = (v - r) / r
+            if (mas_es_mejor and cambio < -tolerancia) or (not mas_es_mejor and cambio > tolerancia):
+                regresiones.append(f"{caso['caso']}: {clave} {r} -> {v} ({cambio:+.1%})")
+        if ref['semilla'] == caso['semilla'] and ref['pasos'] == caso['pasos'] \
+                and ref.get('poblacion_final') != caso.get('poblacion_final'):
+            regresiones.append(f"{caso['caso']}: cambió el resultado "
+                               f"{ref.get('poblacion_final')} -> {caso.get('poblacion_final')}")
+    return regresiones
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Banco de pruebas de rendimiento del motor')
+    parser.add_argument('--radios', type=int, nargs='+', default=RADIOS,
+                        help=f'Radios de plato a medir (por omisión {RADIOS})')
+    parser.add_argument('--distribuciones', type=int, nargs='+', default=list(range(1, MAX_DNUTRI + 1)),
+                        help='Distribuciones de nutrientes a medir (por omisión todas)')
+    parser.add_argument('--pasos', type=int, default=PASOS,
+                        help=f'Pasos de tiempo por caso (por omisión {PASOS})')
+    parser.add_argument('--semilla', type=int, default=SEMILLA,
+                        help=f'Semilla de todas las corridas (por omisión {SEMILLA})')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Corridas de cada caso; se informa la más rápida (por omisión 3)')
+    parser.add_argument('--salida', type=str,
+                        help='Archivo JSON de salida (por omisión resultados/bench_<fecha>.json)')
+    parser.add_argument('--base', type=str,
+                        help='Archivo JSON de una corrida anterior contra el que comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help='Empeoramiento relativo admitido antes de marcar una regresión (por omisión 0.10)')
+    args = parser.parse_args()
+    if args.pasos < 1:
+        parser.error("--pasos debe ser al menos 1")
+
+    print("Banco de pruebas del motor...")
+    casos = correr_matriz(args.radios, args.distribuciones, args.pasos, args.semilla, args.repeticiones)
+
+    salida = args.salida
+    if salida is None:
+        os.makedirs('resultados', exist_ok=True)
+        salida = os.path.join('resultados', f"bench_{datetime.now().strftime('%y%m%d_%H%M%S')}.json")
+    informe = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'casos': casos,
+    }
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en: {salida}")
+
+    if args.base:
+        with open(args.base, 'r', encoding='utf-8') as f:
+            base = json.load(f)['casos']
+        regresiones = comparar(casos, base, args.tolerancia)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones respecto de {args.base}:")
+            for r in regresiones:
+                print(f"  {r}")
+            return 1
+        print(f"\nSin regresiones respecto de {args.base} (tolerancia {args.tolerancia:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
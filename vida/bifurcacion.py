@@ -0,0 +1,232 @@
+# =====================================================================
+# BIFURCACION: Continuaciones de una partida desde un punto de control
+# El punto de control se carga una sola vez y se juegan K continuaciones
+# con distintas semillas en un grupo de procesos. Con `fork` los
+# trabajadores heredan el plato ya armado (copia al escribir) y sólo lo
+# restauran antes de cada continuación.
+# =====================================================================
+
+import io
+import os
+import random
+import contextlib
+import multiprocessing as mp
+from collections import Counter
+from statistics import mean, pstdev
+from typing import Dict, Iterable, List, Optional, Type
+
+import numpy as np
+
+from .microorganismo import Microorganismo
+from .petri import Petri
+from .guardado import PuntoControl, leer, deserializar
+from .terminacion import ReglaTerminacion
+
+# Estado de cada trabajador: el plato y el punto de control desde donde se continúa
+_petri: Optional[Petri] = None
+_punto: Optional[PuntoControl] = None
+_reglas: Optional[List[ReglaTerminacion]] = None
+
+
+def _cargar(ruta: str, clases_mo: Dict[int, Type[Microorganismo]]) -> None:
+    global _petri, _punto
+    with contextlib.redirect_stdout(io.StringIO()):
+        _petri = Petri.reanudar(ruta, clases_mo)
+    _punto = leer(ruta)
+
+
+def _preparar(ruta: str, clases_mo: Dict[int, Type[Microorganismo]],
+              reglas: Optional[List[ReglaTerminacion]]) -> None:
+    """Inicializador de los trabajadores (con fork ya tienen el plato del padre)"""
+    global _reglas
+    import matplotlib
+    matplotlib.use('Agg')
+    if _petri is None:
+        _cargar(ruta, clases_mo)
+    _reglas = reglas
+
+
+def _jugar(petri: Petri, reglas: Optional[List[ReglaTerminacion]]) -> dict:
+    """Juega la partida de `petri` headless hasta el final y devuelve su resultado."""
+    from .graficacion import Graficadora
+    with contextlib.redirect_stdout(io.StringIO()):
+        graficadora = Graficadora(headless=True, reglas=reglas)
+        # Las colonias extinguidas antes del punto de control conservan su
+        # paso de extinción (Petri.extinciones), así sus puestos no empatan
+        graficadora.crear_ventanas(petri)
+    return graficadora.resultado_competencia()
+
+
+def _continuar(semilla: Optional[int]) -> dict:
+    """
+    Juega una continuación headless desde el punto de control con otra
+    semilla (None: con los generadores aleatorios del punto de control,
+    como siguió la partida original).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        _petri.restaurar(_punto)
+    if semilla is not None:
+        random.seed(semilla)
+        np.random.seed(semilla % 2 ** 32)
+    resultado = _jugar(_petri, _reglas)
+    resultado['semilla'] = semilla
+    return resultado
+
+
+class Bifurcador:
+    """
+    Juega muchas continuaciones de una misma partida guardada, cambiando
+    sólo la semilla de los generadores aleatorios, para ver qué tan robusto
+    es su resultado.
+    """
+
+    def __init__(self, ruta: str, clases_mo: Dict[int, Type[Microorganismo]],
+                 reglas: Optional[List[ReglaTerminacion]] = None, procesos: Optional[int] = None):
+        """
+        Args:
+            ruta: punto de control escrito con Petri.guardar() o --guardar
+            clases_mo: clases de microorganismos disponibles (por índice)
+            reglas: reglas de terminación anticipada de cada continuación
+            procesos: procesos trabajadores (por omisión, uno por núcleo)
+        """
+        self.ruta = ruta
+        self.clases_mo = clases_mo
+        self.reglas = reglas
+        self.procesos = procesos or os.cpu_count() or 1
+        self.desde = leer(ruta).tiempo
+
+    def ejecutar(self, semillas: Iterable[int]) -> List[dict]:
+        """
+        Juega una continuación por semilla y devuelve sus resultados (los de
+        resultado_competencia() más la 'semilla'), en el orden de las semillas.
+        """
+        global _petri, _punto
+        import matplotlib
+        matplotlib.use('Agg')
+
+        semillas = list(semillas)
+        procesos = max(1, min(self.procesos, len(semillas)))
+        metodos = mp.get_all_start_methods()
+        contexto = mp.get_context('fork' if 'fork' in metodos else 'spawn')
+        resultados = []
+        # El plato se arma en este proceso antes de crear los trabajadores
+        # (con spawn, cada trabajador lo vuelve a cargar del archivo)
+        _cargar(self.ruta, self.clases_mo)
+        try:
+            if procesos == 1:
+                _preparar(self.ruta, self.clases_mo, self.reglas)
+                continuaciones = map(_continuar, semillas)
+                self._informar(continuaciones, len(semillas), resultados)
+            else:
+                with contexto.Pool(procesos, initializer=_preparar,
+                                   initargs=(self.ruta, self.clases_mo, self.reglas)) as grupo:
+                    self._informar(grupo.imap(_continuar, semillas), len(semillas), resultados)
+        finally:
+            _petri = None
+            _punto = None
+        return resultados
+
+    def verificar(self) -> List[str]:
+        """
+        Comprueba que continuar el punto de control con sus propios
+        generadores aleatorios, en este proceso y en el grupo de procesos,
+        da el mismo resultado (ganador, duración, terminación, población y
+        puesto de cada colonia) que la partida original simulada desde el
+        principio con su semilla. Las reglas tienen que ser las de la partida
+        original. Devuelve las diferencias encontradas (vacía si no hay).
+        """
+        estado = deserializar(leer(self.ruta).estado)
+        indices = {f'{c.__module__}.{c.__qualname__}': i for i, c in self.clases_mo.items()}
+        seleccionadas = [indices.get(nombre, -1) for nombre, _, _ in estado['colonias']]
+        with contextlib.redirect_stdout(io.StringIO()):
+            petri = Petri(estado['radio'], estado['dist'], seleccionadas, self.clases_mo, semilla=estado['semilla'])
+        petri.definir_dinamicas(estado['dinamicas'])
+        completa = _jugar(petri, self.reglas)
+
+        procesos = self.procesos
+        try:
+            self.procesos = 1
+            continuaciones = [('en este proceso', self.ejecutar([None])[0])]
+            self.procesos = 2
+            continuaciones += [(f'en el grupo ({k})', r) for k, r in enumerate(self.ejecutar([None, None]), 1)]
+        finally:
+            self.procesos = procesos
+
+        claves = ['ganador', 'duracion', 'terminacion'] + [
+            f'col{c}_{dato}' for c in range(1, completa['n_colonias'] + 1) for dato in ('poblacion_final', 'posicion')]
+        diferencias = []
+        for donde, resultado in continuaciones:
+            for clave in claves:
+                if resultado.get(clave) != completa.get(clave):
+                    diferencias.append(f"{clave} {donde}: {resultado.get(clave)} (partida completa: {completa.get(clave)})")
+        return diferencias
+
+    def _informar(self, continuaciones: Iterable[dict], total: int, resultados: List[dict]) -> None:
+        for i, resultado in enumerate(continuaciones, 1):
+            resultados.append(resultado)
+            estado = resultado['terminacion'] if resultado.get('completada', False) else "incompleta"
+            print(f"  [{i}/{total}] semilla {resultado['semilla']}: gana {resultado['ganador']} "
+                  f"({resultado['duracion']} pasos, {estado})")
+
+    @staticmethod
+    def resumen(resultados: List[dict]) -> dict:
+        """
+        Distribución de los resultados: ganadores, terminaciones, duración y,
+        para cada colonia, población final, energía final y puesto.
+        """
+        if not resultados:
+            return {'continuaciones': 0}
+        n_col = resultados[0]['n_colonias']
+        colonias = []
+        for c in range(1, n_col + 1):
+            poblaciones = [r[f'col{c}_poblacion_final'] for r in resultados]
+            energias = [r[f'col{c}_energia_final'] for r in resultados]
+            puestos = [r[f'col{c}_posicion'] for r in resultados]
+            colonias.append({
+                'nombre': resultados[0][f'col{c}_nombre'],
+                'poblacion_media': mean(poblaciones),
+                'poblacion_desvio': pstdev(poblaciones),
+                'poblacion_min': min(poblaciones),
+                'poblacion_max': max(poblaciones),
+                'energia_media': mean(energias),
+                'puesto_medio': mean(puestos),
+                'primeros': sum(1 for p in puestos if p == 1),
+            })
+        duraciones = [r['duracion'] for r in resultados]
+        return {
+            'continuaciones': len(resultados),
+            'ganadores': Counter(r['ganador'] for r in resultados),
+            'terminaciones': Counter(r['terminacion'] for r in resultados),
+            'duracion_media': mean(duraciones),
+            'duracion_min': min(duraciones),
+            'duracion_max': max(duraciones),
+            'colonias': colonias,
+        }
+
+    def informe(self, resultados: List[dict]) -> str:
+        """Resumen de las continuaciones como texto."""
+        resumen = self.resumen(resultados)
+        n = resumen['continuaciones']
+        lineas = ["=" * 80,
+                  f"CONTINUACIONES DESDE EL PASO {self.desde} ({self.ruta})",
+                  "=" * 80]
+        if n == 0:
+            lineas += ["Sin continuaciones", "=" * 80]
+            return "\n".join(lineas)
+        lineas.append(f"{'Colonia':<24} {'Gana':>6} {'Pob. media':>11} {'Desvío':>8} "
+                      f"{'Mín':>6} {'Máx':>6} {'Puesto':>7}")
+        lineas.append("-" * 80)
+        for col in resumen['colonias']:
+            gana = resumen['ganadores'].get(col['nombre'], 0) / n
+            lineas.append(f"{col['nombre']:<24} {gana:6.0%} {col['poblacion_media']:11.1f} "
+                          f"{col['poblacion_desvio']:8.1f} {col['poblacion_min']:6d} "
+                          f"{col['poblacion_max']:6d} {col['puesto_medio']:7.2f}")
+        lineas.append("-" * 80)
+        empates = resumen['ganadores'].get("Empate", 0)
+        terminaciones = ", ".join(f"{t or 'sin terminar'}: {k}" for t, k in resumen['terminaciones'].most_common())
+        lineas.append(f"Continuaciones: {n} (empates: {empates})")
+        lineas.append(f"Duración: media {resumen['duracion_media']:.0f} pasos "
+                      f"[{resumen['duracion_min']}, {resumen['duracion_max']}]")
+        lineas.append(f"Terminación: {terminaciones}")
+        lineas.append("=" * 80)
+        return "\n".join(lineas)
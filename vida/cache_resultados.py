@@ -0,0 +1,184 @@
+# =====================================================================
+# CACHE_RESULTADOS: Resultados de partidas ya jugadas, por contenido
+# La clave de una partida es un hash del código fuente de cada colonia
+# (su módulo en mos/ y lo que importa del proyecto), del motor, de la
+# distribución, del radio, de la semilla y de las reglas y dinámicas.
+# Si nada de eso cambió, el resultado es el mismo y no hace falta volver
+# a simular la partida.
+# =====================================================================
+
+import os
+import ast
+import json
+import hashlib
+import importlib.util
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Type
+
+from .microorganismo import Microorganismo
+from .terminacion import ReglaTerminacion
+from .dinamica import DinamicaNutrientes
+from .distribuciones import registro_distribuciones
+
+# Carpeta del proyecto (sólo se siguen los imports de módulos que están dentro)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Carpeta donde se guardan los resultados, uno por archivo
+CARPETA = os.path.join('resultados', 'cache_partidas')
+
+# Módulos que definen el resultado de una partida (con todo lo que importan)
+MODULOS_MOTOR = ('vida.petri', 'vida.graficacion')
+
+
+def _archivo(modulo: str) -> Optional[str]:
+    """Archivo fuente de un módulo del proyecto (None si no es del proyecto o no existe)"""
+    superior = modulo.partition('.')[0]
+    if not (os.path.isdir(os.path.join(RAIZ, superior)) or os.path.isfile(os.path.join(RAIZ, superior + '.py'))):
+        return None  # biblioteca estándar o de terceros
+    try:
+        spec = importlib.util.find_spec(modulo)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+        return None
+    origen = os.path.abspath(spec.origin)
+    return origen if origen.startswith(RAIZ + os.sep) else None
+
+
+def _importados(modulo: str, archivo: str) -> Set[str]:
+    """Módulos que importa el código fuente de `modulo` (absolutos y relativos)"""
+    with open(archivo, 'rb') as f:
+        arbol = ast.parse(f.read(), filename=archivo)
+    paquete = modulo.rpartition('.')[0]
+    nombres = set()
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Import):
+            nombres.update(alias.name for alias in nodo.names)
+        elif isinstance(nodo, ast.ImportFrom):
+            if nodo.level:
+                base = paquete.rsplit('.', nodo.level - 1)[0] if nodo.level > 1 else paquete
+                desde = f'{base}.{nodo.module}' if nodo.module else base
+            else:
+                desde = nodo.module or ''
+            nombres.add(desde)
+            # `from paquete import modulo`
+            nombres.update(f'{desde}.{alias.name}' for alias in nodo.names)
+    return nombres
+
+
+class CacheResultados:
+    """
+    Resultados de partidas indexados por una clave de contenido.
+
+    Sólo se guardan partidas reproducibles: con semilla y sin reglas que
+    dependan del reloj. Cada resultado es un JSON en
+    resultados/cache_partidas/, con el nombre de su clave.
+    """
+
+    def __init__(self, carpeta: str = CARPETA):
+        """
+        Args:
+            carpeta: carpeta donde se guardan los resultados
+        """
+        self.carpeta = carpeta
+        self.aciertos = 0
+        self.fallos = 0
+        # Hash del fuente de cada módulo y de cada clausura de imports (por proceso)
+        self._fuentes: Dict[str, str] = {}
+        self._huellas: Dict[str, str] = {}
+
+    # -----------------------------------------------------------------
+    # Huellas del código
+    # -----------------------------------------------------------------
+    def huella_modulos(self, modulos: List[str]) -> str:
+        """Hash de los módulos del proyecto y de todo lo que importan del proyecto."""
+        clave = ' '.join(modulos)
+        if clave in self._huellas:
+            return self._huellas[clave]
+        pendientes = list(modulos)
+        vistos: Dict[str, str] = {}
+        while pendientes:
+            modulo = pendientes.pop()
+            if modulo in vistos:
+                continue
+            archivo = _archivo(modulo)
+            if archivo is None:
+                continue
+            if archivo not in self._fuentes:
+                with open(archivo, 'rb') as f:
+                    self._fuentes[archivo] = hashlib.sha256(f.read()).hexdigest()
+            vistos[modulo] = self._fuentes[archivo]
+            pendientes.extend(_importados(modulo, archivo))
+        h = hashlib.sha256()
+        for modulo in sorted(vistos):
+            h.update(f'{modulo} {vistos[modulo]}\n'.encode())
+        self._huellas[clave] = h.hexdigest()
+        return self._huellas[clave]
+
+    def huella_mo(self, clase: Type[Microorganismo]) -> str:
+        """Hash del código de un microorganismo (su módulo y lo que importa del proyecto)"""
+        return self.huella_modulos([clase.__module__])
+
+    # -----------------------------------------------------------------
+    # Claves y resultados
+    # -----------------------------------------------------------------
+    def clave(self, clases: List[Type[Microorganismo]], dist: int, radio: int, semilla: Optional[int],
+              reglas: Optional[List[ReglaTerminacion]] = None,
+              dinamicas: Optional[List[DinamicaNutrientes]] = None) -> Optional[str]:
+        """
+        Clave de una partida, o None si su resultado no es reproducible (sin
+        semilla o con una regla que depende del reloj).
+        """
+        if semilla is None:
+            return None
+        configuracion_reglas = []
+        for regla in reglas or []:
+            configuracion = regla.configuracion()
+            if configuracion is None:
+                return None
+            configuracion_reglas.append([type(regla).__name__, configuracion])
+        distribucion = registro_distribuciones().distribuciones.get(dist)
+        datos = {
+            'motor': self.huella_modulos(list(MODULOS_MOTOR)),
+            'colonias': [[f'{c.__module__}.{c.__qualname__}', self.huella_mo(c)] for c in clases],
+            'dist': [dist, distribucion.clave() if distribucion is not None else None,
+                     self.huella_modulos([type(distribucion).__module__]) if distribucion is not None else None],
+            'radio': radio,
+            'semilla': semilla,
+            'reglas': configuracion_reglas,
+            'dinamicas': [[type(d).__name__, d.configuracion()] for d in dinamicas or []],
+        }
+        texto = json.dumps(datos, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(texto.encode()).hexdigest()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.carpeta, clave[:2], f'{clave}.json')
+
+    def buscar(self, clave: str) -> Optional[dict]:
+        """
+        Resultado guardado con esta clave (None si no está). El resultado
+        devuelto lleva la fecha de ahora y 'en_cache' en True.
+        """
+        try:
+            with open(self._ruta(clave), 'r', encoding='utf-8') as f:
+                resultado = json.load(f)
+        except (OSError, ValueError):
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        resultado['timestamp'] = datetime.now().isoformat()
+        resultado['en_cache'] = True
+        return resultado
+
+    def guardar(self, clave: str, resultado: dict) -> None:
+        """Guarda el resultado de una partida (se escribe aparte y se renombra)."""
+        ruta = self._ruta(clave)
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            temporal = f'{ruta}.{os.getpid()}.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump({k: v for k, v in resultado.items() if k != 'en_cache'}, f,
+                          ensure_ascii=False, indent=1)
+            os.replace(temporal, ruta)
+        except OSError as e:
+            print(f"Advertencia: no se pudo guardar el resultado en el cache ({ruta}): {e}")
@@ -0,0 +1,263 @@
+# =====================================================================
+# COLA: Cola durable de partidas para torneos distribuidos
+# Los trabajos viven en un archivo SQLite. Un trabajador toma un trabajo
+# con un plazo (lease) que renueva mientras juega; si muere, el plazo
+# vence y otro trabajador lo vuelve a tomar. Completar un trabajo es
+# idempotente: vale el primer resultado y los repetidos se ignoran.
+# Para trabajadores en otras máquinas, la cola se sirve por TCP.
+# =====================================================================
+
+import os
+import json
+import time
+import pickle
+import sqlite3
+import threading
+from dataclasses import dataclass
+from multiprocessing.managers import BaseManager
+from typing import Dict, List, Optional, Tuple
+
+# Estados de un trabajo
+PENDIENTE = 'pendiente'
+TOMADO = 'tomado'
+HECHO = 'hecho'
+FALLIDO = 'fallido'
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS trabajos (
+    id INTEGER PRIMARY KEY,
+    dist INTEGER NOT NULL,
+    colonias TEXT NOT NULL,          -- nombres de las clases (módulo.clase), en JSON
+    semilla INTEGER NOT NULL,
+    clave TEXT,                      -- clave en el cache de resultados (si es reproducible)
+    estado TEXT NOT NULL DEFAULT 'pendiente',
+    trabajador TEXT,
+    vence REAL,                      -- fin del plazo del trabajador que lo tomó
+    intentos INTEGER NOT NULL DEFAULT 0,
+    resultado TEXT,                  -- resultado de la competencia, en JSON
+    error TEXT,
+    registrado INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (dist, colonias, semilla)
+);
+CREATE INDEX IF NOT EXISTS trabajos_estado ON trabajos (estado);
+CREATE TABLE IF NOT EXISTS configuracion (
+    nombre TEXT PRIMARY KEY,
+    valor BLOB
+);
+"""
+
+
+@dataclass
+class Trabajo:
+    """Una partida de la cola"""
+    id: int
+    dist: int
+    colonias: List[str]
+    semilla: int
+    intentos: int
+    clave: Optional[str] = None  # clave del cache calculada por el coordinador (None: no se guarda)
+
+
+class ColaTrabajos:
+    """
+    Cola de partidas en un archivo SQLite, compartida por el coordinador y
+    los trabajadores (del mismo equipo, o de otros a través de servir()).
+    """
+
+    def __init__(self, ruta: str, plazo: float = 300.0, max_intentos: int = 3):
+        """
+        Args:
+            ruta: archivo SQLite de la cola (se crea si no existe)
+            plazo: segundos que un trabajo queda tomado sin renovarse
+            max_intentos: veces que se toma un trabajo antes de darlo por fallido
+        """
+        self.ruta = ruta
+        self.plazo = plazo
+        self.max_intentos = max_intentos
+        self._candado = threading.Lock()
+        self._db = sqlite3.connect(ruta, timeout=60, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(ESQUEMA)
+
+    def cerrar(self) -> None:
+        self._db.close()
+
+    def duracion_plazo(self) -> float:
+        """Segundos que dura el plazo de un trabajo tomado (para renovarlo a tiempo)"""
+        return self.plazo
+
+    def _transaccion(self, consulta, *args):
+        """Ejecuta consulta(cursor, *args) en una transacción exclusiva de escritura"""
+        with self._candado:
+            cursor = self._db.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                valor = consulta(cursor, *args)
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+            return valor
+
+    # -----------------------------------------------------------------
+    # Coordinador
+    # -----------------------------------------------------------------
+    def configurar(self, **valores) -> None:
+        """Guarda la configuración de las partidas (radio, reglas, dinámicas...)."""
+        def consulta(cursor):
+            for nombre, valor in valores.items():
+                cursor.execute("INSERT OR REPLACE INTO configuracion VALUES (?, ?)",
+                               (nombre, pickle.dumps(valor)))
+        self._transaccion(consulta)
+
+    def configuracion(self) -> dict:
+        """Configuración de las partidas guardada por el coordinador"""
+        with self._candado:
+            filas = self._db.execute("SELECT nombre, valor FROM configuracion").fetchall()
+        return {nombre: pickle.loads(valor) for nombre, valor in filas}
+
+    def agregar(self, trabajos: List[Tuple[int, List[str], int, Optional[str], Optional[dict]]]) -> int:
+        """
+        Agrega trabajos (dist, colonias, semilla, clave, resultado). Los que ya
+        están en la cola se ignoran; los que traen resultado (del cache) entran
+        hechos. Devuelve cuántos se agregaron.
+        """
+        def consulta(cursor):
+            agregados = 0
+            for dist, colonias, semilla, clave, resultado in trabajos:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO trabajos (dist, colonias, semilla, clave, estado, resultado) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (dist, json.dumps(colonias), semilla, clave, HECHO if resultado else PENDIENTE,
+                     json.dumps(resultado) if resultado else None))
+                agregados += cursor.rowcount
+            return agregados
+        return self._transaccion(consulta)
+
+    def resumen(self) -> Dict[str, int]:
+        """Cantidad de trabajos en cada estado"""
+        with self._candado:
+            filas = self._db.execute("SELECT estado, COUNT(*) FROM trabajos GROUP BY estado").fetchall()
+        resumen = {PENDIENTE: 0, TOMADO: 0, HECHO: 0, FALLIDO: 0}
+        resumen.update(dict(filas))
+        return resumen
+
+    def terminada(self) -> bool:
+        """True si no quedan trabajos pendientes ni tomados"""
+        resumen = self.resumen()
+        return resumen[PENDIENTE] == 0 and resumen[TOMADO] == 0
+
+    def sin_registrar(self) -> List[Tuple[int, Optional[str], dict]]:
+        """Trabajos hechos que el coordinador todavía no registró: (id, clave, resultado)"""
+        with self._candado:
+            filas = self._db.execute("SELECT id, clave, resultado FROM trabajos "
+                                     "WHERE estado = ? AND registrado = 0 ORDER BY id", (HECHO,)).fetchall()
+        return [(id, clave, json.loads(resultado)) for id, clave, resultado in filas]
+
+    def marcar_registrado(self, id: int) -> None:
+        self._transaccion(lambda cursor: cursor.execute("UPDATE trabajos SET registrado = 1 WHERE id = ?", (id,)))
+
+    def fallidos(self) -> List[Tuple[int, List[str], str]]:
+        """Trabajos que fallaron todas las veces: (id, colonias, último error)"""
+        with self._candado:
+            filas = self._db.execute("SELECT id, colonias, error FROM trabajos WHERE estado = ?",
+                                     (FALLIDO,)).fetchall()
+        return [(id, json.loads(colonias), error or "") for id, colonias, error in filas]
+
+    # -----------------------------------------------------------------
+    # Trabajadores
+    # -----------------------------------------------------------------
+    def tomar(self, trabajador: str) -> Optional[Trabajo]:
+        """
+        Toma un trabajo pendiente (o uno cuyo plazo venció) por `plazo`
+        segundos. None si no hay ninguno disponible ahora.
+        """
+        def consulta(cursor):
+            ahora = time.time()
+            # Los que agotaron sus intentos sin terminar quedan fallidos
+            cursor.execute("UPDATE trabajos SET estado = ?, error = COALESCE(error, 'plazo vencido') "
+                           "WHERE estado = ? AND vence < ? AND intentos >= ?",
+                           (FALLIDO, TOMADO, ahora, self.max_intentos))
+            fila = cursor.execute("SELECT id, dist, colonias, semilla, intentos, clave FROM trabajos "
+                                  "WHERE estado = ? OR (estado = ? AND vence < ?) ORDER BY id LIMIT 1",
+                                  (PENDIENTE, TOMADO, ahora)).fetchone()
+            if fila is None:
+                return None
+            id, dist, colonias, semilla, intentos, clave = fila
+            cursor.execute("UPDATE trabajos SET estado = ?, trabajador = ?, vence = ?, intentos = ? WHERE id = ?",
+                           (TOMADO, trabajador, ahora + self.plazo, intentos + 1, id))
+            return Trabajo(id, dist, json.loads(colonias), semilla, intentos + 1, clave)
+        return self._transaccion(consulta)
+
+    def renovar(self, id: int, trabajador: str) -> bool:
+        """Extiende el plazo de un trabajo tomado; False si ya no es de este trabajador."""
+        def consulta(cursor):
+            cursor.execute("UPDATE trabajos SET vence = ? WHERE id = ? AND estado = ? AND trabajador = ?",
+                           (time.time() + self.plazo, id, TOMADO, trabajador))
+            return cursor.rowcount == 1
+        return self._transaccion(consulta)
+
+    def completar(self, id: int, trabajador: str, resultado: dict) -> bool:
+        """
+        Guarda el resultado de un trabajo. Idempotente: si ya estaba hecho
+        (por otro trabajador que lo tomó al vencer el plazo) no cambia nada
+        y devuelve False.
+        """
+        def consulta(cursor):
+            cursor.execute("UPDATE trabajos SET estado = ?, trabajador = ?, resultado = ?, vence = NULL "
+                           "WHERE id = ? AND estado != ?",
+                           (HECHO, trabajador, json.dumps(resultado), id, HECHO))
+            return cursor.rowcount == 1
+        return self._transaccion(consulta)
+
+    def fallar(self, id: int, trabajador: str, error: str) -> None:
+        """Devuelve a la cola un trabajo que falló (o lo da por fallido si agotó sus intentos)."""
+        def consulta(cursor):
+            cursor.execute("UPDATE trabajos SET estado = CASE WHEN intentos >= ? THEN ? ELSE ? END, "
+                           "error = ?, vence = NULL WHERE id = ? AND estado = ? AND trabajador = ?",
+                           (self.max_intentos, FALLIDO, PENDIENTE, error, id, TOMADO, trabajador))
+        self._transaccion(consulta)
+
+
+# ---------------------------------------------------------------------
+# Acceso por TCP
+# ---------------------------------------------------------------------
+class _Servidor(BaseManager):
+    pass
+
+
+def _clave() -> bytes:
+    clave = os.environ.get('COMVIDA_CLAVE')
+    if not clave:
+        raise ValueError("Para usar la cola por TCP hay que definir la variable de entorno COMVIDA_CLAVE")
+    return clave.encode()
+
+
+def _direccion(destino: str) -> Tuple[str, int]:
+    host, _, puerto = destino.rpartition(':')
+    return host or 'localhost', int(puerto)
+
+
+def servir(cola: ColaTrabajos, direccion: str) -> threading.Thread:
+    """
+    Sirve la cola por TCP en `direccion` (host:puerto), en un hilo aparte.
+    Los clientes se autentican con la clave de COMVIDA_CLAVE.
+    """
+    _Servidor.register('cola', callable=lambda: cola)
+    servidor = _Servidor(address=_direccion(direccion), authkey=_clave()).get_server()
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    return hilo
+
+
+def conectar(destino: str, **opciones) -> ColaTrabajos:
+    """
+    Abre la cola de `destino`: un archivo SQLite, o host:puerto de una cola
+    servida por TCP (los métodos son los mismos).
+    """
+    if os.path.exists(destino) or ':' not in destino:
+        return ColaTrabajos(destino, **opciones)
+    _Servidor.register('cola')
+    cliente = _Servidor(address=_direccion(destino), authkey=_clave())
+    cliente.connect()
+    return cliente.cola()
@@ -2,15 +2,76 @@
 # COLONIA: una grupo de microorganismos del mismo tipo
 # =====================================================================
 
-from typing import List, Type, Optional
+import time
+from typing import Dict, List, Tuple, Type, Optional
 from .definiciones import *
-from .agar import Posicion, Movimiento, agar
+from .agar import Posicion, Movimiento, agar_actual
 from .microorganismo import Microorganismo
 
+
+class Ocupante:
+    """
+    Un MO de la colonia y su última decisión (movimiento y mitosis).
+
+    Las fichas de los MOs que mueren se guardan y se reutilizan para los que
+    nacen, así no se crea un Movimiento nuevo por cada nacimiento.
+    """
+    __slots__ = ('mo', 'mov', 'duplica')
+
+    def __init__(self):
+        self.mo: Optional[Microorganismo] = None
+        self.mov: Movimiento = Movimiento(0, 0)
+        self.duplica: bool = False
+
+    def olvidar(self) -> None:
+        """Borra la última decisión"""
+        self.mov.dx = 0
+        self.mov.dy = 0
+        self.duplica = False
+
+
+class ReservaMOs:
+    """
+    MOs muertos de una colonia, para reciclarlos en los nacimientos en vez
+    de crear uno nuevo (con Microorganismo.reiniciar()).
+
+    Guarda a lo sumo `maximo` MOs; los que sobran se dejan para el
+    recolector de basura.
+    """
+    __slots__ = ('maximo', 'mos', 'aciertos', 'fallos')
+
+    def __init__(self, maximo: int):
+        self.maximo: int = maximo
+        self.mos: List[Microorganismo] = []
+        self.aciertos: int = 0  # nacimientos con un MO reciclado
+        self.fallos: int = 0    # nacimientos con la reserva vacía
+
+    def tomar(self, clase_mo: Type[Microorganismo]) -> Microorganismo:
+        """Un MO recién creado o reciclado"""
+        if self.mos:
+            self.aciertos += 1
+            mo = self.mos.pop()
+            mo.reiniciar()
+            return mo
+        self.fallos += 1
+        return clase_mo()
+
+    def devolver(self, mo: Microorganismo) -> None:
+        """Guarda un MO muerto (si hay lugar)"""
+        if len(self.mos) < self.maximo:
+            self.mos.append(mo)
+
+    def vaciar(self) -> None:
+        self.mos.clear()
+
+
 class Colonia:
-    """ 
+    """
     Un grupo de microorganismos del mismo tipo.
 
+    Los MOs se guardan en un diccionario por posición, así la memoria crece
+    con la población y no con el tamaño del plato.
+
     No modificar esta clase!
     @autor Diego (traducido a Python también por Diego)
     """
@@ -21,95 +82,128 @@ class Colonia:
         self.max_x: int = 2 * radio
         self.max_y: int = 2 * radio
         self.clase_mo = clase_mo
+        # Agar de la simulación que crea la colonia (el activo al crearla)
+        self.agar = agar_actual()
 
-        # Rejillas internas
-        self.mis_mos: List[List[Optional[Microorganismo]]] = [
-            [None for _ in range(self.max_y)] for _ in range(self.max_x)
-        ]
-        self.movimientos: List[List[Movimiento]] = [
-            [Movimiento(0, 0) for _ in range(self.max_y)] for _ in range(self.max_x)
-        ]
-        self.duplicaciones: List[List[bool]] = [
-            [False for _ in range(self.max_y)] for _ in range(self.max_x)
-        ]
+        # MOs vivos por posición (x, y) y fichas libres para reutilizar
+        self.ocupantes: Dict[Tuple[int, int], Ocupante] = {}
+        self.libres: List[Ocupante] = []
         # Protótipo de MO para obtener nombre y autor
         self.proto_mo: Microorganismo = self.clase_mo()
+        # Instrumentación y perfilado opcionales, los asigna Petri
+        self.instr = None
+        self.perfilador = None
+        # Reserva opcional de MOs muertos para reciclar (ver Petri.reciclar_mos())
+        self.reserva: Optional[ReservaMOs] = None
+
+    # Vuelve a una colonia vacía de otra clase, guardando las fichas para reutilizarlas
+    def reiniciar(self, clase_mo: Type[Microorganismo], identidad: int) -> None:
+        self.identidad = identidad
+        self.n_mos_vivos = 0
+        # Los MOs de la partida anterior se reciclan si la clase es la misma
+        reciclar = self.reserva is not None and clase_mo is self.clase_mo
+        if self.reserva is not None and not reciclar:
+            self.reserva.vaciar()
+        self.clase_mo = clase_mo
+        self.agar = agar_actual()
+        for ocupante in self.ocupantes.values():
+            if reciclar:
+                self.reserva.devolver(ocupante.mo)
+            ocupante.mo = None
+            ocupante.olvidar()
+            self.libres.append(ocupante)
+        self.ocupantes.clear()
+        self.proto_mo = self.clase_mo()
+        self.instr = None
+        self.perfilador = None
+
+    # Saca todos los MOs de la colonia, ordenados por posición (para los motores
+    # en los que los MOs viven en otros procesos)
+    def extraer(self) -> List[Tuple[int, int, Microorganismo]]:
+        extraidos = [(x, y, ocupante.mo) for (x, y), ocupante in sorted(self.ocupantes.items())]
+        for ocupante in self.ocupantes.values():
+            ocupante.mo = None
+            ocupante.olvidar()
+            self.libres.append(ocupante)
+        self.ocupantes.clear()
+        return extraidos
 
     # Movimiento que quiere hacer el de la posicion x,y
     def movimiento(self, x: int, y: int) -> Movimiento:
-        try:
-            return self.movimientos[x][y]
-        except IndexError:
-            return Movimiento(0, 0)
-    
+        ocupante = self.ocupantes.get((x, y))
+        return ocupante.mov if ocupante is not None else Movimiento(0, 0)
+
     # Si el MO intento moverse devuelve True
     def movio(self, x: int, y: int) -> bool:
-        try:
-            return self.movimientos[x][y].dx != 0 or self.movimientos[x][y].dy != 0
-        except IndexError:
-            return False
-    
+        ocupante = self.ocupantes.get((x, y))
+        return ocupante is not None and (ocupante.mov.dx != 0 or ocupante.mov.dy != 0)
+
     # Si el MO intento reproducirse devuelve True
     def duplica(self, x: int, y: int) -> bool:
-        try:
-            return self.duplicaciones[x][y]
-        except IndexError:
-            return False
+        ocupante = self.ocupantes.get((x, y))
+        return ocupante is not None and ocupante.duplica
 
     # Elimina un MO
     def eliminar(self, x: int, y: int) -> None:
-        try:
-            if self.mis_mos[x][y] is not None:
-                del self.mis_mos[x][y]
-                self.mis_mos[x][y] = None
-                self.n_mos_vivos -= 1
-                self.movimientos[x][y].dx = 0
-                self.movimientos[x][y].dy = 0
-                self.duplicaciones[x][y] = False
-        except IndexError:
-            return
+        ocupante = self.ocupantes.pop((x, y), None)
+        if ocupante is not None:
+            if self.reserva is not None:
+                self.reserva.devolver(ocupante.mo)
+            ocupante.mo = None
+            ocupante.olvidar()
+            self.libres.append(ocupante)
+            self.n_mos_vivos -= 1
 
     # Crea un nuevo MO
     def crear(self, x: int, y: int) -> None:
-        try:
-            if self.mis_mos[x][y] is None:
-                self.mis_mos[x][y] = self.clase_mo()
-                self.n_mos_vivos += 1
-        except IndexError:
-            return
+        if (x, y) not in self.ocupantes:
+            ocupante = self.libres.pop() if self.libres else Ocupante()
+            ocupante.mo = self.clase_mo() if self.reserva is None else self.reserva.tomar(self.clase_mo)
+            self.ocupantes[(x, y)] = ocupante
+            self.n_mos_vivos += 1
+
+    # Pone en x,y un MO ya creado (al restaurar un punto de control)
+    def insertar(self, x: int, y: int, mo: Microorganismo, mov: Movimiento, duplica: bool) -> None:
+        if (x, y) not in self.ocupantes:
+            ocupante = self.libres.pop() if self.libres else Ocupante()
+            ocupante.mo = mo
+            ocupante.mov.dx, ocupante.mov.dy = mov.dx, mov.dy
+            ocupante.duplica = duplica
+            self.ocupantes[(x, y)] = ocupante
+            self.n_mos_vivos += 1
 
     # Mueve un MO de lugar
     def mover(self, anterior: Posicion, nueva: Posicion) -> None:
-        try:
-            self.mis_mos[nueva.x][nueva.y] = self.mis_mos[anterior.x][anterior.y]
-            self.mis_mos[anterior.x][anterior.y] = None
-            self.movimientos[anterior.x][anterior.y].dx = 0
-            self.movimientos[anterior.x][anterior.y].dy = 0
-            self.duplicaciones[anterior.x][anterior.y] = False
-        except IndexError:
-            return
+        ocupante = self.ocupantes.pop((anterior.x, anterior.y), None)
+        if ocupante is not None:
+            ocupante.olvidar()
+            self.ocupantes[(nueva.x, nueva.y)] = ocupante
 
     # Le da la posibilidad al MO de actuar (moverse y/o reproducirse)
     def vivir(self, x: int, y: int) -> None:
         x %= self.max_x
         y %= self.max_y # por las dudas nomas...
 
-        try:
-            if self.mis_mos[x][y] is not None:
-                pos = Posicion(x, y)
-                mo = self.mis_mos[x][y]
-                # Actualizar estado del microorganismo
-                mo.actualizar(self.identidad, pos, agar.energia(x, y))
-                # Pedir al microorganismo que decida su movimiento
-                mo.decidir_movimiento(self.movimientos[x][y])
-                # Consultar si quiere mitosis (reproducirse)
-                self.duplicaciones[x][y] = mo.quiere_mitosis()
-            else:
-                self.movimientos[x][y].dx = 0
-                self.movimientos[x][y].dy = 0
-                self.duplicaciones[x][y] = False
-        except IndexError:
-            return
+        ocupante = self.ocupantes.get((x, y))
+        if ocupante is not None:
+            pos = Posicion(x, y)
+            mo = ocupante.mo
+            if self.instr is not None:
+                t0 = time.perf_counter()
+            # Actualizar estado del microorganismo
+            mo.actualizar(self.identidad, pos, self.agar.energia(x, y))
+            if self.perfilador is not None:
+                self.perfilador.antes()
+            # Pedir al microorganismo que decida su movimiento
+            mo.decidir_movimiento(ocupante.mov)
+            # Consultar si quiere mitosis (reproducirse)
+            ocupante.duplica = mo.quiere_mitosis()
+            if self.perfilador is not None:
+                self.perfilador.despues()
+            if self.instr is not None:
+                self.instr.sumar('vivir', time.perf_counter() - t0)
+                if ocupante.duplica:
+                    self.instr.contar(self.identidad - 1, 'mitosis_pedidas')
 
     def n_vivos(self) -> int:
         return self.n_mos_vivos
@@ -0,0 +1,254 @@
+# =====================================================================
+# COORDINACION: Torneo distribuido entre un coordinador y trabajadores
+# El coordinador pone en la cola todas las partidas de la liga (parejas x
+# distribuciones x semillas), espera los resultados y los registra en el
+# ranking y en el cache. Cada trabajador, en este u otro equipo, toma
+# partidas de la cola, las juega headless y devuelve el resultado.
+# =====================================================================
+
+import io
+import os
+import time
+import zlib
+import socket
+import threading
+import contextlib
+import traceback
+from itertools import combinations
+from typing import Dict, List, Optional, Type
+
+from .definiciones import *
+from .microorganismo import Microorganismo
+from .lote import CorredorLote
+from .ranking import RankingSystem
+from .terminacion import ReglaTerminacion
+from .dinamica import DinamicaNutrientes
+from .cache_resultados import CacheResultados
+from .distribuciones import registro_distribuciones
+from .cola import ColaTrabajos, Trabajo, HECHO, TOMADO, FALLIDO, PENDIENTE
+
+
+def nombre_clase(clase: Type[Microorganismo]) -> str:
+    """Nombre con el que una clase de MO viaja en la cola (igual en todos los equipos)"""
+    return f'{clase.__module__}.{clase.__qualname__}'
+
+
+class Coordinador:
+    """
+    Arma la liga en la cola y registra los resultados a medida que llegan.
+
+    Encolar es idempotente (las partidas ya encoladas se ignoran) y cada
+    resultado se registra una sola vez, así el coordinador se puede cortar
+    y volver a lanzar sobre la misma cola.
+    """
+
+    def __init__(self, cola: ColaTrabajos, clases_mo: Dict[int, Type[Microorganismo]], radio: int = R,
+                 reglas: Optional[List[ReglaTerminacion]] = None,
+                 dinamicas: Optional[List[DinamicaNutrientes]] = None,
+                 ranking: Optional[RankingSystem] = None, cache: Optional[CacheResultados] = None):
+        """
+        Args:
+            cola: cola de trabajos
+            clases_mo: clases de microorganismos disponibles (por índice)
+            radio: radio del plato de todas las partidas
+            reglas: reglas de terminación anticipada de cada partida
+            dinamicas: dinámicas de los nutrientes de cada partida
+            ranking: sistema de ranking donde se guardan los resultados
+            cache: cache de resultados (las partidas que ya están no se encolan para jugar)
+        """
+        self.cola = cola
+        self.clases_mo = clases_mo
+        self.radio = radio
+        self.reglas = reglas or []
+        self.dinamicas = dinamicas or []
+        self.ranking = ranking
+        self.cache = cache
+        self.registrados = 0
+
+    def encolar(self, participantes: List[int], distribuciones: List[int], semillas: int,
+                semilla: int = 0) -> int:
+        """
+        Pone en la cola `semillas` partidas de cada pareja en cada distribución
+        (alternando los lados). Devuelve cuántas partidas nuevas se agregaron.
+        """
+        self.cola.configurar(radio=self.radio, reglas=self.reglas, dinamicas=self.dinamicas)
+        trabajos = []
+        for a, b in combinations(participantes, 2):
+            clase_a, clase_b = self.clases_mo[a], self.clases_mo[b]
+            for dist in distribuciones:
+                for k in range(semillas):
+                    clases = [clase_a, clase_b] if k % 2 == 0 else [clase_b, clase_a]
+                    texto = f'{semilla}:{nombre_clase(clase_a)}:{nombre_clase(clase_b)}:{dist}:{k}'
+                    semilla_partida = zlib.crc32(texto.encode())
+                    clave, resultado = None, None
+                    if self.cache is not None:
+                        clave = self.cache.clave(clases, dist, self.radio, semilla_partida,
+                                                 self.reglas, self.dinamicas)
+                        resultado = self.cache.buscar(clave) if clave is not None else None
+                    trabajos.append((dist, [nombre_clase(c) for c in clases], semilla_partida, clave, resultado))
+        return self.cola.agregar(trabajos)
+
+    def registrar(self) -> int:
+        """
+        Registra en el ranking y en el cache los resultados nuevos. Devuelve
+        cuántos. En el cache sólo entran los resultados de trabajadores que
+        comprobaron que su código da la misma clave que el del coordinador.
+        """
+        nuevos = 0
+        for id, clave, resultado in self.cola.sin_registrar():
+            verificada = resultado.pop('clave_verificada', None)
+            if self.cache is not None and clave is not None and verificada == clave \
+                    and not resultado.get('en_cache', False):
+                self.cache.guardar(clave, resultado)
+            if self.ranking is not None and resultado.get('completada', False):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.ranking.guardar_resultado_competencia(resultado)
+            self.cola.marcar_registrado(id)
+            nuevos += 1
+        self.registrados += nuevos
+        return nuevos
+
+    def esperar(self, intervalo: float = 2.0) -> Dict[str, int]:
+        """Registra resultados hasta que no quedan partidas pendientes ni tomadas."""
+        anterior = None
+        while True:
+            self.registrar()
+            resumen = self.cola.resumen()
+            if resumen != anterior:
+                total = sum(resumen.values())
+                print(f"  Hechas: {resumen[HECHO]}/{total}, en juego: {resumen[TOMADO]}, "
+                      f"pendientes: {resumen[PENDIENTE]}, fallidas: {resumen[FALLIDO]}")
+                anterior = resumen
+            if resumen[PENDIENTE] == 0 and resumen[TOMADO] == 0:
+                break
+            time.sleep(intervalo)
+        self.registrar()
+        if self.ranking is not None:
+            self.ranking.generar_ranking_diario()
+        return resumen
+
+
+class Trabajador:
+    """
+    Toma partidas de la cola y las juega headless, una detrás de otra sobre
+    el mismo plato (CorredorLote). Mientras juega, un hilo renueva el plazo
+    del trabajo; si el proceso muere, el plazo vence y la partida vuelve a
+    la cola para otro trabajador.
+
+    Antes de jugar una partida que va al cache, recalcula su clave con el
+    código de este equipo (MOs, motor y distribución): si no es la del
+    coordinador, el código es otro, la partida se da por fallida y el
+    trabajador deja de jugar.
+    """
+
+    def __init__(self, cola: ColaTrabajos, clases_mo: Dict[int, Type[Microorganismo]],
+                 nombre: Optional[str] = None):
+        """
+        Args:
+            cola: cola de trabajos (local o remota)
+            clases_mo: clases de microorganismos disponibles en este equipo
+            nombre: identificación del trabajador (por omisión, equipo:pid)
+        """
+        self.cola = cola
+        self.clases_mo = clases_mo
+        self.nombre = nombre or f'{socket.gethostname()}:{os.getpid()}'
+        self.indices = {nombre_clase(clase): i for i, clase in clases_mo.items()}
+        self.jugadas = 0
+        configuracion = cola.configuracion()
+        self.radio = configuracion.get('radio', R)
+        self.reglas = configuracion.get('reglas')
+        self.dinamicas = configuracion.get('dinamicas')
+        self.corredor = CorredorLote(clases_mo, radio=self.radio, reglas=self.reglas, dinamicas=self.dinamicas)
+        self.cache = CacheResultados()  # sólo para calcular las claves de las partidas
+
+    def verificar(self, trabajo: Trabajo) -> bool:
+        """True si la clave del cache de la partida es la misma con el código de este equipo"""
+        if trabajo.clave is None:
+            return True
+        clases = [self.clases_mo[self.indices[n]] for n in trabajo.colonias]
+        return self.cache.clave(clases, trabajo.dist, self.radio, trabajo.semilla,
+                                self.reglas, self.dinamicas) == trabajo.clave
+
+    def _renovar(self, id: int, listo: threading.Event) -> None:
+        intervalo = self.cola.duracion_plazo() / 3
+        while not listo.wait(intervalo):
+            if not self.cola.renovar(id, self.nombre):
+                return  # el trabajo ya no es nuestro (venció y lo tomó otro)
+
+    def ejecutar(self, espera: float = 2.0) -> int:
+        """
+        Juega partidas hasta que la cola termina. Si no hay trabajos libres
+        pero otros trabajadores tienen partidas en juego, espera: pueden
+        volver a la cola si su trabajador muere. Devuelve las partidas jugadas.
+        """
+        # Importar matplotlib en modo sin gráficos antes de usar Graficadora
+        import matplotlib
+        matplotlib.use('Agg')
+
+        while True:
+            try:
+                trabajo = self.cola.tomar(self.nombre)
+                if trabajo is None and self.cola.terminada():
+                    return self.jugadas
+            except (EOFError, ConnectionError):
+                # Una cola servida por TCP se cierra cuando el coordinador termina
+                print(f"  [{self.nombre}] la cola ya no responde: fin")
+                return self.jugadas
+            if trabajo is None:
+                time.sleep(espera)
+                continue
+
+            faltan = [n for n in trabajo.colonias if n not in self.indices]
+            if faltan:
+                self.cola.fallar(trabajo.id, self.nombre, f"MOs no disponibles en {self.nombre}: {', '.join(faltan)}")
+                continue
+            if trabajo.dist not in registro_distribuciones().distribuciones:
+                self.cola.fallar(trabajo.id, self.nombre, f"Distribución {trabajo.dist} no disponible en {self.nombre}")
+                continue
+            if not self.verificar(trabajo):
+                # Con otro código los resultados serían otros (y se guardarían en el cache del coordinador)
+                self.cola.fallar(trabajo.id, self.nombre, f"El código de {self.nombre} (MOs, motor o distribución) "
+                                                          f"no es el del coordinador: la clave del cache no coincide")
+                print(f"  [{self.nombre}] el código de este equipo no es el del coordinador "
+                      f"(partida {trabajo.id}): actualizar mos/, vida/ y distribuciones/. Fin")
+                return self.jugadas
+
+            listo = threading.Event()
+            renovacion = threading.Thread(target=self._renovar, args=(trabajo.id, listo), daemon=True)
+            renovacion.start()
+            try:
+                colonias = [self.indices[n] for n in trabajo.colonias]
+                resultado = self.corredor.jugar(trabajo.dist, colonias, trabajo.semilla)
+            except Exception:
+                listo.set()
+                self.corredor.petri = None  # el plato puede haber quedado a medias
+                self.cola.fallar(trabajo.id, self.nombre, traceback.format_exc(limit=5))
+                print(f"  [{self.nombre}] error en la partida {trabajo.id} (intento {trabajo.intentos})")
+                continue
+            listo.set()
+            renovacion.join()
+            if trabajo.clave is not None:
+                resultado['clave_verificada'] = trabajo.clave
+            registrado = self.cola.completar(trabajo.id, self.nombre, resultado)
+            self.jugadas += 1
+            estado = "" if registrado else " (ya estaba hecha)"
+            print(f"  [{self.nombre}] partida {trabajo.id}: d{trabajo.dist} {resultado['enfrentamiento']}, "
+                  f"gana {resultado['ganador']} ({resultado['duracion']} pasos){estado}")
+
+
+def trabajar(destino: str, clases_mo: Dict[int, Type[Microorganismo]]) -> int:
+    """Abre la cola de `destino` (archivo o host:puerto) y juega partidas hasta que termine."""
+    from .cola import conectar
+    return Trabajador(conectar(destino), clases_mo).ejecutar()
+
+
+def lanzar_trabajadores(destino: str, clases_mo: Dict[int, Type[Microorganismo]], n: int) -> list:
+    """Lanza n trabajadores locales en procesos aparte (cada uno abre su propia conexión a la cola)."""
+    import multiprocessing as mp
+    contexto = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+    procesos = []
+    for _ in range(n):
+        proceso = contexto.Process(target=trabajar, args=(destino, clases_mo), daemon=True)
+        proceso.start()
+        procesos.append(proceso)
+    return procesos
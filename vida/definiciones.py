@@ -23,14 +23,22 @@ E_MOVERSE = 10
 # Número máximo de colonias soportadas por esta compilación
 MAX_COLS = 8
 
-# Número de colonias en esta ejecución (actual)
+# Número de colonias por omisión en una ejecución (pueden ser hasta MAX_COLS)
 N_COL = 2
 
+# Colores de las colonias en la visualización (uno por colonia, hasta MAX_COLS)
+COLORES = ['red', 'blue', 'green', 'orange', 'purple', 'cyan', 'magenta', 'brown']
+
 # Radio de la cápsula de Petri
 R = 25
 
 # Límite de FLOP permitido por movimiento de colonias (no usado directamente)
 PROD_X_COL = 25e6
 
-# Cantidad total de distribuciones de nutrientes disponibles
+# Cantidad de distribuciones de nutrientes incorporadas (las de la carpeta
+# distribuciones/ se numeran a partir de MAX_DNUTRI + 1)
 MAX_DNUTRI = 6
+
+# Nutrientes medios por celda a los que se normalizan las distribuciones
+# agregadas (los de la distribución uniforme incorporada)
+NUTRI_MEDIO = MAX_NUTRI / 11.062
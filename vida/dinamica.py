@@ -0,0 +1,128 @@
+# =====================================================================
+# DINAMICA: Rebrote, difusión y decaimiento de los nutrientes
+# Cada dinámica es un paso vectorizado sobre toda la matriz de nutrientes
+# que se aplica cada `cada` pasos de tiempo, así su costo por paso es
+# fijo y no depende de la cantidad de MOs.
+# =====================================================================
+
+from typing import Optional
+import numpy as np
+
+
+class DinamicaNutrientes:
+    """
+    Clase base para las dinámicas de los nutrientes.
+
+    Las dinámicas trabajan sobre la matriz de nutrientes en sus propias
+    coordenadas (la deriva sólo cambia el desplazamiento rx, ry del agar),
+    que es toroidal: lo que sale por un borde entra por el opuesto.
+    """
+
+    nombre = "dinamica abstracta"
+
+    def __init__(self, cada: int = 1):
+        """
+        Args:
+            cada: se aplica en los pasos de tiempo múltiplos de `cada`
+        """
+        if cada < 1:
+            raise ValueError(f"{self.nombre}: 'cada' debe ser al menos 1")
+        self.cada = cada
+
+    def __getstate__(self) -> dict:
+        # En los puntos de control se guarda sólo la configuración: las
+        # matrices se vuelven a preparar con reiniciar()
+        return {k: (np.zeros((0, 0)) if isinstance(v, np.ndarray) else v) for k, v in self.__dict__.items()}
+
+    def configuracion(self) -> dict:
+        """Parámetros de la dinámica (sus atributos numéricos), para el cache de resultados"""
+        return {k: v for k, v in vars(self).items() if isinstance(v, (bool, int, float, str))}
+
+    def reiniciar(self, inicial: np.ndarray) -> None:
+        """Se llama al comenzar la competencia, con los nutrientes iniciales (no modificarlos)."""
+        pass
+
+    def aplicar(self, nutri: np.ndarray) -> None:
+        """Actualiza la matriz de nutrientes en el lugar."""
+        pass
+
+
+class Rebrote(DinamicaNutrientes):
+    """
+    Las celdas con menos nutrientes que al comienzo recuperan una fracción
+    `tasa` de lo que les falta para volver a la distribución inicial.
+    """
+
+    nombre = "rebrote"
+
+    def __init__(self, tasa: float, cada: int = 1):
+        super().__init__(cada)
+        if not 0 < tasa <= 1:
+            raise ValueError("rebrote: la tasa debe estar en (0, 1]")
+        self.tasa = tasa
+        self.inicial: Optional[np.ndarray] = None
+        self._falta = np.zeros((0, 0))
+
+    def reiniciar(self, inicial: np.ndarray) -> None:
+        self.inicial = inicial
+        if self._falta.shape != inicial.shape:
+            self._falta = np.zeros_like(inicial)
+
+    def aplicar(self, nutri: np.ndarray) -> None:
+        falta = self._falta
+        np.subtract(self.inicial, nutri, out=falta)
+        np.maximum(falta, 0.0, out=falta)
+        falta *= self.tasa
+        nutri += falta
+
+
+class Difusion(DinamicaNutrientes):
+    """
+    Difusión con el laplaciano de 5 puntos: cada celda intercambia con sus
+    cuatro vecinas una fracción `coef` de la diferencia. Conserva el total
+    de nutrientes y, con coef <= 0.25, nunca deja celdas negativas.
+    """
+
+    nombre = "difusion"
+
+    def __init__(self, coef: float, cada: int = 1):
+        super().__init__(cada)
+        if not 0 < coef <= 0.25:
+            raise ValueError("difusion: el coeficiente debe estar en (0, 0.25]")
+        self.coef = coef
+        self._laplaciano = np.zeros((0, 0))
+
+    def reiniciar(self, inicial: np.ndarray) -> None:
+        if self._laplaciano.shape != inicial.shape:
+            self._laplaciano = np.zeros_like(inicial)
+
+    def aplicar(self, nutri: np.ndarray) -> None:
+        lap = self._laplaciano
+        np.multiply(nutri, -4.0, out=lap)
+        # Vecinas en x (con vuelta en los bordes)
+        lap[1:, :] += nutri[:-1, :]
+        lap[0, :] += nutri[-1, :]
+        lap[:-1, :] += nutri[1:, :]
+        lap[-1, :] += nutri[0, :]
+        # Vecinas en y
+        lap[:, 1:] += nutri[:, :-1]
+        lap[:, 0] += nutri[:, -1]
+        lap[:, :-1] += nutri[:, 1:]
+        lap[:, -1] += nutri[:, 0]
+        lap *= self.coef
+        nutri += lap
+
+
+class Decaimiento(DinamicaNutrientes):
+    """Todas las celdas pierden una fracción `tasa` de sus nutrientes."""
+
+    nombre = "decaimiento"
+
+    def __init__(self, tasa: float, cada: int = 1):
+        super().__init__(cada)
+        if not 0 < tasa <= 1:
+            raise ValueError("decaimiento: la tasa debe estar en (0, 1]")
+        self.tasa = tasa
+
+    def aplicar(self, nutri: np.ndarray) -> None:
+        nutri *= 1.0 - self.tasa
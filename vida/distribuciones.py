@@ -0,0 +1,303 @@
+# =====================================================================
+# DISTRIBUCIONES: Registro de distribuciones de nutrientes
+# Además de las 6 incorporadas, se descubren las de la carpeta
+# distribuciones/ (módulos Python, archivos .npy e imágenes). Cada campo
+# generado se guarda en disco como .npy y se abre mapeado en memoria en
+# las partidas siguientes. El número de cada distribución agregada queda
+# anotado en distribuciones/numeros.json y no cambia al agregar otras.
+# =====================================================================
+
+import os
+import re
+import json
+import math
+import inspect
+import importlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .definiciones import *
+
+# Carpeta de distribuciones agregadas (junto a mos/) y cache de campos generados
+CARPETA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'distribuciones')
+CACHE = os.path.join('resultados', 'cache_nutrientes')
+
+# Índice con el número de cada distribución agregada (por su identificador)
+INDICE = 'numeros.json'
+
+# Extensiones de imagen que se leen como distribución (escala de grises)
+IMAGENES = ('.png', '.jpg', '.jpeg')
+
+
+class Distribucion(ABC):
+    """
+    Clase base abstracta de las distribuciones de nutrientes.
+
+    Una subclase define generar(), que devuelve la matriz [x, y] de
+    nutrientes para un plato de max_x por max_y. Si `normalizar` es True,
+    el registro escala el campo para que la media por celda sea NUTRI_MEDIO,
+    como las distribuciones incorporadas. Hay que cambiar `version` cada vez
+    que cambia lo que genera, así no se usan campos viejos del cache. Con
+    `numero` se puede fijar el número de la distribución (mayor que
+    MAX_DNUTRI); si no, el registro le asigna el siguiente libre.
+    """
+
+    nombre = "distribución abstracta"
+    version = 1
+    normalizar = True
+    numero: Optional[int] = None
+
+    @abstractmethod
+    def generar(self, max_x: int, max_y: int) -> np.ndarray:
+        pass
+
+    def identificador(self) -> str:
+        """Nombre estable de la distribución (con él se guarda su número en el índice)"""
+        return f'{type(self).__module__}.{type(self).__qualname__}'
+
+    def clave(self) -> str:
+        """Nombre (sin tamaño) del campo en el cache"""
+        base = re.sub(r'[^0-9A-Za-z]+', '_', f'{type(self).__module__}.{self.nombre}').strip('_')
+        return f'{base}_v{self.version}'
+
+
+def nutrientes_incorporados(x: int, y: int, dist: int, max_x: int, max_y: int) -> float:
+    """Nutrientes de la celda x,y en las distribuciones incorporadas (1 a MAX_DNUTRI)."""
+    if dist == 1:  # Plano inclinado
+        return MAX_NUTRI * (max_x - x) * (max_y - y) / (max_x * max_y) / 2.875
+    elif dist == 2:  # Barra vertical
+        return MAX_NUTRI / 4.2 if max_x // 2 - 5 < x < max_x // 2 + 5 else 0.0
+    elif dist == 3:  # Anillo
+        center_x, center_y = 0.5 * max_x, 0.5 * max_y
+        dist_from_center = (x - center_x) ** 2 + (y - center_y) ** 2
+        return MAX_NUTRI / 1.008 if 40 < dist_from_center < 115 else 0.0
+    elif dist == 4:  # Rejilla (lattice)
+        if (x + y) % (max_x // 4) <= 1 or (y - x) % (max_x // 3) <= 1:
+            return MAX_NUTRI * (max_x - x) * (max_y - y) / (max_x * max_y) * 1.277
+        return 0.0
+    elif dist == 5:  # Dos gaussianas
+        term1 = math.exp(-((x - 0.6 * max_x / 2) / (max_x / 8)) ** 2 - ((y - 0.6 * max_y / 2) / (max_y / 8)) ** 2)
+        term2 = math.exp(-((x - 1.4 * max_x / 2) / (max_x / 8)) ** 2 - ((y - 1.4 * max_y / 2) / (max_y / 8)) ** 2)
+        return MAX_NUTRI * (term1 + term2)
+    elif dist == 6:  # Hambruna (uniforme)
+        return MAX_NUTRI / 11.062
+    else:
+        return 0.0
+
+
+class Incorporada(Distribucion):
+    """Una de las distribuciones originales del juego (no se normaliza)"""
+
+    normalizar = False
+
+    def __init__(self, numero: int, nombre: str):
+        self.numero = numero
+        self.nombre = nombre
+
+    def identificador(self) -> str:
+        return f'incorporada:{self.numero}'
+
+    def generar(self, max_x: int, max_y: int) -> np.ndarray:
+        campo = np.zeros((max_x, max_y))
+        for x in range(max_x):
+            for y in range(max_y):
+                campo[x, y] = nutrientes_incorporados(x, y, self.numero, max_x, max_y)
+        return campo
+
+
+class DistribucionArchivo(Distribucion):
+    """
+    Distribución leída de un archivo .npy (matriz [x, y]) o de una imagen
+    (más clara = más nutrientes, con la fila de arriba en y máximo). Se
+    reescala al plato tomando el valor más cercano.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.nombre = os.path.basename(ruta)
+        # El archivo cambió si cambió su tamaño o su fecha
+        estado = os.stat(ruta)
+        self.version = f'{estado.st_size}_{estado.st_mtime_ns}'
+
+    def identificador(self) -> str:
+        return f'archivo:{self.nombre}'
+
+    def clave(self) -> str:
+        base = re.sub(r'[^0-9A-Za-z]+', '_', f'archivo_{self.nombre}').strip('_')
+        return f'{base}_{self.version}'
+
+    def generar(self, max_x: int, max_y: int) -> np.ndarray:
+        if self.ruta.lower().endswith('.npy'):
+            origen = np.load(self.ruta).astype(np.float64)
+        else:
+            import matplotlib.image
+            imagen = np.asarray(matplotlib.image.imread(self.ruta), dtype=np.float64)
+            if imagen.ndim == 3:
+                imagen = imagen[:, :, :3].mean(axis=2)
+            origen = imagen[::-1].T  # filas de la imagen -> y, columnas -> x
+        if origen.ndim != 2 or 0 in origen.shape:
+            raise ValueError(f"{self.ruta}: se esperaba una matriz de dos dimensiones")
+        ix = np.arange(max_x) * origen.shape[0] // max_x
+        iy = np.arange(max_y) * origen.shape[1] // max_y
+        return origen[np.ix_(ix, iy)]
+
+
+class RegistroDistribuciones:
+    """
+    Distribuciones de nutrientes disponibles, numeradas desde 1.
+
+    Las incorporadas ocupan los números 1 a MAX_DNUTRI; las de la carpeta
+    distribuciones/ (de cada módulo Python se toma la primera subclase de
+    Distribucion, como con los MOs) tienen el número anotado en el índice
+    de la carpeta. Una distribución nueva recibe el siguiente número libre
+    y se anota, así los números de las demás no cambian nunca (y los lotes,
+    colas, puntos de control y resultados siguen refiriéndose a la misma).
+    """
+
+    def __init__(self, carpeta: Optional[str] = CARPETA, cache: Optional[str] = CACHE):
+        """
+        Args:
+            carpeta: carpeta donde se buscan distribuciones agregadas (None: sólo las incorporadas)
+            cache: carpeta donde se guardan los campos generados (None: no se guardan)
+        """
+        self.cache = cache
+        self.distribuciones: Dict[int, Distribucion] = {}
+        # Números asignados (identificador -> número), también de las que ya no están
+        self.indice: Dict[str, int] = {}
+        self.ruta_indice = os.path.join(carpeta, INDICE) if carpeta is not None else None
+        if self.ruta_indice is not None and os.path.isfile(self.ruta_indice):
+            try:
+                with open(self.ruta_indice, 'r', encoding='utf-8') as f:
+                    self.indice = {str(k): int(v) for k, v in json.load(f).items()}
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Advertencia: no se pudo leer el índice de distribuciones {self.ruta_indice}: {e}")
+        nombres = ["Plano inclinado", "Barra vertical", "Anillo", "Rejilla", "Dos gaussianas", "Hambruna"]
+        for numero, nombre in enumerate(nombres, 1):
+            self.distribuciones[numero] = Incorporada(numero, nombre)
+        if carpeta is not None and os.path.isdir(carpeta):
+            self.descubrir(carpeta)
+
+    def descubrir(self, carpeta: str) -> None:
+        """Agrega las distribuciones de una carpeta (módulos .py, .npy e imágenes)."""
+        paquete = os.path.basename(os.path.normpath(carpeta))
+        for archivo in sorted(os.listdir(carpeta)):
+            ruta = os.path.join(carpeta, archivo)
+            base, extension = os.path.splitext(archivo)
+            try:
+                if extension == '.py' and archivo != '__init__.py':
+                    modulo = importlib.import_module(f'{paquete}.{base}')
+                    for _, clase in inspect.getmembers(modulo, inspect.isclass):
+                        if issubclass(clase, Distribucion) and clase.__module__ == modulo.__name__ \
+                                and not inspect.isabstract(clase):
+                            self.agregar(clase())
+                            break
+                elif extension.lower() == '.npy' or extension.lower() in IMAGENES:
+                    self.agregar(DistribucionArchivo(ruta))
+            except Exception as e:
+                print(f"Error: no se pudo cargar la distribución desde {archivo}: {e}")
+
+    def agregar(self, distribucion: Distribucion) -> int:
+        """
+        Agrega una distribución y devuelve su número: el que fija la clase,
+        el del índice o, si es nueva, el siguiente libre (y se anota).
+
+        Raises:
+            ValueError: si el número ya es de otra distribución
+        """
+        identificador = distribucion.identificador()
+        numero = distribucion.numero or self.indice.get(identificador)
+        if numero is None:
+            numero = max([*self.distribuciones, *self.indice.values()]) + 1
+        if numero in self.distribuciones or numero <= MAX_DNUTRI:
+            ocupado = self.distribuciones.get(numero)
+            raise ValueError(f"el número {numero} ya es de la distribución "
+                             f"{ocupado.nombre if ocupado else 'incorporada'}")
+        self.distribuciones[numero] = distribucion
+        if self.indice.get(identificador) != numero:
+            self.indice[identificador] = numero
+            self._guardar_indice()
+        return numero
+
+    def _guardar_indice(self) -> None:
+        if self.ruta_indice is None:
+            return
+        try:
+            temporal = f'{self.ruta_indice}.{os.getpid()}.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(dict(sorted(self.indice.items(), key=lambda e: e[1])), f, indent=1, ensure_ascii=False)
+                f.write('\n')
+            os.replace(temporal, self.ruta_indice)
+        except OSError as e:
+            print(f"Advertencia: no se pudo guardar el índice de distribuciones {self.ruta_indice}: {e}")
+
+    def nombre(self, numero: int) -> str:
+        """Nombre de la distribución `numero` ('' si no existe)"""
+        distribucion = self.distribuciones.get(numero)
+        return distribucion.nombre if distribucion is not None else ''
+
+    def identificador(self, numero: int) -> str:
+        """Identificador estable de la distribución `numero` ('' si no existe)"""
+        distribucion = self.distribuciones.get(numero)
+        return distribucion.identificador() if distribucion is not None else ''
+
+    def maximo(self) -> int:
+        """Número de la última distribución disponible"""
+        return max(self.distribuciones)
+
+    def listar(self) -> List[str]:
+        return [f"{n}: {d.nombre}" for n, d in sorted(self.distribuciones.items())]
+
+    def campo(self, numero: int, max_x: int, max_y: int) -> np.ndarray:
+        """
+        Nutrientes iniciales de la distribución `numero` para un plato de
+        max_x por max_y, de sólo lectura.
+
+        La primera vez se generan y se guardan en el cache; después se abren
+        mapeados en memoria, sin volver a generarlos.
+        """
+        if numero not in self.distribuciones:
+            return np.zeros((max_x, max_y))  # como una distribución desconocida del original
+        distribucion = self.distribuciones[numero]
+        ruta = None
+        if self.cache is not None:
+            ruta = os.path.join(self.cache, f'{distribucion.clave()}_{max_x}x{max_y}.npy')
+            try:
+                return np.load(ruta, mmap_mode='r')
+            except (OSError, ValueError):
+                pass  # todavía no está (o está dañado): se genera
+
+        campo = np.array(distribucion.generar(max_x, max_y), dtype=np.float64)
+        if campo.shape != (max_x, max_y):
+            raise ValueError(f"La distribución {distribucion.nombre} generó un campo de {campo.shape}, "
+                             f"se esperaba {(max_x, max_y)}")
+        if distribucion.normalizar:
+            np.clip(campo, 0.0, None, out=campo)
+            total = campo.sum()
+            if total > 0:
+                campo *= NUTRI_MEDIO * max_x * max_y / total
+        campo.flags.writeable = False
+
+        if ruta is not None:
+            try:
+                os.makedirs(self.cache, exist_ok=True)
+                # Se escribe aparte y se renombra, por si hay otras partidas leyendo
+                temporal = f'{ruta}.{os.getpid()}.tmp'
+                with open(temporal, 'wb') as f:
+                    np.save(f, campo)
+                os.replace(temporal, ruta)
+            except OSError as e:
+                print(f"Advertencia: no se pudo guardar el campo de nutrientes en {ruta}: {e}")
+        return campo
+
+
+_registro: Optional[RegistroDistribuciones] = None
+
+
+def registro_distribuciones() -> RegistroDistribuciones:
+    """Registro compartido por todas las simulaciones del proceso (se crea al primer uso)"""
+    global _registro
+    if _registro is None:
+        _registro = RegistroDistribuciones()
+    return _registro
@@ -0,0 +1,683 @@
+# =====================================================================
+# ESPECTADORES: Servidor local para mirar una partida desde el navegador
+# Un servidor HTTP/WebSocket con asyncio (sólo la biblioteca estándar)
+# transmite la partida a todos los espectadores conectados: al entrar
+# reciben un cuadro completo y después sólo las celdas que cambiaron, en
+# binario. La simulación corre en otro hilo y nunca espera a la red: a
+# cada espectador le corresponde una cola corta y, si no da abasto, se le
+# descartan cuadros y se le manda uno completo cuando se pone al día.
+# Las partidas transmitidas se pueden grabar y volver a transmitir.
+# =====================================================================
+
+import json
+import time
+import queue
+import signal
+import base64
+import struct
+import asyncio
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .definiciones import *
+from .graficacion import Graficadora
+from .terminacion import ReglaTerminacion
+
+# Dirección por omisión: sólo este equipo
+DIRECCION = '127.0.0.1:8765'
+
+# Tipos de cuadro
+CLAVE = 1  # estado completo
+DELTA = 2  # celdas que cambiaron desde el cuadro anterior
+
+# Cabecera de cada cuadro: tipo, tiempo, rx, ry, cantidad de colonias (y
+# después una población uint32 por colonia)
+CABECERA = struct.Struct('<BIiiB')
+
+# Niveles en que se cuantizan los nutrientes (0 a NIVELES - 1)
+NIVELES = 16
+
+# Cuadros en la cola de cada espectador antes de empezar a descartar
+MAX_COLA = 8
+
+# Cuadros entregados al servidor y todavía no difundidos; si hay más, el
+# hilo de la simulación no entrega el paso (el siguiente incluye sus cambios)
+MAX_PENDIENTES = 4
+
+# Estados entregados a la grabación y todavía no escritos; si hay más, el
+# paso no se graba (el cuadro siguiente incluye sus cambios)
+MAX_GRABACION = 64
+
+# Colores de COLORES para el navegador
+COLORES_WEB = {'red': '#ff0000', 'blue': '#0000ff', 'green': '#008000', 'orange': '#ffa500',
+               'purple': '#800080', 'cyan': '#00ffff', 'magenta': '#ff00ff', 'brown': '#a52a2a'}
+
+# Comienzo de un archivo de grabación
+MAGIA = b'COMVIDA-TRANSMISION 1\n'
+
+_GUID_WS = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+_TEXTO, _BINARIO, _CIERRE, _PING, _PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+@dataclass
+class Estado:
+    """Lo que ven los espectadores en un paso de tiempo"""
+    tiempo: int
+    rx: int                  # desplazamiento de los nutrientes (como en Agar)
+    ry: int
+    ocup: np.ndarray         # uint8 [x * mx_y + y]: colonia de cada celda
+    nivel: np.ndarray        # uint8 [x * mx_y + y]: nutrientes cuantizados, sin desplazar
+    poblaciones: List[int]
+
+
+def capturar_estado(petri, tiempo: int, poblaciones: List[int], escala: float) -> Estado:
+    """Estado de la partida para los espectadores (escala: nutrientes del nivel máximo)"""
+    agar = petri.agar
+    nivel = np.minimum(agar.nutri * ((NIVELES - 1) / escala), NIVELES - 1).astype(np.uint8)
+    return Estado(tiempo, agar.rx % agar.mx_x, agar.ry % agar.mx_y,
+                  agar.ocup.astype(np.uint8).ravel(), nivel.ravel(), list(poblaciones))
+
+
+def cuadro_clave(estado: Estado) -> bytes:
+    """Cuadro completo: cabecera, poblaciones, colonias y nutrientes de todas las celdas"""
+    return b''.join([CABECERA.pack(CLAVE, estado.tiempo, estado.rx, estado.ry, len(estado.poblaciones)),
+                     np.asarray(estado.poblaciones, dtype='<u4').tobytes(),
+                     estado.ocup.tobytes(), estado.nivel.tobytes()])
+
+
+def cuadro_delta(anterior: Estado, estado: Estado) -> bytes:
+    """
+    Cuadro con los cambios desde `anterior`: para las colonias y para los
+    nutrientes, la cantidad de celdas que cambiaron (uint32), sus índices
+    (uint32) y sus valores nuevos (uint8).
+    """
+    partes = [CABECERA.pack(DELTA, estado.tiempo, estado.rx, estado.ry, len(estado.poblaciones)),
+              np.asarray(estado.poblaciones, dtype='<u4').tobytes()]
+    for viejo, nuevo in ((anterior.ocup, estado.ocup), (anterior.nivel, estado.nivel)):
+        indices = np.flatnonzero(viejo != nuevo).astype('<u4')
+        partes += [struct.pack('<I', len(indices)), indices.tobytes(), nuevo[indices].tobytes()]
+    return b''.join(partes)
+
+
+def decodificar(datos: bytes, anterior: Optional[Estado], celdas: int) -> Estado:
+    """
+    Estado que resulta de aplicar un cuadro a `anterior` (None si es el primero).
+
+    Raises:
+        ValueError: si el cuadro está incompleto o es un delta sin estado anterior
+    """
+    try:
+        tipo, tiempo, rx, ry, n_col = CABECERA.unpack_from(datos)
+        pos = CABECERA.size
+        poblaciones = np.frombuffer(datos, '<u4', n_col, pos).tolist()
+        pos += 4 * n_col
+        if tipo == CLAVE:
+            ocup = np.frombuffer(datos, np.uint8, celdas, pos).copy()
+            nivel = np.frombuffer(datos, np.uint8, celdas, pos + celdas).copy()
+        elif tipo == DELTA and anterior is not None:
+            ocup, nivel = anterior.ocup.copy(), anterior.nivel.copy()
+            for matriz in (ocup, nivel):
+                k, = struct.unpack_from('<I', datos, pos)
+                indices = np.frombuffer(datos, '<u4', k, pos + 4)
+                matriz[indices] = np.frombuffer(datos, np.uint8, k, pos + 4 + 4 * k)
+                pos += 4 + 5 * k
+        else:
+            raise ValueError(f"Cuadro de tipo {tipo} sin estado anterior")
+    except struct.error as e:
+        raise ValueError(f"Cuadro incompleto: {e}") from None
+    return Estado(tiempo, rx, ry, ocup, nivel, poblaciones)
+
+
+# ---------------------------------------------------------------------
+# Grabaciones
+# ---------------------------------------------------------------------
+class Grabacion:
+    """
+    Archivo con una transmisión: la descripción de la partida (JSON) y un
+    cuadro por paso de tiempo, el primero completo. Cada registro va
+    precedido por su largo (uint32).
+
+    Los cuadros se calculan y se escriben en un hilo propio: agregar() sólo
+    deja el estado en una cola de MAX_GRABACION lugares y nunca espera al
+    disco. Si la cola está llena el paso no se graba; el delta siguiente se
+    calcula contra el último estado grabado, así que incluye sus cambios.
+    """
+
+    def __init__(self, ruta: str, info: dict):
+        self.ruta = ruta
+        self.salteados = 0
+        self._archivo = open(ruta, 'wb')
+        self._archivo.write(MAGIA)
+        self._escribir(json.dumps(info).encode())
+        self._anterior: Optional[Estado] = None
+        self._error: Optional[OSError] = None
+        self._pendientes: 'queue.Queue[Optional[Estado]]' = queue.Queue(MAX_GRABACION)
+        self._hilo = threading.Thread(target=self._grabar, daemon=True)
+        self._hilo.start()
+
+    def _escribir(self, datos: bytes) -> None:
+        self._archivo.write(struct.pack('<I', len(datos)))
+        self._archivo.write(datos)
+
+    def _grabar(self) -> None:
+        while (estado := self._pendientes.get()) is not None:
+            if self._error is not None:
+                continue  # se vacía la cola sin escribir
+            try:
+                if self._anterior is None:
+                    self._escribir(cuadro_clave(estado))
+                else:
+                    self._escribir(cuadro_delta(self._anterior, estado))
+            except OSError as error:
+                self._error = error
+            self._anterior = estado
+
+    def agregar(self, estado: Estado) -> None:
+        try:
+            self._pendientes.put_nowait(estado)
+        except queue.Full:
+            self.salteados += 1
+
+    def cerrar(self) -> None:
+        """Espera a que se escriban los estados pendientes y cierra el archivo"""
+        self._pendientes.put(None)
+        self._hilo.join()
+        self._archivo.close()
+        if self._error is not None:
+            print(f"Error al grabar {self.ruta}: {self._error}")
+        elif self.salteados:
+            print(f"Grabación {self.ruta}: {self.salteados} pasos sin grabar (el disco no daba abasto)")
+
+
+def leer_grabacion(ruta: str) -> Tuple[dict, Iterator[Estado]]:
+    """
+    Descripción de la partida y los estados de una grabación, en orden.
+
+    Raises:
+        ValueError: si el archivo no es una grabación
+    """
+    archivo = open(ruta, 'rb')
+    if archivo.read(len(MAGIA)) != MAGIA:
+        archivo.close()
+        raise ValueError(f"{ruta}: no es una grabación de una transmisión")
+
+    def registro() -> Optional[bytes]:
+        largo = archivo.read(4)
+        if len(largo) < 4:
+            return None
+        return archivo.read(struct.unpack('<I', largo)[0])
+
+    info = json.loads(registro())
+    celdas = info['mx_x'] * info['mx_y']
+
+    def estados() -> Iterator[Estado]:
+        estado = None
+        with archivo:
+            while (datos := registro()) is not None:
+                estado = decodificar(datos, estado, celdas)
+                yield estado
+    return info, estados()
+
+
+# ---------------------------------------------------------------------
+# Servidor
+# ---------------------------------------------------------------------
+def _marco_ws(datos: bytes, opcode: int) -> bytes:
+    """Mensaje WebSocket del servidor (completo y sin máscara)"""
+    n = len(datos)
+    if n < 126:
+        cabecera = struct.pack('!BB', 0x80 | opcode, n)
+    elif n < 65536:
+        cabecera = struct.pack('!BBH', 0x80 | opcode, 126, n)
+    else:
+        cabecera = struct.pack('!BBQ', 0x80 | opcode, 127, n)
+    return cabecera + datos
+
+
+async def _leer_marco_ws(lector: asyncio.StreamReader, maximo: int = 1 << 16) -> Tuple[int, bytes]:
+    """Lee un mensaje WebSocket de a lo sumo `maximo` bytes: (opcode, datos)"""
+    b1, b2 = await lector.readexactly(2)
+    n = b2 & 0x7F
+    if n == 126:
+        n, = struct.unpack('!H', await lector.readexactly(2))
+    elif n == 127:
+        n, = struct.unpack('!Q', await lector.readexactly(8))
+    if n > maximo:
+        raise ValueError("Mensaje demasiado largo")
+    mascara = await lector.readexactly(4) if b2 & 0x80 else bytes(4)
+    datos = bytes(b ^ mascara[i % 4] for i, b in enumerate(await lector.readexactly(n)))
+    return b1 & 0x0F, datos
+
+
+def _respuesta(estado: str, tipo: str, cuerpo: bytes) -> bytes:
+    return (f"HTTP/1.1 {estado}\r\nContent-Type: {tipo}\r\nContent-Length: {len(cuerpo)}\r\n"
+            f"Cache-Control: no-store\r\nConnection: close\r\n\r\n").encode() + cuerpo
+
+
+class _Espectador:
+    """Un navegador conectado y su cola de mensajes por enviar"""
+    __slots__ = ('escritor', 'cola', 'necesita_clave', 'descartados', 'tarea')
+
+    def __init__(self, escritor: asyncio.StreamWriter):
+        self.escritor = escritor
+        self.cola: asyncio.Queue = asyncio.Queue(MAX_COLA)
+        self.necesita_clave = True
+        self.descartados = 0
+        self.tarea: Optional[asyncio.Task] = None
+
+
+class ServidorEspectadores:
+    """
+    Servidor HTTP (la página del visor en /, el estado en /estado) y
+    WebSocket (/ws) que difunde los cuadros a todos los espectadores. Todo
+    corre en el bucle de asyncio; los cuadros llegan desde el hilo de la
+    simulación a través de un Emisor.
+    """
+
+    def __init__(self, info: dict):
+        """
+        Args:
+            info: descripción de la partida que recibe cada espectador al
+                  conectarse (nombres, colores, radio, mx_x, mx_y)
+        """
+        self.info = info
+        self.espectadores: Set[_Espectador] = set()
+        self.estado: Optional[Estado] = None
+        self.difundidos = 0
+        self.descartados = 0  # cuadros que no se mandaron a algún espectador lento
+        self._clave: Optional[bytes] = None  # cuadro completo del estado actual (mensaje WebSocket)
+        self._servidor: Optional[asyncio.AbstractServer] = None
+
+    async def iniciar(self, host: str, puerto: int) -> None:
+        self._servidor = await asyncio.start_server(self._atender, host, puerto)
+
+    async def cerrar(self) -> None:
+        if self._servidor is not None:
+            self._servidor.close()
+        for espectador in list(self.espectadores):
+            espectador.escritor.close()
+
+    def _marco_clave(self) -> bytes:
+        if self._clave is None:
+            self._clave = _marco_ws(cuadro_clave(self.estado), _BINARIO)
+        return self._clave
+
+    def difundir(self, delta: Optional[bytes], estado: Estado) -> None:
+        """
+        Pone el cuadro en la cola de cada espectador. Con la cola llena se
+        descarta y el espectador recibe un cuadro completo en cuanto tenga
+        lugar (los deltas sólo valen sobre el cuadro anterior).
+        """
+        self.estado = estado
+        self._clave = None
+        self.difundidos += 1
+        marco = _marco_ws(delta, _BINARIO) if delta is not None else None
+        for espectador in self.espectadores:
+            if espectador.cola.full():
+                espectador.descartados += 1
+                espectador.necesita_clave = True
+                self.descartados += 1
+            elif espectador.necesita_clave or marco is None:
+                espectador.cola.put_nowait(self._marco_clave())
+                espectador.necesita_clave = False
+            else:
+                espectador.cola.put_nowait(marco)
+
+    def resumen(self) -> dict:
+        return {'tiempo': self.estado.tiempo if self.estado else None,
+                'poblaciones': self.estado.poblaciones if self.estado else [],
+                'espectadores': len(self.espectadores),
+                'cuadros': self.difundidos,
+                'descartados': self.descartados}
+
+    async def _atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        try:
+            pedido = await lector.readuntil(b'\r\n\r\n')
+            lineas = pedido.decode('latin-1').split('\r\n')
+            metodo, ruta, _ = (lineas[0].split(' ') + ['', '', ''])[:3]
+            cabeceras = {}
+            for linea in lineas[1:]:
+                nombre, _, valor = linea.partition(':')
+                cabeceras[nombre.strip().lower()] = valor.strip()
+            ruta = ruta.split('?')[0]
+            if ruta == '/ws' and cabeceras.get('upgrade', '').lower() == 'websocket':
+                await self._websocket(lector, escritor, cabeceras)
+                return
+            if metodo != 'GET':
+                escritor.write(_respuesta('405 Method Not Allowed', 'text/plain', b'GET'))
+            elif ruta in ('/', '/index.html'):
+                escritor.write(_respuesta('200 OK', 'text/html; charset=utf-8', PAGINA.encode()))
+            elif ruta == '/estado':
+                escritor.write(_respuesta('200 OK', 'application/json', json.dumps(self.resumen()).encode()))
+            else:
+                escritor.write(_respuesta('404 Not Found', 'text/plain', b'No encontrado'))
+            await escritor.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _websocket(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter,
+                         cabeceras: dict) -> None:
+        clave = cabeceras.get('sec-websocket-key', '')
+        aceptar = base64.b64encode(hashlib.sha1((clave + _GUID_WS).encode()).digest()).decode()
+        escritor.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                        f"Sec-WebSocket-Accept: {aceptar}\r\n\r\n").encode())
+        escritor.write(_marco_ws(json.dumps(self.info).encode(), _TEXTO))
+        espectador = _Espectador(escritor)
+        espectador.tarea = asyncio.current_task()
+        if self.estado is not None:
+            espectador.cola.put_nowait(self._marco_clave())
+            espectador.necesita_clave = False
+        self.espectadores.add(espectador)
+        lectura = asyncio.create_task(self._escuchar(lector, espectador))
+        try:
+            while True:
+                escritor.write(await espectador.cola.get())
+                await escritor.drain()  # sólo espera este espectador
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            self.espectadores.discard(espectador)
+            lectura.cancel()
+
+    async def _escuchar(self, lector: asyncio.StreamReader, espectador: _Espectador) -> None:
+        """Atiende lo que manda el navegador: ping y cierre"""
+        try:
+            while True:
+                opcode, datos = await _leer_marco_ws(lector)
+                if opcode == _PING:
+                    espectador.escritor.write(_marco_ws(datos, _PONG))
+                elif opcode == _CIERRE:
+                    espectador.escritor.write(_marco_ws(b'', _CIERRE))
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        espectador.tarea.cancel()
+
+
+class Emisor:
+    """
+    Entrega los estados del hilo de la simulación al servidor sin esperarlo
+    nunca. Si el bucle de asyncio tiene MAX_PENDIENTES cuadros sin difundir,
+    el paso no se entrega: el delta siguiente se calcula contra el último
+    estado entregado, así que incluye sus cambios.
+    """
+
+    def __init__(self, bucle: asyncio.AbstractEventLoop, servidor: ServidorEspectadores,
+                 grabacion: Optional[Grabacion] = None):
+        self.bucle = bucle
+        self.servidor = servidor
+        self.grabacion = grabacion
+        self.detenido = threading.Event()  # se pide terminar (Ctrl-C o servidor cerrado)
+        self.entregados = 0
+        self.salteados = 0
+        self._lugares = threading.Semaphore(MAX_PENDIENTES)
+        self._anterior: Optional[Estado] = None
+
+    def emitir(self, estado: Estado) -> None:
+        if self.grabacion is not None:
+            self.grabacion.agregar(estado)
+        if not self._lugares.acquire(blocking=False):
+            self.salteados += 1
+            return
+        delta = cuadro_delta(self._anterior, estado) if self._anterior is not None else None
+        self._anterior = estado
+        self.entregados += 1
+        try:
+            self.bucle.call_soon_threadsafe(self._entregar, delta, estado)
+        except RuntimeError:  # el bucle ya se cerró
+            self.detenido.set()
+
+    def _entregar(self, delta: Optional[bytes], estado: Estado) -> None:
+        self._lugares.release()
+        self.servidor.difundir(delta, estado)
+
+    def esperar(self, segundos: float) -> None:
+        """Pausa del hilo de la simulación (se interrumpe si se pide terminar)"""
+        if segundos > 0:
+            self.detenido.wait(segundos)
+
+
+# ---------------------------------------------------------------------
+# Partidas y repeticiones
+# ---------------------------------------------------------------------
+def info_partida(petri) -> dict:
+    """Descripción de la partida para los espectadores"""
+    nombres = [petri.nombre_colonia(c + 1) for c in range(len(petri.colonias))]
+    return {'nombres': nombres,
+            'colores': [COLORES_WEB.get(COLORES[c % len(COLORES)], '#808080') for c in range(len(nombres))],
+            'radio': petri.radio, 'mx_x': petri.max_x, 'mx_y': petri.max_y, 'niveles': NIVELES}
+
+
+class Transmision(Graficadora):
+    """
+    Corre la competencia como el modo sin gráficos de Graficadora (mismas
+    estadísticas, reglas y resultado) y entrega cada paso a un Emisor, a
+    lo sumo `pasos_por_segundo` pasos por segundo.
+    """
+
+    def __init__(self, reglas: Optional[List[ReglaTerminacion]] = None, pasos_por_segundo: float = 30.0):
+        """
+        Args:
+            reglas: reglas de terminación anticipada
+            pasos_por_segundo: ritmo de la partida (0: tan rápido como se pueda)
+        """
+        super().__init__(headless=True, reglas=reglas)
+        self.pasos_por_segundo = pasos_por_segundo
+        self.emisor: Optional[Emisor] = None
+
+    def ejecutar_headless(self) -> None:
+        print("Transmitiendo la simulación...")
+        self.iniciado = True
+        self.iniciar_reglas()
+        agar = self.petri.agar
+        escala = max(float(agar.nutri.max()), 1e-12)
+        iniciales = np.bincount(agar.ocup.ravel().clip(0), minlength=len(self.nombres) + 1)[1:len(self.nombres) + 1]
+        self.emisor.emitir(capturar_estado(self.petri, self.t, iniciales.tolist(), escala))
+        inicio, t_inicio = time.perf_counter(), self.t
+        max_iteraciones = self.max_iteraciones()
+        while not self.fin_competencia and self.t < max_iteraciones and not self.emisor.detenido.is_set():
+            self.petri.mover_colonias()
+            self.t += 1
+            self.actualizar_estadisticas()
+            self.emisor.emitir(capturar_estado(self.petri, self.t, self.vivos, escala))
+            if self.pasos_por_segundo:
+                self.emisor.esperar(inicio + (self.t - t_inicio) / self.pasos_por_segundo - time.perf_counter())
+        if self.fin_competencia:
+            print(f"Simulación completada después de {self.t} pasos de tiempo ({self.terminacion})")
+        elif self.emisor.detenido.is_set():
+            print(f"Transmisión interrumpida en el paso {self.t} - Competencia incompleta")
+        else:
+            self.terminacion = "max_iteraciones"
+            print(f"Simulación terminada en max_iteraciones ({max_iteraciones}) - Competencia incompleta")
+
+
+def repeticion(estados: Iterator[Estado], pasos_por_segundo: float = 30.0) -> Callable[[Emisor], None]:
+    """Producción que vuelve a transmitir los estados de una grabación al ritmo indicado"""
+    def producir(emisor: Emisor) -> None:
+        inicio, t_inicio = time.perf_counter(), None
+        for estado in estados:
+            if emisor.detenido.is_set():
+                return
+            if t_inicio is None:
+                t_inicio = estado.tiempo
+            elif pasos_por_segundo:
+                emisor.esperar(inicio + (estado.tiempo - t_inicio) / pasos_por_segundo - time.perf_counter())
+            emisor.emitir(estado)
+    return producir
+
+
+def servir(direccion: str, info: dict, producir: Callable[[Emisor], None], grabar: Optional[str] = None,
+           seguir: bool = True) -> None:
+    """
+    Sirve a los espectadores en `direccion` (host:puerto) mientras
+    `producir(emisor)` genera los estados en otro hilo.
+
+    Args:
+        direccion: dónde escuchar (por omisión sólo este equipo)
+        info: descripción de la partida (ver info_partida())
+        producir: función que corre la partida (o la repetición) y entrega cada estado al emisor
+        grabar: archivo donde grabar la transmisión
+        seguir: al terminar la partida, seguir mostrando el estado final hasta Ctrl-C
+    """
+    host, _, puerto = direccion.rpartition(':')
+    host, puerto = host or '127.0.0.1', int(puerto)
+    grabacion = Grabacion(grabar, info) if grabar else None
+    anterior = signal.getsignal(signal.SIGINT)
+
+    async def principal() -> None:
+        bucle = asyncio.get_running_loop()
+        servidor = ServidorEspectadores(info)
+        await servidor.iniciar(host, puerto)
+        emisor = Emisor(bucle, servidor, grabacion)
+        # Ctrl-C corta la partida (o la espera final) y se sigue como si hubiera terminado
+        interrumpido = asyncio.Event()
+        try:
+            bucle.add_signal_handler(signal.SIGINT, interrumpido.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl-C llega como KeyboardInterrupt
+        print(f"Espectadores: http://{host}:{puerto}/")
+        hilo = threading.Thread(target=producir, args=(emisor,), daemon=True)
+        hilo.start()
+        try:
+            while hilo.is_alive() and not interrumpido.is_set():
+                await asyncio.sleep(0.2)
+            if seguir and not interrumpido.is_set():
+                print("Fin de la transmisión: se sigue mostrando el estado final (Ctrl-C para cerrar)")
+                await interrumpido.wait()
+            elif not interrumpido.is_set():
+                await asyncio.sleep(0.5)  # que salgan los últimos cuadros
+        finally:
+            emisor.detenido.set()
+            await bucle.run_in_executor(None, hilo.join)
+            await servidor.cerrar()
+
+    try:
+        asyncio.run(principal())
+    finally:
+        signal.signal(signal.SIGINT, anterior)
+        if grabacion is not None:
+            grabacion.cerrar()
+
+
+# ---------------------------------------------------------------------
+# Página del visor (sin nada externo: funciona sin conexión)
+# ---------------------------------------------------------------------
+PAGINA = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Competencia de Vida Artificial</title>
+<style>
+  body { font-family: sans-serif; background: #222; color: #eee; margin: 1em; }
+  #plato { width: min(90vh, 90vw); image-rendering: pixelated; background: #111; }
+  #colonias div { margin: .2em 0; }
+  .marca { display: inline-block; width: 1em; height: 1em; vertical-align: middle; margin-right: .4em; }
+  #estado { color: #aaa; }
+</style>
+</head>
+<body>
+<h2>Competencia de Vida Artificial</h2>
+<div id="estado">Conectando...</div>
+<div id="colonias"></div>
+<canvas id="plato"></canvas>
+<script>
+"use strict";
+const lienzo = document.getElementById('plato'), ctx = lienzo.getContext('2d');
+const textoEstado = document.getElementById('estado'), divColonias = document.getElementById('colonias');
+let info = null, N = 0, M = 0, ocup = null, nivel = null, dentro = null, imagen = null, colores = [];
+let tiempo = 0, rx = 0, ry = 0, poblaciones = [], cambio = false, cuadros = 0;
+
+function rgb(hex) { return [1, 3, 5].map(i => parseInt(hex.slice(i, i + 2), 16)); }
+// Nutrientes: de crema (nada) a marrón (máximo)
+function rampa(n) {
+  const r = [];
+  for (let k = 0; k < n; k++) {
+    const f = k / (n - 1);
+    r.push([255 - 115 * f, 250 - 180 * f, 230 - 210 * f]);
+  }
+  return r;
+}
+let tonos = [];
+
+function preparar(descripcion) {
+  info = descripcion; N = info.mx_x; M = info.mx_y;
+  lienzo.width = N; lienzo.height = M;
+  imagen = ctx.createImageData(N, M);
+  colores = info.colores.map(rgb);
+  tonos = rampa(info.niveles);
+  const r = info.radio;
+  dentro = new Uint8Array(N * M);
+  for (let x = 0; x < N; x++)
+    for (let y = 0; y < M; y++)
+      dentro[x * M + y] = (r - x) * (r - x) + (r - y) * (r - y) < r * r ? 1 : 0;
+  divColonias.innerHTML = '';
+  info.nombres.forEach((nombre, c) => {
+    const d = document.createElement('div');
+    d.innerHTML = `<span class="marca" style="background:${info.colores[c]}"></span>` +
+                  `<span></span> <b></b>`;
+    d.children[1].textContent = nombre;
+    divColonias.appendChild(d);
+  });
+}
+
+function recibir(datos) {
+  const dv = new DataView(datos), bytes = new Uint8Array(datos);
+  const tipo = dv.getUint8(0), n = dv.getUint8(13);
+  tiempo = dv.getUint32(1, true); rx = dv.getInt32(5, true); ry = dv.getInt32(9, true);
+  let p = 14;
+  poblaciones = [];
+  for (let c = 0; c < n; c++, p += 4) poblaciones.push(dv.getUint32(p, true));
+  if (tipo === 1) {
+    ocup = bytes.slice(p, p + N * M); nivel = bytes.slice(p + N * M, p + 2 * N * M);
+  } else if (ocup !== null) {
+    for (const matriz of [ocup, nivel]) {
+      const k = dv.getUint32(p, true), valores = p + 4 + 4 * k;
+      for (let i = 0; i < k; i++) matriz[dv.getUint32(p + 4 + 4 * i, true)] = bytes[valores + i];
+      p = valores + k;
+    }
+  }
+  cuadros++; cambio = true;
+}
+
+function dibujar() {
+  if (cambio && ocup !== null) {
+    const d = imagen.data;
+    for (let x = 0; x < N; x++) {
+      const xn = ((x + rx) % N) * M;
+      for (let y = 0; y < M; y++) {
+        const i = ((M - 1 - y) * N + x) * 4, celda = x * M + y, c = ocup[celda];
+        let color;
+        if (c > 0) color = colores[(c - 1) % colores.length];
+        else if (dentro[celda]) color = tonos[nivel[xn + (y + ry) % M]];
+        else { d[i + 3] = 0; continue; }
+        d[i] = color[0]; d[i + 1] = color[1]; d[i + 2] = color[2]; d[i + 3] = 255;
+      }
+    }
+    ctx.putImageData(imagen, 0, 0);
+    poblaciones.forEach((v, c) => {
+      if (divColonias.children[c]) divColonias.children[c].children[2].textContent = v;
+    });
+    textoEstado.textContent = `t = ${tiempo}   (${cuadros} cuadros recibidos)`;
+    cambio = false;
+  }
+  requestAnimationFrame(dibujar);
+}
+
+function conectar() {
+  const ws = new WebSocket(`ws://${location.host}/ws`);
+  ws.binaryType = 'arraybuffer';
+  ws.onmessage = ev => typeof ev.data === 'string' ? preparar(JSON.parse(ev.data)) : recibir(ev.data);
+  ws.onclose = () => { textoEstado.textContent = 'Desconectado: reintentando...'; setTimeout(conectar, 2000); };
+}
+conectar();
+requestAnimationFrame(dibujar);
+</script>
+</body>
+</html>
+"""
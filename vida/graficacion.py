@@ -1,25 +1,102 @@
 # =====================================================================
 # GRAFICA: Sistema de visualización para la Competencia de vida artificial
 # Renombrado a `graficacion.py` y adaptado para usar `definiciones`.
+# matplotlib se importa recién al dibujar: sin ventanas (headless, lotes,
+# visor de terminal) no se carga.
 # =====================================================================
 
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 import numpy as np
-from typing import Optional
+from typing import List, Optional
 import time
 import os
 from datetime import datetime
 from .definiciones import *
-from .agar import agar
+from .terminacion import ReglaTerminacion
+
+# Pasos de tiempo de una competencia sin ventanas antes de darla por incompleta
+# (salvo que una regla de terminación fije otro límite de pasos)
+MAX_ITERACIONES = 10000
+
+# Píxeles por lado del plato en el modo densidad (los platos más grandes se
+# dibujan promediando bloques de celdas)
+MAX_PIXELES = 400
+
+
+def _bloques(matriz: np.ndarray, bloque: int) -> np.ndarray:
+    """Suma de cada bloque de bloque x bloque celdas (los bordes se completan con ceros)"""
+    if bloque == 1:
+        return matriz.astype(np.float32)
+    nx, ny = matriz.shape
+    bx, by = -(-nx // bloque), -(-ny // bloque)
+    if (bx * bloque, by * bloque) != (nx, ny):
+        completa = np.zeros((bx * bloque, by * bloque), dtype=matriz.dtype)
+        completa[:nx, :ny] = matriz
+        matriz = completa
+    return matriz.reshape(bx, bloque, by, bloque).sum(axis=(1, 3), dtype=np.float32)
+
+
+def capa_densidad(ocup: np.ndarray, ener: np.ndarray, nutrientes: np.ndarray, dentro: np.ndarray,
+                  n_col: int, bloque: int = 1) -> np.ndarray:
+    """
+    Imagen RGBA [x, y] del plato: los nutrientes de fondo y encima el color
+    de las colonias de cada bloque de celdas, mezclado según cuántos MOs de
+    cada una hay, más opaco cuanto más ocupado está el bloque y más claro
+    cuanto más energía tienen sus MOs. Fuera del plato es transparente.
+
+    Args:
+        ocup, ener: matrices del agar
+        nutrientes: nutrientes alineados con el plato (Agar.nutrientes_alineados())
+        dentro: celdas dentro del plato
+        n_col: cantidad de colonias
+        bloque: lado de los bloques de celdas que se promedian en un píxel
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import to_rgba_array
+    celdas = bloque * bloque
+    conteos = np.stack([_bloques(ocup == c + 1, bloque) for c in range(n_col)])
+    ocupadas = conteos.sum(axis=0)
+    hay = np.maximum(ocupadas, 1.0)
+    colores = to_rgba_array([COLORES[c % len(COLORES)] for c in range(n_col)])[:, :3].astype(np.float32)
+    mezcla = np.tensordot(conteos, colores, axes=(0, 0)) / hay[..., None]
+    energia = _bloques(np.where(ocup != VACIO, ener, 0.0), bloque) / hay
+    brillo = 0.4 + 0.6 * np.clip(energia / (2 * E_INICIAL), 0.0, 1.0)
+    alfa = np.sqrt(ocupadas / celdas)[..., None]
+
+    # Fondo: nutrientes con la escala de colores de siempre (de 0 a MAX_NUTRI por celda, como en
+    # el modo de puntos), a media transparencia sobre blanco
+    nutri = np.clip(_bloques(nutrientes, bloque) / (MAX_NUTRI * celdas), 0.0, 1.0)
+    fondo = 1.0 - 0.6 * (1.0 - plt.get_cmap('YlOrBr')(nutri)[..., :3])
+
+    capa = np.empty(ocupadas.shape + (4,), dtype=np.float32)
+    capa[..., :3] = fondo * (1.0 - alfa) + mezcla * brillo[..., None] * alfa
+    capa[..., 3] = _bloques(dentro, bloque) > 0
+    return capa
+
 
 class Graficadora:
     """
     Clase Graficadora para visualizar la simulación de vida artificial.
     """
 
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, reglas: Optional[List[ReglaTerminacion]] = None,
+                 densidad: bool = False, max_pixeles: Optional[int] = MAX_PIXELES):
+        """
+        Args:
+            headless: simular sin ventanas
+            reglas: reglas de terminación anticipada
+            densidad: dibujar el plato como una sola imagen (ver capa_densidad())
+                      en lugar de un punto por MO
+            max_pixeles: en el modo densidad, píxeles por lado del plato como
+                         máximo (None: una celda por píxel)
+        """
         self.sin_graficos = headless
+        self.densidad = densidad
+        self.max_pixeles = max_pixeles
+        self.imagen = None   # imagen del modo densidad (se reutiliza en cada cuadro)
+        self.leyenda = None
+        self._dentro = None  # celdas dentro del plato, para el modo densidad
+        self.reglas: List[ReglaTerminacion] = reglas if reglas is not None else []
+        self.terminacion = ""  # regla que terminó la competencia
         self.petri = None
         self.figura = None
         self.eje_principal = None
@@ -31,31 +108,33 @@ class Graficadora:
         self.continuar = True
         self.fin_competencia = False
         self.competencia_completada = False
-        self.col1_vivos = 0
-        self.col2_vivos = 0
-        self.col1_energia = 0.0
-        self.col2_energia = 0.0
+        self.vivos: List[int] = []           # población de cada colonia
+        self.energias: List[float] = []      # energía total de cada colonia
+        self.extinciones: List[Optional[int]] = []  # paso en que se extinguió cada colonia
         self.total_nutrientes = 0.0
-        self.nombre_col1 = ""
-        self.nombre_col2 = ""
-        self.autor_col1 = ""
-        self.autor_col2 = ""
+        self.nombres: List[str] = []
+        self.autores: List[str] = []
         self.eje_poblacion = None
 
     def crear_ventanas(self, petri_instance) -> None:
         self.petri = petri_instance
-        if len(self.petri.colonias) >= 1:
-            self.nombre_col1 = self.petri.nombre_colonia(1)
-            self.autor_col1 = self.petri.autor_colonia(1)
-        if len(self.petri.colonias) >= 2:
-            self.nombre_col2 = self.petri.nombre_colonia(2)
-            self.autor_col2 = self.petri.autor_colonia(2)
+        self.t = self.petri.tiempo  # distinto de 0 si se reanuda desde un punto de control
+        n_col = len(self.petri.colonias)
+        self.nombres = [self.petri.nombre_colonia(c + 1) for c in range(n_col)]
+        self.autores = [self.petri.autor_colonia(c + 1) for c in range(n_col)]
+        self.vivos = [0] * n_col
+        self.energias = [0.0] * n_col
+        # Las colonias extinguidas antes de un punto de control conservan su paso
+        self.extinciones = list(getattr(self.petri, 'extinciones', None) or [None] * n_col)
+        self.petri.definir_reglas(self.reglas)
 
         if not self.sin_graficos:
+            import matplotlib.pyplot as plt
+            import matplotlib.animation as animation
             self.figura, (self.eje_principal, self.eje_datos) = plt.subplots(1, 2, figsize=(15, 7))
             self.eje_principal.set_title("Competencia de Vida Artificial - Plato de Petri")
-            self.eje_principal.set_xlim(0, 2 * R)
-            self.eje_principal.set_ylim(0, 2 * R)
+            self.eje_principal.set_xlim(0, self.petri.max_x)
+            self.eje_principal.set_ylim(0, self.petri.max_y)
             self.eje_principal.set_aspect('equal')
             self.eje_datos.set_title("Estadísticas de Colonias")
             self.eje_datos.set_xlabel("Tiempo")
@@ -76,16 +155,19 @@ class Graficadora:
     def ejecutar_headless(self) -> None:
         print("Ejecutando simulación en modo headless...")
         self.iniciado = True
-        max_iteraciones = 10000
+        self.iniciar_reglas()
+        max_iteraciones = self.max_iteraciones()
         while not self.fin_competencia and self.t < max_iteraciones:
             self.petri.mover_colonias()
             self.t += 1
             self.actualizar_estadisticas()
             if self.t % 100 == 0:
-                print(f"  Tiempo: {self.t}, Col1: {self.col1_vivos}, Col2: {self.col2_vivos}")
+                poblaciones = ", ".join(f"Col{c + 1}: {v}" for c, v in enumerate(self.vivos))
+                print(f"  Tiempo: {self.t}, {poblaciones}")
         if self.fin_competencia:
-            print(f"Simulación completada después de {self.t} pasos de tiempo")
+            print(f"Simulación completada después de {self.t} pasos de tiempo ({self.terminacion})")
         else:
+            self.terminacion = "max_iteraciones"
             print(f"Simulación terminada en max_iteraciones ({max_iteraciones}) - Competencia incompleta")
 
     def limpiar(self):
@@ -95,12 +177,14 @@ class Graficadora:
             self.eje_poblacion.remove()
             self.eje_poblacion = None
         if self.figura:
+            import matplotlib.pyplot as plt
             plt.close(self.figura)
 
     def actualizar_frame(self, frame) -> None:
         try:
             if not self.iniciado:
                 self.iniciado = True
+                self.iniciar_reglas()
             if self.continuar and not self.fin_competencia:
                 self.petri.mover_colonias()
                 self.t += 1
@@ -112,91 +196,154 @@ class Graficadora:
             print(f"Error durante actualización de frame: {e}")
             self.fin_competencia = True
 
+    def max_iteraciones(self) -> int:
+        """
+        Pasos de tiempo de una competencia sin ventanas: el menor límite de
+        pasos de las reglas (ReglaLimite) o, si no hay, MAX_ITERACIONES.
+        """
+        limites = [regla.limite_pasos() for regla in self.reglas if regla.limite_pasos() is not None]
+        return min(limites) if limites else MAX_ITERACIONES
+
+    def iniciar_reglas(self) -> None:
+        """
+        Reinicia las reglas de terminación. Si la partida se reanudó desde un
+        punto de control, las reglas vuelven al estado guardado y se evalúa
+        el paso del punto de control (se guardó antes de evaluarlo), así la
+        partida sigue como si no se hubiera interrumpido.
+        """
+        for regla in self.reglas:
+            regla.reiniciar()
+        guardadas = getattr(self.petri, 'reglas_guardadas', None)
+        if guardadas is None:
+            return
+        self.petri.reglas_guardadas = None
+        for regla, (nombre, configuracion, estado) in zip(self.reglas, guardadas):
+            if type(regla).__name__ == nombre and regla.configuracion() == configuracion and estado is not None:
+                regla.restaurar(estado)
+        self.actualizar_estadisticas()
+
     def actualizar_estadisticas(self) -> None:
-        self.col1_vivos = 0
-        self.col2_vivos = 0
-        self.col1_energia = 0.0
-        self.col2_energia = 0.0
-        self.total_nutrientes = 0.0
-        N = 2 * R
-        M = 2 * R
-        for i in range(N):
-            for j in range(M):
-                if agar.ocupacion(i, j) != VACIO:
-                    mo_id = agar.ocupacion(i, j)
-                    energia = agar.energia(i, j)
-                    if mo_id == 1:
-                        self.col1_vivos += 1
-                        self.col1_energia += energia
-                    elif mo_id == 2:
-                        self.col2_vivos += 1
-                        self.col2_energia += energia
-                self.total_nutrientes += agar.nutrientes(i, j)
+        # Sólo se recorren las teselas con MOs vivos o con nutrientes que cambiaron
+        n_col = len(self.vivos)
+        teselado = self.petri.teselado
+        agar = self.petri.agar
+        self.vivos = teselado.vivos_por_colonia()[:n_col]
+        self.energias = teselado.energia_por_colonia(agar.ocup, agar.ener)[:n_col]
+        self.total_nutrientes = teselado.total_nutrientes(agar.nutri)
         colonias_vivas = 0
         ganador = None
-        if self.col1_vivos > 0:
-            colonias_vivas += 1
-            ganador = self.nombre_col1
-        if self.col2_vivos > 0:
-            colonias_vivas += 1
-            ganador = self.nombre_col2
+        for c in range(n_col):
+            if self.vivos[c] > 0:
+                colonias_vivas += 1
+                ganador = c
+            elif self.extinciones[c] is None:
+                self.extinciones[c] = self.t
         if colonias_vivas <= 1 and self.t > 10:
             self.fin_competencia = True
             self.competencia_completada = True
-            if ganador:
-                puntos_ganador = self.col1_vivos if ganador == self.nombre_col1 else self.col2_vivos
-                print(f"\nSimulación finalizada: {ganador} gana con {puntos_ganador} organismos!")
+            self.terminacion = "extincion"
+            if ganador is not None:
+                print(f"\nSimulación finalizada: {self.nombres[ganador]} gana con {self.vivos[ganador]} organismos!")
             else:
                 print("\nSimulación finalizada: ¡Todos los organismos murieron!")
+            return
+        self.evaluar_reglas()
+
+    def evaluar_reglas(self) -> None:
+        """
+        Evalúa las reglas de terminación configuradas y termina si alguna se
+        dispara. Los cortes por límite (ReglaLimite) dejan la partida incompleta.
+        """
+        for regla in self.reglas:
+            if regla.evaluar(self.t, self.vivos, self.energias):
+                self.fin_competencia = True
+                self.competencia_completada = regla.decide
+                self.terminacion = regla.motivo()
+                print(f"\nSimulación finalizada por regla de terminación: {self.terminacion} (t={self.t})")
+                return
 
     def refrescar_principal(self) -> None:
         if self.sin_graficos or not self.eje_principal:
             return
+        if self.densidad:
+            self.refrescar_densidad()
+            return
+        import matplotlib.pyplot as plt
+        N, M, r = self.petri.max_x, self.petri.max_y, self.petri.radio
+        agar = self.petri.agar
         self.eje_principal.clear()
         self.eje_principal.set_title("Competencia de Vida Artificial - Plato de Petri")
-        self.eje_principal.set_xlim(0, 2 * R)
-        self.eje_principal.set_ylim(0, 2 * R)
+        self.eje_principal.set_xlim(0, N)
+        self.eje_principal.set_ylim(0, M)
         self.eje_principal.set_aspect('equal')
-        N = 2 * R
-        M = 2 * R
-        R2 = (R + 1) * (R + 1)
-        nutrientes = np.zeros((N, M))
-        rejilla_mo = np.zeros((N, M))
-        for i in range(N):
-            for j in range(M):
-                rr = (R - i) * (R - i) + (R - j) * (R - j)
-                if rr < R2:
-                    nutrientes[i, j] = agar.nutrientes(i, j) / MAX_NUTRI
-                    rejilla_mo[i, j] = agar.ocupacion(i, j)
-        self.eje_principal.imshow(nutrientes, cmap='YlOrBr', alpha=0.6, extent=[0, N, 0, M], origin='lower')
-        col1_x, col1_y = [], []
-        col2_x, col2_y = [], []
-        for i in range(N):
-            for j in range(M):
-                mo_id = rejilla_mo[i, j]
-                if mo_id == 1:
-                    col1_x.append(i)
-                    col1_y.append(j)
-                elif mo_id == 2:
-                    col2_x.append(i)
-                    col2_y.append(j)
-        if col1_x:
-            self.eje_principal.scatter(col1_x, col1_y, c='red', s=20, label=f'{self.nombre_col1} ({self.col1_vivos})')
-        if col2_x:
-            self.eje_principal.scatter(col2_x, col2_y, c='blue', s=20, label=f'{self.nombre_col2} ({self.col2_vivos})')
-        circulo = plt.Circle((R, R), R, fill=False, color='black', linewidth=2)
+        # Nutrientes alineados con el plato (desplazados por agar.rx, agar.ry)
+        i, j = np.ogrid[0:N, 0:M]
+        dentro = (r - i) * (r - i) + (r - j) * (r - j) < (r + 1) * (r + 1)
+        alineados = agar.nutrientes_alineados()
+        nutrientes = np.where(dentro, alineados / MAX_NUTRI, 0.0)
+        # (imshow dibuja las filas, el índice x, en el eje vertical: se transpone)
+        self.eje_principal.imshow(nutrientes.T, cmap='YlOrBr', alpha=0.6, extent=[0, N, 0, M], origin='lower',
+                                  vmin=0.0, vmax=1.0)
+        # Posiciones de los MOs vivos, sólo desde las teselas ocupadas
+        xs, ys = self.petri.teselado.vivos(agar.ocup)
+        ids = agar.ocup[xs, ys]
+        for c, nombre in enumerate(self.nombres):
+            es_col = ids == c + 1
+            if es_col.any():
+                self.eje_principal.scatter(xs[es_col], ys[es_col], c=COLORES[c % len(COLORES)], s=20,
+                                           label=f'{nombre} ({self.vivos[c]})')
+        circulo = plt.Circle((r, r), r, fill=False, color='black', linewidth=2)
         self.eje_principal.add_patch(circulo)
         handles, labels = self.eje_principal.get_legend_handles_labels()
         if handles:
             self.eje_principal.legend(loc='upper right')
 
+    def refrescar_densidad(self) -> None:
+        """
+        Dibuja el plato como una sola imagen RGBA. El costo de cada cuadro
+        depende del tamaño del plato y no de la población; la imagen y la
+        leyenda se crean una vez y después sólo se actualizan.
+        """
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Patch
+        N, M, r = self.petri.max_x, self.petri.max_y, self.petri.radio
+        agar = self.petri.agar
+        bloque = max(1, -(-max(N, M) // self.max_pixeles)) if self.max_pixeles else 1
+        if self._dentro is None:
+            i, j = np.ogrid[0:N, 0:M]
+            self._dentro = (r - i) * (r - i) + (r - j) * (r - j) < (r + 1) * (r + 1)
+        capa = capa_densidad(agar.ocup, agar.ener, agar.nutrientes_alineados(), self._dentro,
+                             len(self.nombres), bloque)
+        imagen = capa.transpose(1, 0, 2)  # imshow dibuja las filas en el eje vertical
+        # Los bloques del borde se completan con ceros: la imagen cubre bx*bloque x by*bloque celdas
+        bx, by = capa.shape[:2]
+        if self.imagen is None:
+            self.eje_principal.clear()
+            titulo = "Competencia de Vida Artificial - Plato de Petri"
+            if bloque > 1:
+                titulo += f" (bloques de {bloque}x{bloque})"
+            self.eje_principal.set_title(titulo)
+            self.eje_principal.set_xlim(0, N)
+            self.eje_principal.set_ylim(0, M)
+            self.eje_principal.set_aspect('equal')
+            self.imagen = self.eje_principal.imshow(imagen, extent=[0, bx * bloque, 0, by * bloque], origin='lower',
+                                                    interpolation='nearest')
+            circulo = plt.Circle((r, r), r, fill=False, color='black', linewidth=2)
+            self.eje_principal.add_patch(circulo)
+            marcas = [Patch(color=COLORES[c % len(COLORES)]) for c in range(len(self.nombres))]
+            self.leyenda = self.eje_principal.legend(marcas, self.nombres, loc='upper right')
+        else:
+            self.imagen.set_data(imagen)
+        for texto, nombre, vivos in zip(self.leyenda.get_texts(), self.nombres, self.vivos):
+            texto.set_text(f'{nombre} ({vivos})')
+
     def refrescar_datos(self) -> None:
         if hasattr(self, 'hist_energia'):
-            self.hist_energia.append((self.col1_energia, self.col2_energia))
-            self.hist_poblacion.append((self.col1_vivos, self.col2_vivos))
+            self.hist_energia.append(tuple(self.energias))
+            self.hist_poblacion.append(tuple(self.vivos))
         else:
-            self.hist_energia = [(self.col1_energia, self.col2_energia)]
-            self.hist_poblacion = [(self.col1_vivos, self.col2_vivos)]
+            self.hist_energia = [tuple(self.energias)]
+            self.hist_poblacion = [tuple(self.vivos)]
         if self.sin_graficos or not self.eje_datos:
             return
         self.eje_datos.clear()
@@ -208,46 +355,68 @@ class Graficadora:
         self.eje_datos.set_ylabel("Energía", color='black')
         if len(self.hist_energia) > 1:
             tiempos = list(range(len(self.hist_energia)))
-            ener1 = [e[0] for e in self.hist_energia]
-            ener2 = [e[1] for e in self.hist_energia]
-            linea1 = self.eje_datos.plot(tiempos, ener1, 'r-', label=f'{self.nombre_col1} Energía')
-            linea2 = self.eje_datos.plot(tiempos, ener2, 'b-', label=f'{self.nombre_col2} Energía')
             self.eje_poblacion = self.eje_datos.twinx()
             self.eje_poblacion.set_ylabel("Población (Organismos vivos)", color='gray')
-            pop1 = [p[0] for p in self.hist_poblacion]
-            pop2 = [p[1] for p in self.hist_poblacion]
-            linea3 = self.eje_poblacion.plot(tiempos, pop1, 'r--', alpha=0.7, label=f'{self.nombre_col1} Población')
-            linea4 = self.eje_poblacion.plot(tiempos, pop2, 'b--', alpha=0.7, label=f'{self.nombre_col2} Población')
-            lineas = linea1 + linea2 + linea3 + linea4
+            lineas = []
+            for c, nombre in enumerate(self.nombres):
+                color = COLORES[c % len(COLORES)]
+                ener = [e[c] for e in self.hist_energia]
+                lineas += self.eje_datos.plot(tiempos, ener, '-', color=color, label=f'{nombre} Energía')
+            for c, nombre in enumerate(self.nombres):
+                color = COLORES[c % len(COLORES)]
+                pop = [p[c] for p in self.hist_poblacion]
+                lineas += self.eje_poblacion.plot(tiempos, pop, '--', color=color, alpha=0.7,
+                                                  label=f'{nombre} Población')
             etiquetas = [l.get_label() for l in lineas]
             self.eje_datos.legend(lineas, etiquetas, loc='upper right')
         self.eje_datos.grid(True, alpha=0.3)
 
+    def posiciones(self) -> List[int]:
+        """
+        Puesto final de cada colonia (1 = primera).
+
+        Ordena por población final y, entre colonias extinguidas, por el paso en
+        que se extinguieron (sobrevivir más es mejor). Los empates comparten puesto.
+        """
+        def clave(c):
+            extincion = self.extinciones[c] if self.extinciones[c] is not None else self.t + 1
+            return (self.vivos[c], extincion)
+        claves = [clave(c) for c in range(len(self.vivos))]
+        return [1 + sum(1 for otra in claves if otra > propia) for propia in claves]
+
     def resultado_competencia(self) -> dict:
-        ganador = None
+        ganador = "Empate"
         puntos_ganador = 0
-        if self.col1_vivos > self.col2_vivos:
-            ganador = self.nombre_col1
-            puntos_ganador = self.col1_vivos
-        elif self.col2_vivos > self.col1_vivos:
-            ganador = self.nombre_col2
-            puntos_ganador = self.col2_vivos
-        else:
-            ganador = "Empate"
-            puntos_ganador = 0
+        if self.vivos:
+            mejor = max(self.vivos)
+            lideres = [c for c, v in enumerate(self.vivos) if v == mejor]
+            if len(lideres) == 1:
+                ganador = self.nombres[lideres[0]]
+                puntos_ganador = mejor
 
-        return {
-            'enfrentamiento': f'{self.nombre_col1} vs {self.nombre_col2}',
+        resultado = {
+            'enfrentamiento': ' vs '.join(self.nombres),
             'ganador': ganador,
             'puntos': puntos_ganador,
-            'col1_nombre': self.nombre_col1,
-            'col2_nombre': self.nombre_col2,
-            'col1_poblacion_final': self.col1_vivos,
-            'col2_poblacion_final': self.col2_vivos,
-            'col1_energia_final': self.col1_energia,
-            'col2_energia_final': self.col2_energia,
+            'n_colonias': len(self.nombres),
+        }
+        # La distribución por su número y por su nombre estable (por si cambia la carpeta distribuciones/)
+        dist = getattr(self.petri, 'dist_n', None)
+        if dist is not None:
+            from .distribuciones import registro_distribuciones
+            registro = registro_distribuciones()
+            resultado.update({'distribucion': dist, 'distribucion_nombre': registro.nombre(dist),
+                              'distribucion_id': registro.identificador(dist)})
+        posiciones = self.posiciones()
+        for c, nombre in enumerate(self.nombres):
+            resultado[f'col{c + 1}_nombre'] = nombre
+            resultado[f'col{c + 1}_poblacion_final'] = self.vivos[c]
+            resultado[f'col{c + 1}_energia_final'] = self.energias[c]
+            resultado[f'col{c + 1}_posicion'] = posiciones[c]
+        resultado.update({
             'duracion': self.t,
             'timestamp': datetime.now().isoformat(),
-            'completada': self.competencia_completada
-        }
-
+            'completada': self.competencia_completada,
+            'terminacion': self.terminacion
+        })
+        return resultado
@@ -0,0 +1,129 @@
+# =====================================================================
+# GUARDADO: Puntos de control de una partida
+# Un punto de control es un .npz comprimido con las matrices del agar y
+# el resto del estado serializado con pickle: tiempo, deriva de los
+# nutrientes, colonias con el estado de cada MO y los generadores
+# aleatorios. Desde él se reanuda la partida, en este u otro proceso,
+# exactamente como hubiera seguido.
+# =====================================================================
+
+import os
+import pickle
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+# Versión del formato de los puntos de control
+FORMATO = 1
+
+# Matrices del agar que se guardan
+MATRICES = ('ocup', 'ener', 'nutri')
+
+
+@dataclass
+class PuntoControl:
+    """Estado completo de una partida en un paso de tiempo"""
+    matrices: Dict[str, np.ndarray]  # copias de las matrices del agar
+    estado: bytes                    # todo lo demás, serializado con pickle
+    tiempo: int
+
+
+def escribir(punto: PuntoControl, ruta: str) -> None:
+    """
+    Escribe un punto de control en `ruta`.
+
+    Se escribe aparte y se renombra, así si el proceso muere a mitad de la
+    escritura queda el punto de control anterior.
+    """
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, 'wb') as f:
+        np.savez_compressed(f, formato=np.array(FORMATO), tiempo=np.array(punto.tiempo),
+                            estado=np.frombuffer(punto.estado, dtype=np.uint8), **punto.matrices)
+    os.replace(temporal, ruta)
+
+
+def leer(ruta: str) -> PuntoControl:
+    """
+    Lee un punto de control escrito con escribir().
+
+    El estado se deserializa con pickle al restaurarlo: abrir sólo puntos
+    de control propios.
+
+    Raises:
+        ValueError: si el archivo no es un punto de control de este formato
+    """
+    with np.load(ruta, allow_pickle=False) as datos:
+        if 'formato' not in datos or int(datos['formato']) != FORMATO:
+            raise ValueError(f"{ruta}: no es un punto de control (formato {FORMATO})")
+        matrices = {nombre: datos[nombre] for nombre in MATRICES}
+        return PuntoControl(matrices, datos['estado'].tobytes(), int(datos['tiempo']))
+
+
+class GuardadoPeriodico:
+    """
+    Guarda un punto de control cada `cada` pasos de tiempo.
+
+    En el paso se copian las matrices y se serializan los MOs (lo único que
+    tiene que ver el estado de ese instante); la compresión y la escritura
+    se hacen en un hilo aparte mientras la partida sigue. Si la escritura
+    anterior todavía no terminó, se la espera antes de empezar otra.
+    """
+
+    def __init__(self, ruta: str, cada: int):
+        """
+        Args:
+            ruta: archivo del punto de control (se reemplaza en cada guardado)
+            cada: se guarda en los pasos de tiempo múltiplos de `cada`
+        """
+        if cada < 1:
+            raise ValueError("El intervalo entre puntos de control debe ser al menos 1")
+        self.ruta = ruta
+        self.cada = cada
+        self.guardados = 0
+        self._hilo: Optional[threading.Thread] = None
+        self._error: Optional[Exception] = None
+
+    def paso(self, petri) -> None:
+        """Lo llama Petri al final de cada paso de tiempo."""
+        if petri.tiempo % self.cada == 0:
+            self.guardar(petri)
+
+    def guardar(self, petri) -> None:
+        """Toma un punto de control ahora y lo escribe en segundo plano."""
+        self.esperar()
+        punto = petri.capturar()
+        self._hilo = threading.Thread(target=self._escribir, args=(punto,), daemon=True)
+        self._hilo.start()
+
+    def _escribir(self, punto: PuntoControl) -> None:
+        try:
+            escribir(punto, self.ruta)
+            self.guardados += 1
+        except Exception as e:
+            self._error = e
+
+    def esperar(self) -> None:
+        """Espera a que termine la escritura en curso (si la hay)."""
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+        if self._error is not None:
+            print(f"Advertencia: no se pudo guardar el punto de control en {self.ruta}: {self._error}")
+            self._error = None
+
+    def terminar(self) -> None:
+        """Espera la última escritura; llamar al final de la partida."""
+        self.esperar()
+
+
+def serializar(estado: dict) -> bytes:
+    return pickle.dumps(estado, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def deserializar(datos: bytes) -> dict:
+    return pickle.loads(datos)
@@ -0,0 +1,145 @@
+# =====================================================================
+# INSTRUMENTACION: Tiempos por fase y contadores del motor
+# Opcional: si Petri no tiene una Instrumentacion asignada, el motor sólo
+# paga una comparación con None por fase.
+# =====================================================================
+
+import json
+import time
+from typing import Dict, List, Optional
+
+# Fases de un paso de mover_colonias, en el orden en que se ejecutan
+FASES = ('vivos', 'comer', 'vivir', 'mitosis', 'mover', 'competir', 'deriva')
+
+# Eventos que se cuentan por colonia
+EVENTOS = ('movimientos_intentados', 'movimientos_aceptados', 'peleas', 'nacimientos',
+           'mitosis_pedidas', 'muertes', 'muertes_inanicion')
+
+# Encabezados cortos de los eventos para el informe en texto
+ABREVIATURAS = {'movimientos_intentados': 'mov.int', 'movimientos_aceptados': 'mov.acep',
+                'peleas': 'peleas', 'nacimientos': 'nacim', 'mitosis_pedidas': 'mit.ped',
+                'muertes': 'muertes', 'muertes_inanicion': 'inanic'}
+
+
+class Instrumentacion:
+    """
+    Acumula el tiempo de cada fase de un paso y los eventos de cada colonia.
+
+    Fases:
+        vivos: recorrido de las teselas para armar la lista de MOs vivos
+        comer: alimentación y costo de vivir
+        vivir: código de los MOs (Colonia.vivir)
+        mitosis, mover, competir: reglas de la simulación
+        deriva: desplazamiento de los nutrientes
+
+    Se guarda el total de la competencia y, si `traza` es True, el detalle de
+    cada paso para exportarlo en formato Chrome Trace (chrome://tracing,
+    Perfetto, speedscope).
+    """
+
+    def __init__(self, n_col: int, traza: bool = True):
+        """
+        Args:
+            n_col: cantidad de colonias de la competencia
+            traza: si se guarda el detalle de cada paso además de los totales
+        """
+        self.n_col = n_col
+        self.guardar_traza = traza
+        self.reloj = time.perf_counter
+        self.totales: Dict[str, float] = {fase: 0.0 for fase in FASES}
+        self.llamadas: Dict[str, int] = {fase: 0 for fase in FASES}
+        self.eventos: List[Dict[str, int]] = [{e: 0 for e in EVENTOS} for _ in range(n_col)]
+        self.pasos = 0
+        self.duracion_pasos = 0.0
+        self.traza: List[dict] = []
+        # Estado del paso en curso
+        self._tiempo = 0
+        self._inicio_paso = 0.0
+        self._fases_paso: Dict[str, float] = {}
+        self._origen = self.reloj()
+
+    # -----------------------------------------------------------------
+    # Avisos del motor
+    # -----------------------------------------------------------------
+    def nuevo_paso(self, tiempo: int) -> None:
+        self._tiempo = tiempo
+        self._fases_paso = {fase: 0.0 for fase in FASES}
+        self._inicio_paso = self.reloj()
+
+    def sumar(self, fase: str, segundos: float) -> None:
+        """Suma `segundos` al tiempo de una fase del paso en curso"""
+        self._fases_paso[fase] += segundos
+        self.llamadas[fase] += 1
+
+    def contar(self, c: int, evento: str, n: int = 1) -> None:
+        """Cuenta un evento de la colonia c (índice desde 0)"""
+        if 0 <= c < self.n_col:
+            self.eventos[c][evento] += n
+
+    def cerrar_paso(self, poblaciones: List[int]) -> None:
+        fin = self.reloj()
+        duracion = fin - self._inicio_paso
+        self.pasos += 1
+        self.duracion_pasos += duracion
+        for fase, segundos in self._fases_paso.items():
+            self.totales[fase] += segundos
+        if self.guardar_traza:
+            self._trazar_paso(duracion, poblaciones)
+
+    def _trazar_paso(self, duracion: float, poblaciones: List[int]) -> None:
+        # Las fases se intercalan MO por MO; en la traza se dibujan una detrás
+        # de otra dentro del paso, con su duración acumulada.
+        inicio = (self._inicio_paso - self._origen) * 1e6
+        self.traza.append({'name': f'paso {self._tiempo}', 'cat': 'paso', 'ph': 'X',
+                           'ts': inicio, 'dur': duracion * 1e6, 'pid': 0, 'tid': 0})
+        ts = inicio
+        for fase in FASES:
+            dur = self._fases_paso[fase] * 1e6
+            if dur > 0:
+                self.traza.append({'name': fase, 'cat': 'fase', 'ph': 'X',
+                                   'ts': ts, 'dur': dur, 'pid': 0, 'tid': 0})
+                ts += dur
+        self.traza.append({'name': 'poblacion', 'ph': 'C', 'ts': inicio, 'pid': 0,
+                           'args': {f'col{c + 1}': v for c, v in enumerate(poblaciones)}})
+
+    # -----------------------------------------------------------------
+    # Resultados
+    # -----------------------------------------------------------------
+    def resumen(self, nombres: Optional[List[str]] = None) -> dict:
+        """Totales de la competencia: tiempo por fase y eventos por colonia"""
+        nombres = nombres or [f'col{c + 1}' for c in range(self.n_col)]
+        medido = sum(self.totales.values())
+        return {
+            'pasos': self.pasos,
+            'segundos': round(self.duracion_pasos, 6),
+            'fases': {fase: {'segundos': round(self.totales[fase], 6),
+                             'fraccion': round(self.totales[fase] / self.duracion_pasos, 4)
+                             if self.duracion_pasos > 0 else 0.0,
+                             'llamadas': self.llamadas[fase]}
+                      for fase in FASES},
+            # Tiempo del paso que no cae en ninguna fase (bucle, índice de teselas, etc.)
+            'sin_medir': round(self.duracion_pasos - medido, 6),
+            'colonias': {nombres[c]: dict(self.eventos[c]) for c in range(self.n_col)},
+        }
+
+    def informe(self, nombres: Optional[List[str]] = None) -> str:
+        """Resumen en texto, para imprimir al final de la competencia"""
+        datos = self.resumen(nombres)
+        lineas = [f"Instrumentación: {datos['pasos']} pasos en {datos['segundos']:.3f} s",
+                  f"  {'Fase':<12} {'Segundos':>10} {'%':>6} {'Llamadas':>10}"]
+        for fase, d in datos['fases'].items():
+            lineas.append(f"  {fase:<12} {d['segundos']:>10.4f} {100 * d['fraccion']:>6.1f} {d['llamadas']:>10}")
+        lineas.append(f"  {'sin medir':<12} {datos['sin_medir']:>10.4f}")
+        lineas.append("  " + f"{'Colonia':<20}" + "".join(f"{ABREVIATURAS[e]:>9}" for e in EVENTOS))
+        for nombre, eventos in datos['colonias'].items():
+            lineas.append("  " + f"{nombre[:20]:<20}" + "".join(f"{eventos[e]:>9}" for e in EVENTOS))
+        return "\n".join(lineas)
+
+    def exportar_resumen(self, archivo: str, nombres: Optional[List[str]] = None) -> None:
+        with open(archivo, 'w', encoding='utf-8') as f:
+            json.dump(self.resumen(nombres), f, indent=2, ensure_ascii=False)
+
+    def exportar_traza(self, archivo: str) -> None:
+        """Guarda la traza por paso en formato Chrome Trace (JSON)"""
+        with open(archivo, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.traza, 'displayTimeUnit': 'ms'}, f)
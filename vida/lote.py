@@ -0,0 +1,157 @@
+# =====================================================================
+# LOTE: Muchas partidas seguidas en un mismo proceso
+# Se importa y se descubren los MOs una sola vez, y todas las partidas
+# usan el mismo plato (matrices del agar, teselado y colonias), que se
+# reinicia en lugar de volver a crearse.
+# =====================================================================
+
+import io
+import contextlib
+from typing import Collection, Dict, Iterable, List, Optional, Tuple, Type
+
+from .definiciones import *
+from .microorganismo import Microorganismo
+from .petri import Petri
+from .ranking import RankingSystem
+from .terminacion import ReglaTerminacion
+from .dinamica import DinamicaNutrientes
+from .cache_resultados import CacheResultados
+
+# Una partida del lote: (distribución, colonias)
+Partida = Tuple[int, List[int]]
+
+
+def leer_lote(archivo: str, n_clases: int, distribuciones: Optional[Collection[int]] = None) -> List[Partida]:
+    """
+    Lee un archivo de lote: una partida por línea, con la distribución de
+    nutrientes seguida de las colonias (índices de --listar-mos). Las
+    líneas vacías y lo que sigue a un # se ignoran.
+
+        # distribución colonias...
+        5 0 1
+        3 6 7 2
+
+    Args:
+        archivo: ruta del archivo de lote
+        n_clases: cantidad de microorganismos disponibles
+        distribuciones: números de las distribuciones de nutrientes disponibles
+                        (None: las del registro de distribuciones)
+
+    Returns:
+        Lista de partidas, en el orden del archivo
+
+    Raises:
+        ValueError: si alguna línea no es una partida válida
+    """
+    if distribuciones is None:
+        from .distribuciones import registro_distribuciones
+        distribuciones = registro_distribuciones().distribuciones
+    partidas = []
+    with open(archivo, 'r', encoding='utf-8') as f:
+        for n, linea in enumerate(f, 1):
+            campos = linea.split('#', 1)[0].split()
+            if not campos:
+                continue
+            try:
+                numeros = [int(c) for c in campos]
+            except ValueError:
+                raise ValueError(f"{archivo}:{n}: se esperaban números enteros") from None
+            dist, colonias = numeros[0], numeros[1:]
+            if dist not in distribuciones:
+                raise ValueError(f"{archivo}:{n}: la distribución {dist} no existe (ver --listar-distribuciones)")
+            if not 2 <= len(colonias) <= MAX_COLS or any(not 0 <= c < n_clases for c in colonias) \
+                    or len(set(colonias)) != len(colonias):
+                raise ValueError(f"{archivo}:{n}: se requieren entre 2 y {MAX_COLS} colonias distintas "
+                                 f"entre 0 y {n_clases - 1}")
+            partidas.append((dist, colonias))
+    return partidas
+
+
+class CorredorLote:
+    """
+    Juega partidas headless una detrás de otra sobre la misma Petri.
+
+    La primera partida crea el plato; las siguientes lo reinician con
+    Petri.reiniciar(), así no se vuelven a reservar las rejillas ni a
+    calcular las distribuciones de nutrientes ya usadas. Con un cache de
+    resultados, las partidas con semilla cuyo código no cambió no se
+    vuelven a simular.
+    """
+
+    def __init__(self, clases_mo: Dict[int, Type[Microorganismo]], radio: int = R,
+                 ranking: Optional[RankingSystem] = None,
+                 reglas: Optional[List[ReglaTerminacion]] = None,
+                 dinamicas: Optional[List[DinamicaNutrientes]] = None,
+                 cache: Optional[CacheResultados] = None):
+        """
+        Args:
+            clases_mo: clases de microorganismos disponibles (por índice)
+            radio: radio del plato de todas las partidas
+            ranking: sistema de ranking donde se guarda cada partida al terminar
+            reglas: reglas de terminación anticipada de cada partida
+            dinamicas: dinámicas de los nutrientes de todas las partidas
+            cache: cache de resultados de partidas ya jugadas (None: siempre se simula)
+        """
+        self.clases_mo = clases_mo
+        self.radio = radio
+        self.ranking = ranking
+        self.reglas = reglas
+        self.dinamicas = dinamicas or []
+        self.cache = cache
+        self.petri: Optional[Petri] = None
+        self.jugadas = 0       # partidas simuladas
+        self.reutilizadas = 0  # partidas tomadas del cache
+
+    def jugar(self, dist: int, colonias: List[int], semilla: Optional[int] = None) -> dict:
+        """
+        Juega una partida headless y devuelve el resultado de la competencia
+        (del cache, con 'en_cache' en True, si ya se jugó con el mismo código).
+        """
+        from .graficacion import Graficadora
+        clave = None
+        if self.cache is not None and all(c in self.clases_mo for c in colonias):
+            clases = [self.clases_mo[c] for c in colonias]
+            clave = self.cache.clave(clases, dist, self.radio, semilla, self.reglas, self.dinamicas)
+            resultado = self.cache.buscar(clave) if clave is not None else None
+            if resultado is not None:
+                self.reutilizadas += 1
+                return resultado
+        with contextlib.redirect_stdout(io.StringIO()):
+            if self.petri is None:
+                self.petri = Petri(self.radio, dist, colonias, self.clases_mo, semilla=semilla)
+                self.petri.definir_dinamicas(self.dinamicas)
+            else:
+                self.petri.reiniciar(dist, colonias, semilla)
+            graficadora = Graficadora(headless=True, reglas=self.reglas)
+            graficadora.crear_ventanas(self.petri)
+        self.jugadas += 1
+        resultado = graficadora.resultado_competencia()
+        if clave is not None:
+            self.cache.guardar(clave, resultado)
+        return resultado
+
+    def ejecutar(self, partidas: Iterable[Partida]) -> List[dict]:
+        """
+        Juega todas las partidas. Cada resultado completo se guarda en el
+        ranking apenas termina la partida; al final se actualiza el ranking
+        diario.
+        """
+        # Importar matplotlib en modo sin gráficos antes de usar Graficadora
+        import matplotlib
+        matplotlib.use('Agg')
+
+        partidas = list(partidas)
+        resultados = []
+        for i, (dist, colonias) in enumerate(partidas, 1):
+            resultado = self.jugar(dist, colonias)
+            resultados.append(resultado)
+            estado = resultado['terminacion'] if resultado.get('completada', False) else "incompleta"
+            print(f"  [{i}/{len(partidas)}] d{dist} {resultado['enfrentamiento']}: "
+                  f"gana {resultado['ganador']} ({resultado['duracion']} pasos, {estado})")
+            if self.ranking is not None and resultado.get('completada', False):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.ranking.guardar_resultado_competencia(resultado)
+
+        if self.ranking is not None:
+            self.ranking.generar_ranking_diario()
+        return resultados
@@ -39,6 +39,19 @@ class Microorganismo(ABC):
         self.pos = p
         self.ene = e
 
+    def reiniciar(self) -> None:
+        """
+        Deja el MO como recién creado, para volver a usarlo en otro nacimiento
+        (ver Petri.reciclar_mos()).
+
+        Implementación por omisión: vacía sus atributos y vuelve a ejecutar
+        __init__, así el MO reciclado es igual a uno nuevo. Sobrescribir si
+        __init__ es caro y alcanza con volver algunos atributos a su valor
+        inicial.
+        """
+        self.__dict__.clear()
+        self.__init__()
+
     def decidir_movimiento(self, mov: Movimiento) -> None:
         """
         Método para decidir a dónde quiere moverse.
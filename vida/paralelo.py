@@ -0,0 +1,390 @@
+# =====================================================================
+# PARALELO: Simulación de un plato grande repartido en franjas entre
+#           varios procesos
+# =====================================================================
+"""
+Modo paralelo del motor.
+
+El plato se divide en franjas verticales (rangos de columnas x) y cada
+franja la atiende un proceso trabajador que es dueño de las instancias de
+los MOs que viven en ella. Las matrices del agar están en memoria
+compartida, así que nadie copia la grilla.
+
+Cada paso de tiempo tiene tres fases:
+
+1. Alimentación (proceso principal, vectorizada): todos los MOs comen el 1%
+   de los nutrientes de su celda y pagan E_VIVIR.
+2. Franjas (trabajadores, en paralelo): todos los MOs de la franja deciden
+   (decidir_movimiento y quiere_mitosis) mirando el agar como quedó después
+   de la fase 1. Una barrera espera a que todas las franjas terminen de
+   decidir; recién entonces cada trabajador aplica las reglas a sus MOs
+   interiores, en un orden aleatorio propio. Un MO interior no está en las
+   columnas de borde de su franja, así que todo lo que hace (moverse,
+   pelear, dividirse) queda dentro de la franja y no interfiere con las
+   demás.
+3. Reconciliación (proceso principal): los MOs de las columnas de borde
+   (el halo de una celda de cada franja) se aplican en un orden aleatorio.
+   Son los únicos que pueden moverse, pelear o dividirse hacia otra franja.
+   Las instancias que terminan en otra franja se mudan de trabajador.
+
+Cada MO actúa a lo sumo una vez por paso. Un MO que murió, o cuya celda
+ocupó otro, no actúa. Los MOs nacidos en el paso recién actúan en el
+siguiente. A diferencia del motor secuencial, todos deciden sobre la misma
+foto del agar.
+
+El azar de cada trabajador (incluido el módulo random que usan los MOs) se
+reinicia en cada paso con una semilla derivada de (semilla, tiempo, franja),
+y el de la reconciliación con (semilla, tiempo). Por eso una corrida es
+reproducible dada la semilla y la cantidad de franjas.
+"""
+
+import random
+import traceback
+import multiprocessing as mp
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from .definiciones import *
+from .agar import Agar, Descriptor, Posicion, Movimiento, VistaAgar, usar_agar
+from .microorganismo import Microorganismo
+from .petri import Petri
+
+# MOs en poder de un proceso: posición -> (identificador de colonia, instancia)
+Tenencia = Dict[Tuple[int, int], Tuple[int, Microorganismo]]
+
+
+def _semilla(semilla: int, tiempo: int, franja: int) -> int:
+    """Semilla del azar de una franja (-1: reconciliación) en un paso de tiempo"""
+    return (semilla * 1_000_003 + tiempo) * 1_009 + franja + 1
+
+
+class Reglas:
+    """
+    Reglas de la vida del modo paralelo, aplicadas directamente sobre las
+    matrices del agar. Reproducen las de Petri (costo de moverse, muerte,
+    mitosis, movimiento y combate) y anotan cada cambio como un evento:
+
+        ('nace', x, y, id)
+        ('muere', x, y, id, propio)   propio: si el MO estaba en `mos`
+        ('mueve', x, y, nx, ny, id)
+
+    `clases` da, por colonia, lo que se guarda en `mos` cuando nace un MO:
+    la clase del MO o, en el modo aislado, una ficha que lo representa.
+    """
+
+    def __init__(self, ocup: np.ndarray, ener: np.ndarray, radio: int,
+                 clases: List[Type[Microorganismo]]):
+        self.ocup = ocup
+        self.ener = ener
+        self.radio = radio
+        self.clases = clases
+        self.rng = random.Random()
+
+    def en_plato(self, x: int, y: int) -> bool:
+        r = self.radio
+        return (r - x) * (r - x) + (r - y) * (r - y) < r * r
+
+    def aplicar(self, x: int, y: int, id_mo: int, dx: int, dy: int, dup: bool,
+                mos: Tenencia, eventos: list) -> None:
+        """Aplica la decisión ya tomada por el MO de la posición x,y"""
+        ocup, ener = self.ocup, self.ener
+        movio = dx != 0 or dy != 0
+
+        # Restar energía por moverse y verificar si murió
+        if movio:
+            ener[x, y] = ener.item(x, y) - E_MOVERSE
+        if ener.item(x, y) <= 0:
+            self.morir(x, y, mos, eventos)
+            return
+
+        # Si quiere reproducirse
+        if dup:
+            self.mitosis(x, y, id_mo, mos, eventos)
+
+        # Movimiento o competencia (mismas reglas que Petri.puede_mover)
+        if movio and self.en_plato(x + dx, y + dy):
+            nx = x + (dx > 0) - (dx < 0)
+            ny = y + (dy > 0) - (dy < 0)
+            destino = ocup.item(nx, ny)
+            if destino == VACIO:
+                ocup[nx, ny] = id_mo
+                ener[nx, ny] = ener.item(x, y)
+                ocup[x, y] = VACIO
+                ener[x, y] = 0.0
+                if (x, y) in mos:
+                    mos[(nx, ny)] = mos.pop((x, y))
+                eventos.append(('mueve', x, y, nx, ny, id_mo))
+            elif destino != id_mo:
+                self.competir(x, y, nx, ny, mos, eventos)
+
+    def morir(self, x: int, y: int, mos: Tenencia, eventos: list) -> None:
+        id_mo = self.ocup.item(x, y)
+        self.ocup[x, y] = VACIO
+        self.ener[x, y] = 0.0
+        propio = mos.pop((x, y), None) is not None
+        eventos.append(('muere', x, y, id_mo, propio))
+
+    def competir(self, x: int, y: int, nx: int, ny: int, mos: Tenencia, eventos: list) -> None:
+        ener = self.ener
+        ener1 = ener.item(x, y)
+        ener2 = ener.item(nx, ny)
+        if ener2 == ener1:
+            ener2 += 0.01 if self.rng.random() > 0.5 else -0.01
+        if ener2 > ener1:
+            win, los = (nx, ny), (x, y)
+        else:
+            win, los = (x, y), (nx, ny)
+        diff = abs(ener2 - ener1)
+        ener[win] = ener.item(*win) + 0.075 * ener.item(*los)
+        ener[los] = ener.item(*los) - diff
+        if ener.item(*los) <= 0:
+            self.morir(los[0], los[1], mos, eventos)
+
+    def mitosis(self, x: int, y: int, id_mo: int, mos: Tenencia, eventos: list) -> None:
+        directions = [(dx, dy) for dx in [-1, 0, 1] for dy in [-1, 0, 1] if dx != 0 or dy != 0]
+        self.rng.shuffle(directions)
+        for dx, dy in directions:
+            nx, ny = x + dx, y + dy
+            if self.en_plato(nx, ny) and self.ocup.item(nx, ny) == VACIO:
+                ener1 = self.ener.item(x, y)
+                ener = ener1 * 0.5 - ener1 * 0.01  # Mitad menos 1%
+                self.ener[x, y] = ener
+                self.ocup[nx, ny] = id_mo
+                self.ener[nx, ny] = ener
+                mos[(nx, ny)] = (id_mo, self.clases[id_mo - 1]())
+                eventos.append(('nace', nx, ny, id_mo))
+                return
+
+
+def _trabajador_franja(conexion, barrera, franja: int, x0: int, x1: int, radio: int, semilla: int,
+                       descriptor: Descriptor, clases: List[Type[Microorganismo]]) -> None:
+    """
+    Proceso trabajador de una franja [x0, x1) del plato.
+
+    Los MOs leen el agar a través de una vista de sólo lectura; las reglas
+    escriben sobre otra vista de la misma memoria compartida. La barrera
+    garantiza que ninguna franja modifique el agar mientras otra decide.
+    """
+    vista = VistaAgar(descriptor)
+    escritura = Agar()
+    escritura.adjuntar(descriptor, solo_lectura=False)
+    ener = escritura.ener
+
+    reglas = Reglas(escritura.ocup, escritura.ener, radio, clases)
+    mos: Tenencia = {}
+    # Los MOs de la franja consultan la vista de sólo lectura
+    with usar_agar(vista):
+        try:
+            while True:
+                mensaje = conexion.recv()
+                if mensaje is None:
+                    break
+                tiempo, rx, ry, dist_n, llegadas, bajas = mensaje
+                vista.sincronizar(rx, ry, dist_n)
+                for pos in bajas:
+                    mos.pop(pos, None)
+                for x, y, id_mo, mo in llegadas:
+                    mos[(x, y)] = (id_mo, mo)
+
+                # Decisiones de todos los MOs de la franja sobre la misma foto del agar
+                random.seed(_semilla(semilla, tiempo, franja))
+                reglas.rng.seed(_semilla(semilla, tiempo, franja) + 1)
+                interiores, borde = [], []
+                for (x, y), (id_mo, mo) in sorted(mos.items()):
+                    mov = Movimiento(0, 0)
+                    mo.actualizar(id_mo, Posicion(x, y), ener.item(x, y))
+                    mo.decidir_movimiento(mov)
+                    decision = (x, y, id_mo, mo, mov.dx, mov.dy, mo.quiere_mitosis())
+                    if x0 < x < x1 - 1:
+                        interiores.append(decision)
+                    else:
+                        borde.append(decision)
+                barrera.wait()
+
+                # Reglas de los MOs interiores, en orden aleatorio
+                eventos = []
+                reglas.rng.shuffle(interiores)
+                for x, y, id_mo, mo, dx, dy, dup in interiores:
+                    if mos.get((x, y), (None, None))[1] is mo:
+                        reglas.aplicar(x, y, id_mo, dx, dy, dup, mos, eventos)
+
+                # Los MOs de borde que siguen vivos pasan a la reconciliación
+                frontera = []
+                for x, y, id_mo, mo, dx, dy, dup in borde:
+                    if mos.get((x, y), (None, None))[1] is mo:
+                        del mos[(x, y)]
+                        frontera.append((x, y, id_mo, mo, dx, dy, dup))
+                conexion.send(('ok', eventos, frontera))
+        except EOFError:
+            pass
+        except Exception:
+            barrera.abort()
+            conexion.send(('error', traceback.format_exc(), None))
+        finally:
+            del ener, reglas
+            escritura.soltar()
+            vista.cerrar()
+
+
+def alimentar(petri: Petri) -> None:
+    """Todos los MOs vivos comen el 1% de los nutrientes de su celda y pagan E_VIVIR (vectorizado)."""
+    agar = petri.agar
+    ocup, ener, nutri = agar.ocup, agar.ener, agar.nutri
+    xs, ys = petri.teselado.vivos(ocup)
+    ax, ay = agar.tablas_np()
+    xr, yr = ax[xs], ay[ys]
+    consumo = 0.01 * nutri[xr, yr]
+    nutri[xr, yr] = nutri[xr, yr] - consumo
+    ener[xs, ys] = ener[xs, ys] + consumo - E_VIVIR
+    petri.teselado.marcar(xs, ys)
+    petri.teselado.marcar(xr, yr, nutrientes=True)
+
+
+def registrar_eventos(petri: Petri, eventos: list) -> None:
+    """Actualiza el teselado y los contadores de las colonias con los eventos de un paso."""
+    for evento in eventos:
+        tipo = evento[0]
+        if tipo == 'nace':
+            _, x, y, id_mo = evento
+            petri.teselado.nacer(x, y, id_mo)
+            petri.colonias[id_mo - 1].n_mos_vivos += 1
+        elif tipo == 'muere':
+            _, x, y, id_mo, _ = evento
+            petri.teselado.morir(x, y, id_mo)
+            petri.colonias[id_mo - 1].n_mos_vivos -= 1
+        else:
+            _, x, y, nx, ny, id_mo = evento
+            petri.teselado.mover(x, y, nx, ny, id_mo)
+
+
+class PetriParalelo(Petri):
+    """
+    Cápsula de Petri que reparte el plato en franjas entre procesos.
+
+    Ver la documentación del módulo para la semántica de cada paso.
+    """
+
+    def __init__(self, radio: int, dist: int, colonias_seleccionadas: List[int],
+                 clases_mo: Dict[int, Type[Microorganismo]], semilla: Optional[int] = None,
+                 n_franjas: int = 2):
+        super().__init__(radio, dist, colonias_seleccionadas, clases_mo, semilla)
+        if not 1 <= n_franjas <= self.max_x // 4:
+            raise ValueError(f"La cantidad de franjas debe estar entre 1 y {self.max_x // 4}")
+        self.n_franjas = n_franjas
+        self.procesos = []
+        self.conexiones = []
+
+        # Bordes de las franjas: franja k = columnas [cortes[k], cortes[k + 1])
+        self.cortes = [round(k * self.max_x / n_franjas) for k in range(n_franjas + 1)]
+        self.franja_de = np.repeat(np.arange(n_franjas), np.diff(self.cortes))
+
+        # Pasar las matrices del agar a memoria compartida
+        descriptor = self.agar.compartir()
+        self.compartido = True
+
+        # Las instancias de los MOs se mudan de las colonias a los trabajadores
+        self.llegadas: List[list] = [[] for _ in range(n_franjas)]
+        self.bajas: List[list] = [[] for _ in range(n_franjas)]
+        for colonia in self.colonias:
+            for x, y, mo in colonia.extraer():
+                self.llegadas[self.franja_de[x]].append((x, y, colonia.identidad, mo))
+
+        clases = [colonia.clase_mo for colonia in self.colonias]
+        self.reglas = Reglas(self.agar.ocup, self.agar.ener, self.radio, clases)
+        contexto = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+        barrera = contexto.Barrier(n_franjas)
+        for k in range(n_franjas):
+            padre, hijo = contexto.Pipe()
+            proceso = contexto.Process(
+                target=_trabajador_franja, daemon=True,
+                args=(hijo, barrera, k, self.cortes[k], self.cortes[k + 1], self.radio, self.semilla,
+                      descriptor, clases))
+            proceso.start()
+            hijo.close()
+            self.procesos.append(proceso)
+            self.conexiones.append(padre)
+
+    def mover_colonias(self) -> None:
+        """Un paso de tiempo en tres fases: alimentación, franjas y reconciliación."""
+        self.tiempo += 1
+
+        # 1. Alimentación y costo de vivir (vectorizado)
+        alimentar(self)
+
+        # 2. Franjas en paralelo
+        for k, conexion in enumerate(self.conexiones):
+            conexion.send((self.tiempo, self.agar.rx, self.agar.ry, self.agar.dist_n, self.llegadas[k], self.bajas[k]))
+        frontera = []
+        for conexion in self.conexiones:
+            estado, eventos, borde = conexion.recv()
+            if estado != 'ok':
+                self.cerrar()
+                raise RuntimeError(f"Error en un trabajador del modo paralelo:\n{eventos}")
+            self.registrar_eventos(eventos)
+            frontera += borde
+
+        # 3. Reconciliación de los MOs de borde, en orden aleatorio
+        self.llegadas = [[] for _ in range(self.n_franjas)]
+        self.bajas = [[] for _ in range(self.n_franjas)]
+        tenencia: Tenencia = {(x, y): (id_mo, mo) for x, y, id_mo, mo, _, _, _ in frontera}
+        self.reglas.rng.seed(_semilla(self.semilla, self.tiempo, -1))
+        self.reglas.rng.shuffle(frontera)
+        eventos = []
+        for x, y, id_mo, mo, dx, dy, dup in frontera:
+            if tenencia.get((x, y), (None, None))[1] is mo:
+                self.reglas.aplicar(x, y, id_mo, dx, dy, dup, tenencia, eventos)
+        self.registrar_eventos(eventos)
+
+        # Los MOs muertos de los trabajadores se dan de baja y las instancias
+        # en poder de la reconciliación vuelven a la franja donde quedaron
+        for evento in eventos:
+            if evento[0] == 'muere' and not evento[4]:
+                self.bajas[self.franja_de[evento[1]]].append((evento[1], evento[2]))
+        for (x, y), (id_mo, mo) in tenencia.items():
+            self.llegadas[self.franja_de[x]].append((x, y, id_mo, mo))
+
+        # Mover nutrientes
+        self.mover_nutrientes()
+
+    def registrar_eventos(self, eventos: list) -> None:
+        registrar_eventos(self, eventos)
+
+    def reiniciar(self, dist: int, colonias_seleccionadas: List[int], semilla: Optional[int] = None) -> None:
+        """Los trabajadores tienen el estado de la partida: para otra, crear un PetriParalelo nuevo."""
+        raise NotImplementedError("PetriParalelo no se puede reiniciar")
+
+    def capturar(self):
+        """Los MOs viven en los trabajadores: los puntos de control son sólo del motor secuencial."""
+        raise NotImplementedError("PetriParalelo no admite puntos de control")
+
+    def restaurar(self, punto) -> None:
+        raise NotImplementedError("PetriParalelo no admite puntos de control")
+
+    def cerrar(self) -> None:
+        """Termina los trabajadores y libera la memoria compartida."""
+        for conexion in self.conexiones:
+            try:
+                conexion.send(None)
+            except (OSError, ValueError):
+                pass
+        for proceso in self.procesos:
+            proceso.join(timeout=5)
+            if proceso.is_alive():
+                proceso.terminate()
+        for conexion in self.conexiones:
+            conexion.close()
+        self.procesos = []
+        self.conexiones = []
+        if self.compartido:
+            self.reglas = None
+            self.agar.liberar()
+            self.compartido = False
+
+    def __del__(self):
+        """Destructor"""
+        try:
+            self.cerrar()
+        except (AttributeError, TypeError):
+            pass
+        super().__del__()
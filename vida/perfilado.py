@@ -0,0 +1,163 @@
+# =====================================================================
+# PERFILADO: cProfile y tracemalloc sobre el código de una sola colonia
+# Sirve para diagnosticar MOs lentos o que pierden memoria y devolverle
+# el informe a su autor.
+# =====================================================================
+
+import io
+import os
+import time
+import inspect
+import cProfile
+import pstats
+import tracemalloc
+from typing import List, Optional, Type
+
+from .microorganismo import Microorganismo
+
+
+class PerfiladorColonia:
+    """
+    Perfila sólo las llamadas a decidir_movimiento y quiere_mitosis de los MOs
+    de una colonia.
+
+    Colonia.vivir llama a antes() y despues() alrededor de esas llamadas, y
+    Petri avisa el fin de cada paso con cerrar_paso(). Por paso se guarda la
+    cantidad de llamadas, su tiempo y la memoria neta que dejaron asignada.
+
+    cProfile sólo está activo durante las llamadas del MO, pero tracemalloc
+    sigue todas las asignaciones del proceso: la competencia entera corre
+    varias veces más lenta mientras se perfila.
+    """
+
+    def __init__(self, clase_mo: Type[Microorganismo], top: int = 20):
+        """
+        Args:
+            clase_mo: clase de los MOs de la colonia perfilada
+            top: cantidad de funciones y de líneas que se muestran en el informe
+        """
+        self.clase_mo = clase_mo
+        self.top = top
+        self.perfil = cProfile.Profile()
+        try:
+            self.archivo_mo: Optional[str] = inspect.getfile(clase_mo)
+        except TypeError:
+            self.archivo_mo = None
+        # Por paso de tiempo
+        self.llamadas: List[int] = []
+        self.segundos: List[float] = []
+        self.memoria: List[int] = []   # bytes netos asignados por el MO en el paso
+        # Acumuladores del paso en curso
+        self._llamadas = 0
+        self._segundos = 0.0
+        self._memoria = 0
+        self._t0 = 0.0
+        self._m0 = 0
+        self._iniciado_tracemalloc = False
+        self._foto_inicial = None
+        self._foto_final = None
+
+    def iniciar(self) -> None:
+        """Arranca tracemalloc (si no estaba) y toma la foto inicial de memoria"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciado_tracemalloc = True
+        self._foto_inicial = self._foto()
+
+    def _foto(self):
+        foto = tracemalloc.take_snapshot()
+        if self.archivo_mo:
+            foto = foto.filter_traces([tracemalloc.Filter(True, self.archivo_mo)])
+        return foto
+
+    # -----------------------------------------------------------------
+    # Avisos de Colonia.vivir y de Petri
+    # -----------------------------------------------------------------
+    def antes(self) -> None:
+        self._m0 = tracemalloc.get_traced_memory()[0]
+        self._t0 = time.perf_counter()
+        self.perfil.enable()
+
+    def despues(self) -> None:
+        self.perfil.disable()
+        self._segundos += time.perf_counter() - self._t0
+        self._memoria += tracemalloc.get_traced_memory()[0] - self._m0
+        self._llamadas += 1
+
+    def cerrar_paso(self) -> None:
+        self.llamadas.append(self._llamadas)
+        self.segundos.append(self._segundos)
+        self.memoria.append(self._memoria)
+        self._llamadas = 0
+        self._segundos = 0.0
+        self._memoria = 0
+
+    def terminar(self) -> None:
+        """Toma la foto final de memoria y detiene tracemalloc si lo arrancó este perfilador"""
+        self._foto_final = self._foto() if tracemalloc.is_tracing() else None
+        if self._iniciado_tracemalloc:
+            tracemalloc.stop()
+            self._iniciado_tracemalloc = False
+
+    # -----------------------------------------------------------------
+    # Informe
+    # -----------------------------------------------------------------
+    def informe(self) -> str:
+        """Funciones más costosas y crecimiento de memoria por paso"""
+        nombre = self.clase_mo().nombre()
+        pasos = len(self.llamadas)
+        total_llamadas = sum(self.llamadas)
+        total_segundos = sum(self.segundos)
+        lineas = ["=" * 80,
+                  f"PERFIL DE COLONIA: {nombre} ({self.archivo_mo or self.clase_mo.__module__})",
+                  "=" * 80,
+                  f"Pasos: {pasos}, llamadas: {total_llamadas}, tiempo en el MO: {total_segundos:.4f} s"]
+        if total_llamadas:
+            lineas.append(f"Tiempo medio por llamada: {1e6 * total_segundos / total_llamadas:.1f} us")
+        if pasos:
+            peor = max(range(pasos), key=lambda t: self.segundos[t])
+            lineas.append(f"Paso más lento: {peor + 1} ({self.segundos[peor]:.4f} s, {self.llamadas[peor]} llamadas)")
+
+        # Funciones más costosas (tiempo propio)
+        lineas += ["", f"Funciones más costosas (top {self.top}, por tiempo propio):"]
+        salida = io.StringIO()
+        try:
+            estadisticas = pstats.Stats(self.perfil, stream=salida)
+            estadisticas.strip_dirs().sort_stats('tottime').print_stats(self.top)
+            lineas.append(salida.getvalue().rstrip())
+        except TypeError:  # el perfil está vacío
+            lineas.append("  (sin llamadas)")
+
+        # Memoria
+        lineas += ["", "Memoria neta asignada por el MO en cada paso:"]
+        if pasos:
+            acumulada = sum(self.memoria)
+            lineas.append(f"  total: {acumulada / 1024:.1f} KB, media por paso: {acumulada / pasos / 1024:.2f} KB, "
+                          f"máximo en un paso: {max(self.memoria) / 1024:.1f} KB")
+            # Crecimiento por décimos de la competencia, para ver pérdidas sostenidas
+            tramo = max(1, pasos // 10)
+            for i in range(0, pasos, tramo):
+                bloque = self.memoria[i:i + tramo]
+                lineas.append(f"  pasos {i + 1:>6}-{i + len(bloque):<6} {sum(bloque) / 1024:>10.1f} KB")
+        if self._foto_inicial is not None and self._foto_final is not None:
+            lineas += ["", f"Líneas del MO con más memoria retenida (top {self.top}):"]
+            diferencias = self._foto_final.compare_to(self._foto_inicial, 'lineno')
+            for dif in diferencias[:self.top]:
+                lineas.append(f"  {dif}")
+        lineas.append("=" * 80)
+        return "\n".join(lineas)
+
+    def guardar(self, directorio: str, marca: str) -> str:
+        """
+        Guarda el informe en texto y el perfil en formato pstats (para snakeviz
+        o gprof2dot). Devuelve la ruta del informe.
+        """
+        os.makedirs(directorio, exist_ok=True)
+        base = os.path.join(directorio, f"perfil_{self.clase_mo.__name__}_{marca}")
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(self.informe() + "\n")
+        try:
+            self.perfil.dump_stats(base + '.prof')
+        except TypeError:
+            pass
+        return base + '.txt'
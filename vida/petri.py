@@ -3,13 +3,20 @@
 # =====================================================================
 
 import random
-import math
 import time
-from typing import List, Dict, Type, Tuple
+import numpy as np
+from typing import List, Dict, Type, Tuple, Optional
 from .definiciones import *
-from .agar import Posicion, Movimiento, agar, Celda
-from .colonia import Colonia
+from .agar import Agar, Posicion, Movimiento, usar_agar, activar_agar
+from .colonia import Colonia, ReservaMOs
 from .microorganismo import Microorganismo
+from .teselas import Teselado
+from .instrumentacion import Instrumentacion
+from .perfilado import PerfiladorColonia
+from .dinamica import DinamicaNutrientes
+from .terminacion import ReglaTerminacion
+from .distribuciones import nutrientes_incorporados, registro_distribuciones
+from .guardado import GuardadoPeriodico, PuntoControl, MATRICES, escribir, leer, serializar, deserializar
 
 class Petri:
     """
@@ -20,12 +27,58 @@ class Petri:
     @autor Diego (traducido a Python también por Diego)
     """
 
-    def __init__(self, radio: int, dist: int, colonias_seleccionadas: List[int], clases_mo: Dict[int, Type[Microorganismo]]):
+    def __init__(self, radio: int, dist: int, colonias_seleccionadas: List[int], clases_mo: Dict[int, Type[Microorganismo]],
+                 semilla: Optional[int] = None):
+        self.armar_plato(radio, clases_mo)
+        self.preparar(dist, colonias_seleccionadas, semilla)
+
+    def armar_plato(self, radio: int, clases_mo: Dict[int, Type[Microorganismo]]) -> None:
+        """Reserva el plato vacío (agar y estructuras), sin colonias ni nutrientes."""
         # Dimensiones
         self.radio: int = radio
         self.max_x: int = 2 * radio
         self.max_y: int = 2 * radio
+        self.max_tx_col: float = PROD_X_COL / 1e6  # tiempo máximo por movimiento de colonia
 
+        # Estructuras principales
+        self.colonias: List[Colonia] = []
+        self.clases_microorg = clases_mo
+        self.instr: Optional[Instrumentacion] = None  # ver instrumentar()
+        self.perfilador: Optional[PerfiladorColonia] = None  # ver perfilar_colonia()
+        self.teselado: Optional[Teselado] = None
+        self.dinamicas: List[DinamicaNutrientes] = []  # ver definir_dinamicas()
+        self.guardado: Optional[GuardadoPeriodico] = None  # ver puntos_de_control()
+        self.reglas: List[ReglaTerminacion] = []  # ver definir_reglas()
+        self.max_reciclados: Optional[int] = None  # ver reciclar_mos()
+        # Colonias de la partida anterior que se pueden volver a usar (ver reiniciar())
+        self._reciclables: List[Colonia] = []
+        # Nutrientes iniciales ya calculados de cada distribución: (matriz, total)
+        self._distribuciones: Dict[int, Tuple[np.ndarray, float]] = {}
+
+        # Agar propio de esta simulación (todas las celdas vacías). Mientras
+        # corren los MOs queda activo como `vida.agar.agar`
+        self.agar: Agar = Agar()
+        self.agar.dimensionar(self.max_x, self.max_y)
+
+    def reiniciar(self, dist: int, colonias_seleccionadas: List[int], semilla: Optional[int] = None) -> None:
+        """
+        Prepara una partida nueva en el mismo plato, sin volver a reservar memoria.
+
+        Se reutilizan las matrices del agar, el teselado y las colonias (con sus
+        rejillas); con la misma semilla el resultado es idéntico al de crear
+        una Petri nueva. La instrumentación y el perfilado se desactivan.
+        """
+        self.instrumentar(None)
+        self.perfilador = None
+        for colonia in self.colonias:
+            colonia.perfilador = None
+        self._reciclables = self.colonias
+        self.colonias = []
+        self.agar.vaciar()
+        self.preparar(dist, colonias_seleccionadas, semilla)
+
+    def preparar(self, dist: int, colonias_seleccionadas: List[int], semilla: Optional[int]) -> None:
+        """Siembra las colonias y los nutrientes de una partida sobre un agar vacío."""
         # Desplazamiento de nutrientes (x,y)
         self.despl_x: int = 0
         self.despl_y: int = 0
@@ -33,83 +86,74 @@ class Petri:
         # Distribución y tiempo
         self.dist_n: int = dist  # distribución de nutrientes actual
         self.tiempo: int = 0     # contador de tiempo
-        self.max_tx_col: float = PROD_X_COL / 1e6  # tiempo máximo por movimiento de colonia
-
-        # Estructuras principales
-        self.colonias: List[Colonia] = []
         self.vivos: List[Posicion] = []
-        self.clases_microorg = clases_mo
-        
-        # Aleatoriza la corrida
-        random.seed(int(time.time()))
-
-        # Crear la matriz de celdas
-        agar.celdas = [[Celda() for _ in range(self.max_y)] for _ in range(self.max_x)]
-        agar.mx_x = self.max_x
-        agar.mx_y = self.max_y
-
-        # Inicializar celdas
-        for x in range(self.max_x):
-            for y in range(self.max_y):
-                agar.celdas[x][y].id_mo = VACIO
-
-        # Crear colonias
-        for c in range(N_COL):
-            self.agregar_colonia(radio, colonias_seleccionadas[c])
-
-        # Asignar posiciones y energías iniciales
-        for c in range(N_COL):
-            mo = 0
-            while mo < MOS_INICIAL:
-                pos = Posicion(random.randint(0, self.max_x - 1),
-                               random.randint(0, self.max_y - 1))
-                if self.esta_en_plato(pos):
-                    if agar.celdas[pos.x][pos.y].id_mo == VACIO:
-                        self.crear_mo(pos, c + 1, E_INICIAL)
-                        mo += 1
-
-        # Calcular la distribución de nutrientes
-        self.dist_n = dist
-        total_nutri = 0.0
-
-        for x in range(self.max_x):
-            for y in range(self.max_y):
-                nutrient_value = self.calcular_nutrientes(x, y, dist)
-                agar.celdas[x][y].nutrientes = nutrient_value
-                total_nutri += nutrient_value
+        # Estado de las reglas de terminación de un punto de control, hasta que
+        # la Graficadora lo retoma (None: partida nueva)
+        self.reglas_guardadas: Optional[list] = None
+
+        # Aleatoriza la corrida (o la hace reproducible si se da una semilla)
+        self.semilla: int = int(time.time()) if semilla is None else semilla
+        random.seed(self.semilla)
+
+        # Los MOs se crean con el agar de esta simulación activo
+        with usar_agar(self.agar):
+            # Crear colonias (entre 1 y MAX_COLS)
+            for seleccionada in colonias_seleccionadas[:MAX_COLS]:
+                self.agregar_colonia(self.radio, seleccionada)
+            self._reciclables = []
+
+            # Índice por teselas de MOs vivos y nutrientes
+            if self.teselado is None:
+                self.teselado = Teselado(self.max_x, self.max_y, len(self.colonias))
+            else:
+                self.teselado.reiniciar(len(self.colonias))
+
+            # Paso en que se extinguió cada colonia (ver registrar_extinciones())
+            self.extinciones: List[Optional[int]] = [None] * len(self.colonias)
+
+            # Asignar posiciones y energías iniciales
+            for c in range(len(self.colonias)):
+                mo = 0
+                while mo < MOS_INICIAL:
+                    pos = Posicion(random.randint(0, self.max_x - 1),
+                                   random.randint(0, self.max_y - 1))
+                    if self.esta_en_plato(pos):
+                        if self.agar.ocup[pos.x, pos.y] == VACIO:
+                            self.crear_mo(pos, c + 1, E_INICIAL)
+                            mo += 1
+
+        # Fuera de los pasos, `vida.agar.agar` es el de la última simulación
+        # creada en este contexto (como con el agar único de antes)
+        activar_agar(self.agar)
+
+        nutri, total_nutri = self.nutrientes_iniciales(dist)
+        self.agar.nutri[...] = nutri
+        self.nutri_inicial: np.ndarray = nutri  # no modificar: se comparte entre partidas
+        for dinamica in self.dinamicas:
+            dinamica.reiniciar(self.nutri_inicial)
+        self.teselado.recalcular_nutrientes(self.agar.nutri)
 
         print(f"Total de nutrientes: {total_nutri}")
 
-        agar.dist_n = self.dist_n
-        agar.rx = random.randint(0, self.max_x - 1) - self.max_x // 2
-        agar.ry = random.randint(0, self.max_y - 1) - self.max_y // 2
+        self.agar.dist_n = self.dist_n
+        self.agar.rx = random.randint(0, self.max_x - 1) - self.max_x // 2
+        self.agar.ry = random.randint(0, self.max_y - 1) - self.max_y // 2
         self.dx = random.randint(-1, 1)
         self.dy = random.randint(-1, 1)
 
+    def nutrientes_iniciales(self, dist: int) -> Tuple[np.ndarray, float]:
+        """
+        Nutrientes iniciales de una distribución y su total: del cache del
+        registro (mapeados en memoria), una sola vez por distribución.
+        """
+        if dist not in self._distribuciones:
+            nutri = registro_distribuciones().campo(dist, self.max_x, self.max_y)
+            self._distribuciones[dist] = (nutri, float(nutri.sum()))
+        return self._distribuciones[dist]
+
     def calcular_nutrientes(self, x: int, y: int, dist: int) -> float:
-        """Calcula la cantidad de nutrientes según el tipo de distribución."""
-        max_x, max_y = self.max_x, self.max_y
-
-        if dist == 1:  # Plano inclinado
-            return MAX_NUTRI * (max_x - x) * (max_y - y) / (max_x * max_y) / 2.875
-        elif dist == 2:  # Barra vertical
-            return MAX_NUTRI / 4.2 if max_x // 2 - 5 < x < max_x // 2 + 5 else 0.0
-        elif dist == 3:  # Anillo
-            center_x, center_y = 0.5 * max_x, 0.5 * max_y
-            dist_from_center = (x - center_x) ** 2 + (y - center_y) ** 2
-            return MAX_NUTRI / 1.008 if 40 < dist_from_center < 115 else 0.0
-        elif dist == 4:  # Rejilla (lattice)
-            if (x + y) % (max_x // 4) <= 1 or (y - x) % (max_x // 3) <= 1:
-                return MAX_NUTRI * (max_x - x) * (max_y - y) / (max_x * max_y) * 1.277
-            return 0.0
-        elif dist == 5:  # Dos gaussianas
-            term1 = math.exp(-((x - 0.6 * max_x / 2) / (max_x / 8)) ** 2 - ((y - 0.6 * max_y / 2) / (max_y / 8)) ** 2)
-            term2 = math.exp(-((x - 1.4 * max_x / 2) / (max_x / 8)) ** 2 - ((y - 1.4 * max_y / 2) / (max_y / 8)) ** 2)
-            return MAX_NUTRI * (term1 + term2)
-        elif dist == 6:  # Hambruna (uniforme)
-            return MAX_NUTRI / 11.062
-        else:
-            return 0.0
+        """Calcula la cantidad de nutrientes según el tipo de distribución (sólo las incorporadas)."""
+        return nutrientes_incorporados(x, y, dist, self.max_x, self.max_y)
 
     def __del__(self):
         """Destructor"""
@@ -123,22 +167,45 @@ class Petri:
 
     def mover_colonias(self) -> None:
         """Aplicar reglas de la vida y avanzar las colonias."""
-        # Avanzar tiempo
+        # Los MOs consultan el agar de esta simulación
+        with usar_agar(self.agar):
+            self._mover_colonias()
+        self.registrar_extinciones()
+        if self.guardado is not None:
+            self.guardado.paso(self)
+
+    def registrar_extinciones(self) -> None:
+        """Anota el paso en que cada colonia se quedó sin MOs (define los puestos finales)."""
+        for c, colonia in enumerate(self.colonias):
+            if self.extinciones[c] is None and colonia.n_vivos() == 0:
+                self.extinciones[c] = self.tiempo
+
+    def _mover_colonias(self) -> None:
+        # Avanzar tiempo (los campos de distancia del agar se recalculan si se piden)
         self.tiempo += 1
+        self.agar.nuevo_paso()
 
-        # Construir vector con las posiciones de organismos vivos
-        n_mos = sum(col.n_vivos() for col in self.colonias)
-        self.vivos = []
+        # Instrumentación opcional (None: sin costo más allá de estas comparaciones)
+        instr = self.instr
+        if instr is not None:
+            reloj = instr.reloj
+            instr.nuevo_paso(self.tiempo)
+            t0 = reloj()
 
-        for x in range(self.max_x):
-            for y in range(self.max_y):
-                if agar.celdas[x][y].id_mo != VACIO:
-                    self.vivos.append(Posicion(x, y))
+        # Construir vector con las posiciones de organismos vivos
+        # (sólo se recorren las teselas ocupadas)
+        ocup, ener, nutri = self.agar.ocup, self.agar.ener, self.agar.nutri
+        # Índices de nutrientes de cada fila y columna (el desplazamiento no cambia durante el paso)
+        ix, iy = self.agar.tablas()
+        xs, ys = self.teselado.vivos(ocup)
+        self.vivos = [Posicion(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
 
         # Vector para recorrer aleatoriamente todos los organismos vivos
         initial_count = len(self.vivos)
         rand_indices = list(range(initial_count))
         random.shuffle(rand_indices)
+        if instr is not None:
+            instr.sumar('vivos', reloj() - t0)
 
         # Bucle principal de reglas
         for m in range(initial_count):
@@ -149,22 +216,26 @@ class Petri:
                 continue  # Saltar este organismo, murió
 
             x, y = self.vivos[rm].x, self.vivos[rm].y
-            id_mo = agar.celdas[x][y].id_mo
+            id_mo = ocup.item(x, y)
 
             if id_mo != VACIO:  # Podría haber muerto en combate con otro MO previo
                 c = id_mo - 1  # índice de colonia
-                xr = (x + agar.rx) % self.max_x
-                yr = (y + agar.ry) % self.max_y
+                if instr is not None:
+                    t0 = reloj()
+                xr, yr = ix[x], iy[y]
 
                 # Comer en la posición actual
-                nutrient_consumption = 0.01 * agar.celdas[xr][yr].nutrientes
-                agar.celdas[x][y].energia_mo += nutrient_consumption
-                agar.celdas[xr][yr].nutrientes -= nutrient_consumption
-                if agar.celdas[xr][yr].nutrientes < 0:
-                    agar.celdas[xr][yr].nutrientes = 0.0
+                nutrientes = nutri.item(xr, yr)
+                nutrient_consumption = 0.01 * nutrientes
+                nutrientes -= nutrient_consumption
+                nutri[xr, yr] = nutrientes if nutrientes >= 0 else 0.0
+                self.teselado.comer(xr, yr)
 
                 # Restar energía por vivir
-                agar.celdas[x][y].energia_mo -= E_VIVIR
+                ener[x, y] = ener.item(x, y) + nutrient_consumption - E_VIVIR
+                self.teselado.energia(x, y)
+                if instr is not None:
+                    instr.sumar('comer', reloj() - t0)
 
                 # Pedir al MO que ejecute una iteración de vida
                 if c < len(self.colonias):
@@ -172,42 +243,248 @@ class Petri:
 
                     # Restar energía por moverse
                     if self.colonias[c].movio(x, y):
-                        agar.celdas[x][y].energia_mo -= E_MOVERSE
+                        ener[x, y] = ener.item(x, y) - E_MOVERSE
 
                     # Verificar si murió
                     old = Posicion(x, y)
-                    if agar.celdas[x][y].energia_mo <= 0:
+                    if ener.item(x, y) <= 0:
                         self.eliminar_mo(old)
+                        if instr is not None:
+                            instr.contar(c, 'muertes')
+                            instr.contar(c, 'muertes_inanicion')
                     else:
                         # Si quiere reproducirse
                         if self.colonias[c].duplica(x, y):
+                            if instr is not None:
+                                t0 = reloj()
                             self.mitosis(old)
+                            if instr is not None:
+                                instr.sumar('mitosis', reloj() - t0)
 
                         # Movimiento o competencia
                         if self.colonias[c].movio(x, y):
+                            if instr is not None:
+                                instr.contar(c, 'movimientos_intentados')
+                                t0 = reloj()
                             neu = Posicion(0, 0)
                             if self.puede_mover(old, self.colonias[c].movimiento(x, y), neu):
-                                        if agar.celdas[neu.x][neu.y].id_mo == VACIO:
-                                            self.mover_mo(old, neu)
-                                        else:
-                                            if agar.celdas[neu.x][neu.y].id_mo != id_mo:
-                                                self.competir(old, neu)
+                                if ocup.item(neu.x, neu.y) == VACIO:
+                                    self.mover_mo(old, neu)
+                                    if instr is not None:
+                                        instr.contar(c, 'movimientos_aceptados')
+                                        instr.sumar('mover', reloj() - t0)
+                                elif ocup.item(neu.x, neu.y) != id_mo:
+                                    self.competir(old, neu)
+                                    if instr is not None:
+                                        instr.sumar('competir', reloj() - t0)
 
         # Mover nutrientes
+        if instr is not None:
+            t0 = reloj()
+        self.mover_nutrientes()
+        if instr is not None:
+            instr.sumar('deriva', reloj() - t0)
+            instr.cerrar_paso([colonia.n_vivos() for colonia in self.colonias])
+        if self.perfilador is not None:
+            self.perfilador.cerrar_paso()
+
+    def mover_nutrientes(self) -> None:
+        """
+        Deriva de los nutrientes: se desplazan 5 de cada 10 pasos, cambiando de
+        rumbo cada 6. Después se aplican las dinámicas que correspondan al paso.
+        """
         if self.tiempo % 10 < 5:
             if self.tiempo % 6 == 0:
                 self.dx = random.randint(-1, 1)
                 self.dy = random.randint(-1, 1)
-            agar.rx += self.dx
-            agar.ry += self.dy
+            self.agar.rx += self.dx
+            self.agar.ry += self.dy
+
+        # Rebrote, difusión y decaimiento (sobre toda la matriz de nutrientes)
+        if self.dinamicas:
+            aplicadas = False
+            for dinamica in self.dinamicas:
+                if self.tiempo % dinamica.cada == 0:
+                    dinamica.aplicar(self.agar.nutri)
+                    aplicadas = True
+            if aplicadas:
+                self.teselado.recalcular_nutrientes(self.agar.nutri)
+
+    def definir_reglas(self, reglas: List[ReglaTerminacion]) -> None:
+        """Reglas de terminación de la partida: su estado se guarda en los puntos de control."""
+        self.reglas = reglas
+
+    def definir_dinamicas(self, dinamicas: List[DinamicaNutrientes]) -> None:
+        """Dinámicas de los nutrientes que se aplican en cada paso (se mantienen al reiniciar)."""
+        self.dinamicas = list(dinamicas)
+        for dinamica in self.dinamicas:
+            dinamica.reiniciar(self.nutri_inicial)
+
+    # -----------------------------------------------------------------
+    # Puntos de control
+    # -----------------------------------------------------------------
+    def puntos_de_control(self, guardado: Optional[GuardadoPeriodico]) -> None:
+        """Guarda puntos de control periódicos durante la partida (None: no guarda)."""
+        self.guardado = guardado
+
+    def capturar(self) -> PuntoControl:
+        """
+        Estado completo de la partida en este paso: matrices del agar,
+        desplazamiento y rumbo de los nutrientes, colonias con sus MOs (y la
+        última decisión de cada uno), paso de extinción de cada colonia,
+        dinámicas, estado de las reglas de terminación y generadores
+        aleatorios. Las reglas todavía no evaluaron este paso (lo hace la
+        Graficadora después): al reanudar se evalúa.
+        """
+        colonias = []
+        for colonia in self.colonias:
+            ocupantes = [(x, y, o.mo, o.mov.dx, o.mov.dy, o.duplica)
+                         for (x, y), o in sorted(colonia.ocupantes.items())]
+            clase = colonia.clase_mo
+            colonias.append((f'{clase.__module__}.{clase.__qualname__}', colonia.identidad, ocupantes))
+        estado = {
+            'radio': self.radio,
+            'dist': self.dist_n,
+            'semilla': self.semilla,
+            'tiempo': self.tiempo,
+            'rx': self.agar.rx,
+            'ry': self.agar.ry,
+            'dx': self.dx,
+            'dy': self.dy,
+            'colonias': colonias,
+            'extinciones': list(self.extinciones),
+            'reglas': [(type(regla).__name__, regla.configuracion(), regla.estado()) for regla in self.reglas],
+            'dinamicas': self.dinamicas,
+            'random': random.getstate(),
+            'np_random': np.random.get_state(),
+        }
+        matrices = {nombre: getattr(self.agar, nombre).copy() for nombre in MATRICES}
+        return PuntoControl(matrices, serializar(estado), self.tiempo)
+
+    def guardar(self, ruta: str) -> None:
+        """Escribe un punto de control de la partida en `ruta` (.npz)."""
+        escribir(self.capturar(), ruta)
+
+    def restaurar(self, punto: PuntoControl) -> None:
+        """
+        Vuelve la partida al estado de un punto de control del mismo radio,
+        reutilizando el plato como reiniciar(). Las clases de las colonias se
+        buscan entre las de esta Petri.
+        """
+        estado = deserializar(punto.estado)
+        if estado['radio'] != self.radio:
+            raise ValueError(f"El punto de control es de un plato de radio {estado['radio']}, no {self.radio}")
+        clases = {f'{c.__module__}.{c.__qualname__}': c for c in self.clases_microorg.values()}
+        faltan = [nombre for nombre, _, _ in estado['colonias'] if nombre not in clases]
+        if faltan:
+            raise ValueError(f"Microorganismos del punto de control no disponibles: {', '.join(faltan)}")
+
+        self.instrumentar(None)
+        self.perfilador = None
+        for colonia in self.colonias:
+            colonia.perfilador = None
+        self._reciclables = self.colonias
+        self.colonias = []
+        self.agar.vaciar()
+
+        self.despl_x = 0
+        self.despl_y = 0
+        self.dist_n = estado['dist']
+        self.semilla = estado['semilla']
+        self.tiempo = estado['tiempo']
+        self.vivos = []
+        self.reglas_guardadas = estado.get('reglas', [])
+        for nombre in MATRICES:
+            getattr(self.agar, nombre)[...] = punto.matrices[nombre]
+
+        with usar_agar(self.agar):
+            for nombre, identidad, ocupantes in estado['colonias']:
+                if self._reciclables:
+                    colonia = self._reciclables.pop(0)
+                    colonia.reiniciar(clases[nombre], identidad)
+                else:
+                    colonia = Colonia(clases[nombre], identidad, self.radio)
+                for x, y, mo, dx, dy, duplica in ocupantes:
+                    colonia.insertar(x, y, mo, Movimiento(dx, dy), duplica)
+                self.colonias.append(colonia)
+            self._reciclables = []
+        activar_agar(self.agar)
+        # (los puntos de control anteriores no las tienen: se toman las de ahora)
+        self.extinciones = estado.get('extinciones') or [
+            None if colonia.n_vivos() > 0 else self.tiempo for colonia in self.colonias]
+
+        if self.teselado is None:
+            self.teselado = Teselado(self.max_x, self.max_y, len(self.colonias))
+        self.teselado.reconstruir(len(self.colonias), self.agar.ocup, self.agar.nutri)
+
+        self.nutri_inicial = self.nutrientes_iniciales(self.dist_n)[0]
+        self.dinamicas = estado['dinamicas']
+        for dinamica in self.dinamicas:
+            dinamica.reiniciar(self.nutri_inicial)
+
+        self.agar.dist_n = self.dist_n
+        self.agar.rx = estado['rx']
+        self.agar.ry = estado['ry']
+        self.dx = estado['dx']
+        self.dy = estado['dy']
+        random.setstate(estado['random'])
+        np.random.set_state(estado['np_random'])
+
+    @classmethod
+    def reanudar(cls, ruta: str, clases_mo: Dict[int, Type[Microorganismo]]) -> 'Petri':
+        """
+        Crea una Petri con la partida de un punto de control escrito con
+        guardar(). El plato se arma vacío y se restaura directamente, sin
+        sembrar antes una partida nueva.
+        """
+        punto = leer(ruta)
+        petri = cls.__new__(cls)
+        petri.armar_plato(deserializar(punto.estado)['radio'], clases_mo)
+        petri.restaurar(punto)
+        return petri
+
+    def instrumentar(self, instr: Optional[Instrumentacion]) -> None:
+        """Activa (o desactiva con None) la instrumentación del motor y de las colonias."""
+        self.instr = instr
+        for colonia in self.colonias:
+            colonia.instr = instr
+
+    def reciclar_mos(self, maximo: Optional[int]) -> None:
+        """
+        Recicla los MOs muertos de cada colonia en los nacimientos siguientes
+        (hasta `maximo` guardados por colonia; None: desactivado). Se mantiene
+        al reiniciar.
+        """
+        self.max_reciclados = maximo
+        for colonia in self.colonias:
+            colonia.reserva = ReservaMOs(maximo) if maximo else None
+
+    def reciclados(self) -> List[Tuple[int, int]]:
+        """(aciertos, fallos) de la reserva de cada colonia en los nacimientos"""
+        return [(c.reserva.aciertos, c.reserva.fallos) if c.reserva is not None else (0, 0)
+                for c in self.colonias]
+
+    def perfilar_colonia(self, id: int, perfilador: Optional[PerfiladorColonia] = None) -> PerfiladorColonia:
+        """
+        Perfila las decisiones de los MOs de la colonia `id` (desde 1).
+
+        Devuelve el perfilador, que hay que terminar() al final de la competencia.
+        """
+        colonia = self.colonias[id - 1]
+        if perfilador is None:
+            perfilador = PerfiladorColonia(colonia.clase_mo)
+        perfilador.iniciar()
+        self.perfilador = perfilador
+        colonia.perfilador = perfilador
+        return perfilador
 
     def nombre_colonia(self, id: int) -> str:
         """Obtener el nombre de la colonia."""
-        return self.colonias[(id - 1) % N_COL].nombre()
+        return self.colonias[(id - 1) % len(self.colonias)].nombre()
 
     def autor_colonia(self, id: int) -> str:
         """Obtener el nombre del autor."""
-        return self.colonias[(id - 1) % N_COL].autor()
+        return self.colonias[(id - 1) % len(self.colonias)].autor()
 
     def puede_mover(self, old: Posicion, mov: Movimiento, neu: Posicion) -> bool:
         """Verificar si el movimiento es válido."""
@@ -234,8 +511,8 @@ class Petri:
 
     def competir(self, old: Posicion, neu: Posicion) -> None:
         """Combate entre dos microorganismos."""
-        ener1 = agar.celdas[old.x][old.y].energia_mo
-        ener2 = agar.celdas[neu.x][neu.y].energia_mo
+        ener1 = self.agar.ener.item(old.x, old.y)
+        ener2 = self.agar.ener.item(neu.x, neu.y)
 
         # Si tienen la misma energía, elegir ganador al azar
         if ener2 == ener1:
@@ -250,12 +527,20 @@ class Petri:
         # Actualizar energías
         diff = abs(ener2 - ener1)
         # El ganador gana un porcentaje de la energía del perdedor
-        agar.celdas[win.x][win.y].energia_mo += 0.075 * agar.celdas[los.x][los.y].energia_mo
+        self.agar.ener[win.x, win.y] = self.agar.ener.item(win.x, win.y) + 0.075 * self.agar.ener.item(los.x, los.y)
         # El perdedor pierde la diferencia de energía
-        agar.celdas[los.x][los.y].energia_mo -= diff
+        self.agar.ener[los.x, los.y] = self.agar.ener.item(los.x, los.y) - diff
+        self.teselado.energia(win.x, win.y)
+        self.teselado.energia(los.x, los.y)
+
+        if self.instr is not None:
+            self.instr.contar(self.agar.ocup.item(win.x, win.y) - 1, 'peleas')
+            self.instr.contar(self.agar.ocup.item(los.x, los.y) - 1, 'peleas')
 
         # Si el perdedor queda con energía negativa, muere
-        if agar.celdas[los.x][los.y].energia_mo <= 0:
+        if self.agar.ener.item(los.x, los.y) <= 0:
+            if self.instr is not None:
+                self.instr.contar(self.agar.ocup.item(los.x, los.y) - 1, 'muertes')
             self.eliminar_mo(los)
 
     def mitosis(self, pos: Posicion) -> None:
@@ -268,18 +553,22 @@ class Petri:
         for dx, dy in directions:
             neu = Posicion(pos.x + dx, pos.y + dy)
             if self.esta_en_plato(neu):
-                if agar.celdas[neu.x][neu.y].id_mo == VACIO:
+                if self.agar.ocup.item(neu.x, neu.y) == VACIO:
                     place_found = True
-                    ener1 = agar.celdas[pos.x][pos.y].energia_mo
+                    ener1 = self.agar.ener.item(pos.x, pos.y)
                     ener = ener1 * 0.5 - ener1 * 0.01  # Mitad menos 1%
-                    agar.celdas[pos.x][pos.y].energia_mo = ener  # Reducir energía del progenitor
-                    self.crear_mo(neu, agar.celdas[pos.x][pos.y].id_mo, ener)
+                    self.agar.ener[pos.x, pos.y] = ener  # Reducir energía del progenitor
+                    self.teselado.energia(pos.x, pos.y)
+                    self.crear_mo(neu, self.agar.ocup.item(pos.x, pos.y), ener)
+                    if self.instr is not None:
+                        self.instr.contar(self.agar.ocup.item(pos.x, pos.y) - 1, 'nacimientos')
                     break
 
     def crear_mo(self, pos: Posicion, id: int, ener: float) -> None:
         """Crear microorganismo."""
-        agar.celdas[pos.x][pos.y].id_mo = id
-        agar.celdas[pos.x][pos.y].energia_mo = ener
+        self.agar.ocup[pos.x, pos.y] = id
+        self.agar.ener[pos.x, pos.y] = ener
+        self.teselado.nacer(pos.x, pos.y, id)
 
         # Notificar a la colonia
         if id - 1 < len(self.colonias):
@@ -287,15 +576,16 @@ class Petri:
 
     def mover_mo(self, old: Posicion, neu: Posicion) -> None:
         """Mover microorganismo."""
-        id_mo = agar.celdas[old.x][old.y].id_mo
+        id_mo = self.agar.ocup.item(old.x, old.y)
 
         # Copiar a la nueva posición
-        agar.celdas[neu.x][neu.y].id_mo = agar.celdas[old.x][old.y].id_mo
-        agar.celdas[neu.x][neu.y].energia_mo = agar.celdas[old.x][old.y].energia_mo
+        self.agar.ocup[neu.x, neu.y] = id_mo
+        self.agar.ener[neu.x, neu.y] = self.agar.ener.item(old.x, old.y)
 
         # Vaciar la posición anterior
-        agar.celdas[old.x][old.y].id_mo = VACIO
-        agar.celdas[old.x][old.y].energia_mo = 0.0
+        self.agar.ocup[old.x, old.y] = VACIO
+        self.agar.ener[old.x, old.y] = 0.0
+        self.teselado.mover(old.x, old.y, neu.x, neu.y, id_mo)
 
         # Notificar a la colonia
         if id_mo - 1 < len(self.colonias):
@@ -303,11 +593,13 @@ class Petri:
 
     def eliminar_mo(self, pos: Posicion) -> None:
         """Eliminar microorganismo."""
-        id_mo = agar.celdas[pos.x][pos.y].id_mo
+        id_mo = self.agar.ocup.item(pos.x, pos.y)
 
         # Vaciar la celda
-        agar.celdas[pos.x][pos.y].id_mo = VACIO
-        agar.celdas[pos.x][pos.y].energia_mo = 0.0
+        self.agar.ocup[pos.x, pos.y] = VACIO
+        self.agar.ener[pos.x, pos.y] = 0.0
+        if id_mo != VACIO:
+            self.teselado.morir(pos.x, pos.y, id_mo)
 
         # Notificar a la colonia
         if id_mo - 1 < len(self.colonias):
@@ -318,7 +610,14 @@ class Petri:
         id_colony = len(self.colonias) + 1
 
         if colonia_seleccionada in self.clases_microorg:
-            colony = Colonia(self.clases_microorg[colonia_seleccionada], id_colony, radio)
+            clase = self.clases_microorg[colonia_seleccionada]
+            if self._reciclables:
+                colony = self._reciclables.pop(0)
+                colony.reiniciar(clase, id_colony)
+            else:
+                colony = Colonia(clase, id_colony, radio)
+            if self.max_reciclados and colony.reserva is None:
+                colony.reserva = ReservaMOs(self.max_reciclados)
             self.colonias.append(colony)
         else:
             print(f"Advertencia: Tipo de microorganismo {colonia_seleccionada} no encontrado")
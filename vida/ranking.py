@@ -4,6 +4,7 @@
 # =====================================================================
 
 import os
+import re
 import glob
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
@@ -98,12 +99,12 @@ class RankingSystem:
                         # Expect Spanish keys only (no English compatibility)
 
                         # Convert numeric values for known numeric keys
-                        if key in ['puntos', 'col1_poblacion_final', 'col2_poblacion_final', 'duracion']:
+                        if key in ['puntos', 'duracion', 'n_colonias'] or re.fullmatch(r'col\d+_(poblacion_final|posicion)', key):
                             try:
                                 contest[key] = int(value)
                             except ValueError:
                                 contest[key] = 0
-                        elif key in ['col1_energia_final', 'col2_energia_final']:
+                        elif re.fullmatch(r'col\d+_energia_final', key):
                             try:
                                 contest[key] = float(value)
                             except ValueError:
@@ -138,40 +139,64 @@ class RankingSystem:
             'total_points': 0,
             'contests': 0,
             'avg_points': 0.0,
-            'win_rate': 0.0
+            'win_rate': 0.0,
+            'placement_score': 0.0,
+            'placement_rate': 0.0
         })
         
         for contest in self.contests:
-            col1 = contest.get('col1_nombre', 'Unknown1')
-            col2 = contest.get('col2_nombre', 'Unknown2')
+            participantes = self._participantes(contest)
             winner = contest.get('ganador', 'Empate')
             points = contest.get('puntos', 0)
-            
-            # Update contest counts
-            self.rankings[col1]['contests'] += 1
-            self.rankings[col2]['contests'] += 1
-            
-            # Update win/loss/draw counts
-            if winner == col1:
-                self.rankings[col1]['wins'] += 1
-                self.rankings[col1]['total_points'] += points
-                self.rankings[col2]['losses'] += 1
-            elif winner == col2:
-                self.rankings[col2]['wins'] += 1
-                self.rankings[col2]['total_points'] += points
-                self.rankings[col1]['losses'] += 1
-            else:
-                # Empate o sin ganador
-                self.rankings[col1]['draws'] += 1
-                self.rankings[col2]['draws'] += 1
-        
+            n = len(participantes)
+            credited = False
+
+            for colony, place in participantes:
+                # Update contest counts
+                self.rankings[colony]['contests'] += 1
+
+                # Update win/loss/draw counts
+                if winner == colony and not credited:
+                    credited = True
+                    self.rankings[colony]['wins'] += 1
+                    self.rankings[colony]['total_points'] += points
+                elif winner in (name for name, _ in participantes):
+                    self.rankings[colony]['losses'] += 1
+                else:
+                    # Empate o sin ganador
+                    self.rankings[colony]['draws'] += 1
+
+                # Placement score: fraction of opponents beaten (ties count half)
+                if n > 1:
+                    beaten = sum(1 for _, other in participantes if other > place)
+                    tied = sum(1 for _, other in participantes if other == place) - 1
+                    self.rankings[colony]['placement_score'] += (beaten + 0.5 * tied) / (n - 1)
+
         # Calculate averages and win rates
         for colony, stats in self.rankings.items():
             if stats['contests'] > 0:
                 stats['avg_points'] = stats['total_points'] / stats['contests']
                 stats['win_rate'] = (stats['wins'] / stats['contests']) * 100
+                stats['placement_rate'] = (stats['placement_score'] / stats['contests']) * 100
 
         return dict(self.rankings)
+
+    @staticmethod
+    def _participantes(contest: Dict) -> List[Tuple[str, int]]:
+        """
+        Nombre y puesto final de cada colonia de una Competencia.
+
+        Los archivos viejos no guardan `colN_posicion`: en ese caso el puesto se
+        deduce de la población final (los empates comparten puesto).
+        """
+        n = contest.get('n_colonias', 2)
+        names = [contest.get(f'col{i}_nombre', f'Unknown{i}') for i in range(1, n + 1)]
+        if all(f'col{i}_posicion' in contest for i in range(1, n + 1)):
+            places = [contest[f'col{i}_posicion'] for i in range(1, n + 1)]
+        else:
+            pops = [contest.get(f'col{i}_poblacion_final', 0) for i in range(1, n + 1)]
+            places = [1 + sum(1 for other in pops if other > pop) for pop in pops]
+        return list(zip(names, places))
     
     def generate_ranking_report(self, top_n: int = 10) -> str:
         """
@@ -188,10 +213,10 @@ class RankingSystem:
         if not rankings:
             return "No hay datos de Competencias disponibles para generar ranking."
         
-        # Sort by win rate, then by total points
+        # Sort by placement (fraction of opponents beaten), then win rate, then total points
         sorted_colonies = sorted(
             rankings.items(),
-            key=lambda x: (x[1]['win_rate'], x[1]['total_points']),
+            key=lambda x: (x[1]['placement_rate'], x[1]['win_rate'], x[1]['total_points']),
             reverse=True
         )
         
@@ -204,14 +229,14 @@ class RankingSystem:
         report.append(f"Total de colonias: {len(rankings)}")
         report.append("-" * 80)
         
-        report.append(f"{'Pos':<4} {'Colonia':<20} {'G-P-E':<8} {'%Vict':<6} {'Pts Med':<8} {'Pts Tot':<10}")
+        report.append(f"{'Pos':<4} {'Colonia':<20} {'G-P-E':<8} {'%Vict':<6} {'%Sup':<6} {'Pts Med':<8} {'Pts Tot':<10}")
         report.append("-" * 80)
         
         # Rankings
         for i, (colony, stats) in enumerate(sorted_colonies[:top_n], 1):
             wld = f"{stats['wins']}-{stats['losses']}-{stats['draws']}"
             report.append(
-                f"{i:<4} {colony:<20} {wld:<8} {stats['win_rate']:5.1f}% "
+                f"{i:<4} {colony:<20} {wld:<8} {stats['win_rate']:5.1f}% {stats['placement_rate']:5.1f}% "
                 f"{stats['avg_points']:7.1f} {stats['total_points']:>9}"
             )
         
@@ -301,13 +326,20 @@ class RankingSystem:
                 f.write(f'- enfrentamiento: "{contest_data.get("enfrentamiento", "")}"\n')
                 f.write(f'  ganador: "{contest_data.get("ganador", "")}"\n')
                 f.write(f'  puntos: {contest_data.get("puntos", 0)}\n')
-                f.write(f'  col1_nombre: "{contest_data.get("col1_nombre", "")}"\n')
-                f.write(f'  col2_nombre: "{contest_data.get("col2_nombre", "")}"\n')
-                f.write(f'  col1_poblacion_final: {contest_data.get("col1_poblacion_final", 0)}\n')
-                f.write(f'  col2_poblacion_final: {contest_data.get("col2_poblacion_final", 0)}\n')
-                f.write(f'  col1_energia_final: {contest_data.get("col1_energia_final", 0.0):.2f}\n')
-                f.write(f'  col2_energia_final: {contest_data.get("col2_energia_final", 0.0):.2f}\n')
+                n_colonias = contest_data.get("n_colonias", 2)
+                f.write(f'  n_colonias: {n_colonias}\n')
+                if "distribucion" in contest_data:
+                    f.write(f'  distribucion: {contest_data["distribucion"]}\n')
+                    f.write(f'  distribucion_nombre: "{contest_data.get("distribucion_nombre", "")}"\n')
+                    f.write(f'  distribucion_id: "{contest_data.get("distribucion_id", "")}"\n')
+                for i in range(1, n_colonias + 1):
+                    f.write(f'  col{i}_nombre: "{contest_data.get(f"col{i}_nombre", "")}"\n')
+                    f.write(f'  col{i}_poblacion_final: {contest_data.get(f"col{i}_poblacion_final", 0)}\n')
+                    f.write(f'  col{i}_energia_final: {contest_data.get(f"col{i}_energia_final", 0.0):.2f}\n')
+                    if f"col{i}_posicion" in contest_data:
+                        f.write(f'  col{i}_posicion: {contest_data[f"col{i}_posicion"]}\n')
                 f.write(f'  duracion: {contest_data.get("duracion", 0)}\n')
+                f.write(f'  terminacion: "{contest_data.get("terminacion", "")}"\n')
                 f.write(f'  timestamp: "{contest_data.get("timestamp", "")}"\n')
 
             print(f"Resultado de la competencia guardado en: {filepath}")
@@ -0,0 +1,168 @@
+# =====================================================================
+# TERMINACION: Reglas para terminar una competencia antes de tiempo
+# =====================================================================
+
+import time
+from collections import deque
+from typing import List, Optional
+
+
+class ReglaTerminacion:
+    """
+    Clase base para las reglas de terminación de una competencia.
+
+    Las reglas se evalúan una vez por paso de tiempo, después de actualizar
+    las estadísticas, con la población y la energía total de cada colonia.
+    """
+
+    nombre = "regla abstracta"
+    # Una partida terminada por la regla está decidida: cuenta para el ranking
+    decide = True
+
+    def reiniciar(self) -> None:
+        """Se llama al comenzar la competencia."""
+        pass
+
+    def evaluar(self, t: int, poblaciones: List[int], energias: List[float]) -> bool:
+        """Devuelve True si la competencia debe terminar en el paso t."""
+        return False
+
+    def limite_pasos(self) -> Optional[int]:
+        """Paso en que la regla termina seguro la competencia (None: no hay)."""
+        return None
+
+    def motivo(self) -> str:
+        """Terminación que se registra en el resultado cuando la regla se dispara."""
+        return self.nombre
+
+    def configuracion(self) -> Optional[dict]:
+        """
+        Parámetros de la regla, para el cache de resultados. None si el
+        resultado de la partida no es reproducible con esta regla (o si la
+        regla no los declara): entonces la partida no se guarda en el cache.
+        """
+        return None
+
+    def estado(self) -> Optional[dict]:
+        """Lo que la regla acumuló durante la partida, para los puntos de control (None: nada)."""
+        return None
+
+    def restaurar(self, estado: dict) -> None:
+        """Vuelve al estado guardado con estado() al reanudar una partida."""
+        pass
+
+
+class ReglaDominancia(ReglaTerminacion):
+    """
+    Termina cuando la colonia líder supera a la segunda por un factor `razon`
+    (en población o en energía) durante `pasos` pasos consecutivos.
+    """
+
+    nombre = "dominancia"
+
+    def __init__(self, razon: float, pasos: int, por_energia: bool = False):
+        self.razon = razon
+        self.pasos = pasos
+        self.por_energia = por_energia
+        self.consecutivos = 0
+
+    def reiniciar(self) -> None:
+        self.consecutivos = 0
+
+    def configuracion(self) -> Optional[dict]:
+        return {'razon': self.razon, 'pasos': self.pasos, 'por_energia': self.por_energia}
+
+    def estado(self) -> Optional[dict]:
+        return {'consecutivos': self.consecutivos}
+
+    def restaurar(self, estado: dict) -> None:
+        self.consecutivos = estado['consecutivos']
+
+    def evaluar(self, t: int, poblaciones: List[int], energias: List[float]) -> bool:
+        valores = sorted(energias if self.por_energia else poblaciones, reverse=True)
+        if len(valores) < 2 or valores[0] <= 0:
+            self.consecutivos = 0
+            return False
+        if valores[0] >= self.razon * valores[1]:
+            self.consecutivos += 1
+        else:
+            self.consecutivos = 0
+        return self.consecutivos >= self.pasos
+
+
+class ReglaEstancamiento(ReglaTerminacion):
+    """
+    Termina cuando ninguna colonia cambió su población ni su energía en más de
+    una fracción `tolerancia` durante los últimos `ventana` pasos.
+    """
+
+    nombre = "estancamiento"
+
+    def __init__(self, ventana: int, tolerancia: float = 0.01):
+        self.ventana = ventana
+        self.tolerancia = tolerancia
+        self.historia = deque(maxlen=ventana + 1)
+
+    def reiniciar(self) -> None:
+        self.historia.clear()
+
+    def configuracion(self) -> Optional[dict]:
+        return {'ventana': self.ventana, 'tolerancia': self.tolerancia}
+
+    def estado(self) -> Optional[dict]:
+        return {'historia': [list(valores) for valores in self.historia]}
+
+    def restaurar(self, estado: dict) -> None:
+        self.historia.clear()
+        self.historia.extend(estado['historia'])
+
+    def evaluar(self, t: int, poblaciones: List[int], energias: List[float]) -> bool:
+        self.historia.append(list(poblaciones) + list(energias))
+        if len(self.historia) <= self.ventana:
+            return False
+        referencia = self.historia[0]
+        for valores in self.historia:
+            for v, r in zip(valores, referencia):
+                if abs(v - r) > self.tolerancia * max(abs(r), 1.0):
+                    return False
+        return True
+
+
+class ReglaLimite(ReglaTerminacion):
+    """
+    Termina al llegar a una cantidad de pasos o de segundos de reloj. Es un
+    corte, no un resultado: la partida queda incompleta y no va al ranking.
+    """
+
+    nombre = "limite"
+    decide = False
+
+    def __init__(self, max_pasos: Optional[int] = None, max_segundos: Optional[float] = None):
+        self.max_pasos = max_pasos
+        self.max_segundos = max_segundos
+        self.inicio = time.monotonic()
+        self.disparado: Optional[str] = None  # límite que terminó la partida
+
+    def reiniciar(self) -> None:
+        self.inicio = time.monotonic()
+        self.disparado = None
+
+    def motivo(self) -> str:
+        return self.disparado or self.nombre
+
+    def limite_pasos(self) -> Optional[int]:
+        return self.max_pasos
+
+    def configuracion(self) -> Optional[dict]:
+        if self.max_segundos is not None:
+            return None  # depende del reloj
+        return {'max_pasos': self.max_pasos}
+
+    def evaluar(self, t: int, poblaciones: List[int], energias: List[float]) -> bool:
+        if self.max_pasos is not None and t >= self.max_pasos:
+            self.disparado = "limite_pasos"
+            return True
+        if self.max_segundos is not None and time.monotonic() - self.inicio >= self.max_segundos:
+            self.disparado = "limite_segundos"
+            return True
+        return False
@@ -0,0 +1,227 @@
+# =====================================================================
+# TERMINAL: Visor de la competencia en la terminal (ANSI)
+# Para mirar partidas largas por SSH en equipos sin pantalla: dibuja el
+# plato con caracteres de medio bloque (dos píxeles por carácter), las
+# colonias y una línea de población y energía de cada una. Entre cuadros
+# sólo se reescriben los caracteres que cambiaron. No usa matplotlib:
+# sólo secuencias de escape ANSI y la biblioteca estándar.
+# =====================================================================
+
+import io
+import sys
+import time
+import shutil
+import contextlib
+from typing import List, Optional, TextIO
+
+import numpy as np
+
+from .definiciones import *
+from .graficacion import Graficadora, _bloques
+from .terminacion import ReglaTerminacion
+
+# Color de 256 de cada color de COLORES
+COLORES_ANSI = {'red': 196, 'blue': 33, 'green': 40, 'orange': 208, 'purple': 129,
+                'cyan': 51, 'magenta': 201, 'brown': 130}
+
+# Fondo dentro del plato según los nutrientes (de nada a lo máximo)
+NIVELES_NUTRIENTES = (234, 58, 94, 136, 172, 214)
+
+# Color de lo que está fuera del plato (el fondo de la terminal)
+FUERA = -1
+
+# Caracteres de las líneas de población y energía
+BARRAS = '▁▂▃▄▅▆▇█'
+
+# Valores que se guardan de cada serie: al llenarse se descarta uno de cada
+# dos y se guarda la mitad de seguido, así cubren toda la competencia
+MAX_HISTORIA = 256
+
+# Líneas de título arriba del plato
+LINEAS_TITULO = 1
+
+ESC = '\x1b['
+
+
+def chispa(valores: List[float]) -> str:
+    """Línea de barras (sparkline) de los valores, escalada a su máximo"""
+    if not valores:
+        return ''
+    maximo = max(valores)
+    if maximo <= 0:
+        return BARRAS[0] * len(valores)
+    ultimo = len(BARRAS) - 1
+    return ''.join(BARRAS[int(v / maximo * ultimo + 0.5)] for v in valores)
+
+
+def _muestrear(valores: List[float], n: int) -> List[float]:
+    """A lo sumo n valores repartidos a lo largo de la serie (siempre el último)"""
+    if len(valores) <= n:
+        return valores
+    ultimo = len(valores) - 1
+    return [valores[round(k * ultimo / (n - 1))] for k in range(n)] if n > 1 else valores[-1:]
+
+
+def _color(codigo: int, fondo: bool) -> str:
+    if codigo == FUERA:
+        return '49' if fondo else '39'
+    return f"{48 if fondo else 38};5;{codigo}"
+
+
+class VisorTerminal(Graficadora):
+    """
+    Corre la competencia como el modo sin gráficos de Graficadora (mismas
+    estadísticas, reglas de terminación y resultado), pero dibujándola en
+    la terminal. Los pasos corren sin esperar al dibujo: se dibujan a lo
+    sumo `fps` cuadros por segundo.
+    """
+
+    def __init__(self, reglas: Optional[List[ReglaTerminacion]] = None, fps: float = 20.0,
+                 salida: Optional[TextIO] = None):
+        """
+        Args:
+            reglas: reglas de terminación anticipada
+            fps: cuadros por segundo como máximo
+            salida: terminal donde se dibuja (por omisión, la salida estándar)
+        """
+        super().__init__(headless=True, reglas=reglas)
+        self.fps = fps
+        self.salida = salida
+        self.cuadros = 0
+        self.escritos = 0  # caracteres del plato reescritos (para medir el dibujo incremental)
+        self._anterior: Optional[np.ndarray] = None  # colores de cada carácter del cuadro anterior
+        self._tamano = None
+        self._bloque = 1
+        self._dentro: Optional[np.ndarray] = None
+        self._max_nutri = 0.0
+        self._historia: List[List[float]] = []  # población y energía de cada colonia
+        self._cada = 1  # pasos entre valores guardados de la historia
+
+    def ejecutar_headless(self) -> None:
+        """Bucle de la competencia, dibujando en la terminal en lugar de imprimir cada 100 pasos."""
+        salida = self.salida or sys.stdout
+        self.salida = salida
+        self.iniciado = True
+        self.iniciar_reglas()
+        n_col = len(self.nombres)
+        self._historia = [[] for _ in range(2 * n_col)]
+        self._cada = 1
+        # Lo que imprimen el motor y los MOs se guarda para mostrarlo al final
+        mensajes = io.StringIO()
+        salida.write(f"{ESC}?1049h{ESC}?25l{ESC}2J")  # pantalla alternativa, sin cursor
+        try:
+            intervalo = 1.0 / self.fps if self.fps else 0.0
+            ultimo = 0.0
+            inicio, t_inicio = time.perf_counter(), self.t
+            max_iteraciones = self.max_iteraciones()
+            with contextlib.redirect_stdout(mensajes):
+                while not self.fin_competencia and self.t < max_iteraciones:
+                    self.petri.mover_colonias()
+                    self.t += 1
+                    self.actualizar_estadisticas()
+                    self._registrar()
+                    ahora = time.perf_counter()
+                    if ahora - ultimo >= intervalo:
+                        self.dibujar((self.t - t_inicio) / max(ahora - inicio, 1e-9))
+                        ultimo = ahora
+                self.dibujar((self.t - t_inicio) / max(time.perf_counter() - inicio, 1e-9))
+        finally:
+            salida.write(f"{ESC}0m{ESC}?25h{ESC}?1049l")
+            salida.flush()
+        for linea in mensajes.getvalue().strip().splitlines()[-5:]:
+            print(linea)
+        if self.fin_competencia:
+            print(f"Simulación completada después de {self.t} pasos de tiempo ({self.terminacion})")
+        else:
+            self.terminacion = "max_iteraciones"
+            print(f"Simulación terminada en max_iteraciones ({max_iteraciones}) - Competencia incompleta")
+
+    def _registrar(self) -> None:
+        if self.t % self._cada:
+            return
+        for serie, valor in zip(self._historia, self.vivos + self.energias):
+            serie.append(valor)
+        if len(self._historia[0]) >= MAX_HISTORIA:
+            for serie in self._historia:
+                del serie[1::2]
+            self._cada *= 2
+
+    # -----------------------------------------------------------------
+    # Dibujo
+    # -----------------------------------------------------------------
+    def _preparar(self, columnas: int, filas: int) -> None:
+        """Elige el tamaño de los bloques del plato para la terminal y borra la pantalla."""
+        N, M, r = self.petri.max_x, self.petri.max_y, self.petri.radio
+        alto = max(filas - LINEAS_TITULO - len(self.nombres) - 1, 2) * 2  # píxeles (medio carácter)
+        self._bloque = max(1, -(-N // columnas), -(-M // alto))
+        i, j = np.ogrid[0:N, 0:M]
+        self._dentro = (r - i) * (r - i) + (r - j) * (r - j) < r * r
+        self._anterior = None
+        self._tamano = (columnas, filas)
+        self.salida.write(f"{ESC}0m{ESC}2J")
+
+    def colores(self) -> np.ndarray:
+        """Color de 256 de cada píxel del plato [x, y] (FUERA: fuera del plato)"""
+        agar = self.petri.agar
+        bloque = self._bloque
+        n_col = len(self.nombres)
+        conteos = np.stack([_bloques(agar.ocup == c + 1, bloque) for c in range(n_col)])
+        ocupados = conteos.sum(axis=0)
+        paleta = np.array([COLORES_ANSI.get(COLORES[c % len(COLORES)], 15) for c in range(n_col)])
+        colonia = paleta[conteos.argmax(axis=0)]
+
+        nutri = _bloques(agar.nutrientes_alineados(), bloque)
+        if self._max_nutri <= 0:
+            self._max_nutri = max(float(nutri.max()), 1e-12)  # escala fija: cambian menos caracteres
+        niveles = np.array(NIVELES_NUTRIENTES)
+        nivel = np.clip((nutri / self._max_nutri * len(niveles)).astype(int), 0, len(niveles) - 1)
+
+        dentro = _bloques(self._dentro, bloque) > 0
+        return np.where(ocupados > 0, colonia, np.where(dentro, niveles[nivel], FUERA))
+
+    def dibujar(self, pasos_por_segundo: float = 0.0) -> None:
+        """Dibuja un cuadro: sólo los caracteres del plato que cambiaron, el título y las colonias."""
+        columnas, filas = shutil.get_terminal_size((80, 24))
+        if (columnas, filas) != self._tamano:
+            self._preparar(columnas, filas)
+        # Píxeles en pantalla: x en las columnas, y hacia arriba; dos filas por carácter
+        pixeles = self.colores().T[::-1]
+        if pixeles.shape[0] % 2:
+            pixeles = np.vstack([np.full((1, pixeles.shape[1]), FUERA), pixeles])
+        arriba, abajo = pixeles[0::2], pixeles[1::2]
+        caracteres = (arriba + 1) * 257 + (abajo + 1)
+
+        titulo = (f"Vida artificial  t={self.t}  {pasos_por_segundo:.0f} pasos/s  "
+                  f"bloques de {self._bloque}x{self._bloque}  (Ctrl-C para salir)")
+        partes = [f"{ESC}1;1H{ESC}0m{ESC}2K{titulo[:columnas]}"]
+        cambios = (np.ones(caracteres.shape, dtype=bool) if self._anterior is None
+                   else caracteres != self._anterior)
+        filas_c, columnas_c = np.nonzero(cambios)
+        sgr = None
+        siguiente = None  # posición donde queda el cursor después del último carácter
+        for f, c in zip(filas_c.tolist(), columnas_c.tolist()):
+            if (f, c) != siguiente:
+                partes.append(f"{ESC}{f + 1 + LINEAS_TITULO};{c + 1}H")
+            codigo = (int(arriba[f, c]), int(abajo[f, c]))
+            if codigo != sgr:
+                partes.append(f"{ESC}{_color(codigo[0], False)};{_color(codigo[1], True)}m")
+                sgr = codigo
+            partes.append('▀' if codigo[0] != FUERA else ' ')
+            siguiente = (f, c + 1)
+        self.escritos += len(filas_c)
+        self._anterior = caracteres
+
+        # Una línea por colonia: población y energía, con sus últimos valores
+        fila = LINEAS_TITULO + caracteres.shape[0] + 1
+        n_col = len(self.nombres)
+        ancho = max((columnas - 48) // 2, 4)
+        for c, nombre in enumerate(self.nombres):
+            color = COLORES_ANSI.get(COLORES[c % len(COLORES)], 15)
+            poblacion = _muestrear(self._historia[c], ancho)
+            energia = _muestrear(self._historia[n_col + c], ancho)
+            partes.append(f"{ESC}{fila + c};1H{ESC}0m{ESC}2K{ESC}38;5;{color}m■ {nombre[:16]:<16}{ESC}0m"
+                          f" {self.vivos[c]:>6} {ESC}38;5;{color}m{chispa(poblacion):<{ancho}}{ESC}0m"
+                          f" {self.energias[c]:>10.0f} {ESC}38;5;{color}m{chispa(energia)}{ESC}0m")
+        self.salida.write(''.join(partes))
+        self.salida.flush()
+        self.cuadros += 1
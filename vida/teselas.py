@@ -0,0 +1,169 @@
+# =====================================================================
+# TESELAS: Índice espacial por teselas para platos grandes
+# =====================================================================
+
+from typing import List, Set, Tuple
+import numpy as np
+
+# Lado (en celdas) de cada tesela cuadrada
+LADO_TESELA = 16
+
+
+class Teselado:
+    """
+    Divide el agar en teselas de LADO_TESELA x LADO_TESELA celdas y lleva,
+    para cada tesela, cuántos MOs de cada colonia contiene y cuántos
+    nutrientes tiene. Así el motor y las estadísticas sólo recorren las
+    teselas con MOs vivos o con nutrientes que cambiaron.
+
+    Petri avisa cada nacimiento, muerte, movimiento y consumo de nutrientes.
+    Las teselas modificadas quedan marcadas como sucias hasta que alguien
+    (la graficación, por ejemplo) las pide con tomar_sucias().
+    """
+
+    def __init__(self, max_x: int, max_y: int, n_col: int, lado: int = LADO_TESELA):
+        self.lado = lado
+        self.max_x = max_x
+        self.max_y = max_y
+        self.n_tx = -(-max_x // lado)
+        self.n_ty = -(-max_y // lado)
+        # conteo[c, tx, ty]: MOs de la colonia c en la tesela (la fila 0 no se usa)
+        self.conteo = np.zeros((n_col + 1, self.n_tx, self.n_ty), dtype=np.int32)
+        # poblacion[tx, ty]: MOs de todas las colonias en la tesela
+        self.poblacion = np.zeros((self.n_tx, self.n_ty), dtype=np.int32)
+        # Suma de nutrientes de cada tesela (coordenadas de la matriz de nutrientes)
+        self.nutri_tesela = np.zeros((self.n_tx, self.n_ty))
+        self.sucias_mo: Set[Tuple[int, int]] = set()
+        self.sucias_nutri: Set[Tuple[int, int]] = set()
+        self._nutri_pendientes: Set[Tuple[int, int]] = set()
+
+    def reiniciar(self, n_col: int) -> None:
+        """Vacía el índice para una partida nueva (reserva memoria sólo si cambia n_col)"""
+        if self.conteo.shape[0] == n_col + 1:
+            self.conteo.fill(0)
+        else:
+            self.conteo = np.zeros((n_col + 1, self.n_tx, self.n_ty), dtype=np.int32)
+        self.poblacion.fill(0)
+        self.nutri_tesela.fill(0.0)
+        self.sucias_mo.clear()
+        self.sucias_nutri.clear()
+        self._nutri_pendientes.clear()
+
+    def reconstruir(self, n_col: int, ocup: np.ndarray, nutri: np.ndarray) -> None:
+        """Rehace el índice desde las matrices del agar (al restaurar una partida)"""
+        self.reiniciar(n_col)
+        xs, ys = np.nonzero(ocup)
+        np.add.at(self.conteo, (ocup[xs, ys], xs // self.lado, ys // self.lado), 1)
+        self.conteo[1:].sum(axis=0, out=self.poblacion)
+        self.marcar(xs, ys)
+        self.recalcular_nutrientes(nutri)
+
+    def limites(self, tx: int, ty: int) -> Tuple[int, int, int, int]:
+        """Rango de celdas [x0, x1) x [y0, y1) de una tesela"""
+        x0, y0 = tx * self.lado, ty * self.lado
+        return x0, min(x0 + self.lado, self.max_x), y0, min(y0 + self.lado, self.max_y)
+
+    # -----------------------------------------------------------------
+    # Avisos del motor
+    # -----------------------------------------------------------------
+    def nacer(self, x: int, y: int, id_mo: int) -> None:
+        t = (x // self.lado, y // self.lado)
+        self.conteo[id_mo, t[0], t[1]] += 1
+        self.poblacion[t] += 1
+        self.sucias_mo.add(t)
+
+    def morir(self, x: int, y: int, id_mo: int) -> None:
+        t = (x // self.lado, y // self.lado)
+        self.conteo[id_mo, t[0], t[1]] -= 1
+        self.poblacion[t] -= 1
+        self.sucias_mo.add(t)
+
+    def mover(self, x0: int, y0: int, x1: int, y1: int, id_mo: int) -> None:
+        t0 = (x0 // self.lado, y0 // self.lado)
+        t1 = (x1 // self.lado, y1 // self.lado)
+        if t0 != t1:
+            self.conteo[id_mo, t0[0], t0[1]] -= 1
+            self.poblacion[t0] -= 1
+            self.conteo[id_mo, t1[0], t1[1]] += 1
+            self.poblacion[t1] += 1
+            self.sucias_mo.add(t1)
+        self.sucias_mo.add(t0)
+
+    def energia(self, x: int, y: int) -> None:
+        """Cambió la energía de un MO (comió, peleó o se dividió)"""
+        self.sucias_mo.add((x // self.lado, y // self.lado))
+
+    def comer(self, x: int, y: int) -> None:
+        """Cambiaron los nutrientes de la celda x,y de la matriz de nutrientes"""
+        t = (x // self.lado, y // self.lado)
+        self._nutri_pendientes.add(t)
+        self.sucias_nutri.add(t)
+
+    def marcar(self, xs: np.ndarray, ys: np.ndarray, nutrientes: bool = False) -> None:
+        """Marca como sucias las teselas de muchas celdas a la vez (vectorizado)"""
+        teselas = set(zip((xs // self.lado).tolist(), (ys // self.lado).tolist()))
+        if nutrientes:
+            self._nutri_pendientes |= teselas
+            self.sucias_nutri |= teselas
+        else:
+            self.sucias_mo |= teselas
+
+    # -----------------------------------------------------------------
+    # Consultas
+    # -----------------------------------------------------------------
+    def ocupadas(self) -> List[Tuple[int, int]]:
+        """Teselas que contienen al menos un MO vivo"""
+        txs, tys = np.nonzero(self.poblacion)
+        return list(zip(txs.tolist(), tys.tolist()))
+
+    def vivos(self, ocup: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Posiciones (xs, ys) de los MOs vivos, recorriendo sólo las teselas
+        ocupadas. Quedan ordenadas por x y luego por y, igual que un
+        recorrido completo de la grilla.
+        """
+        partes_x, partes_y = [], []
+        for tx, ty in self.ocupadas():
+            x0, x1, y0, y1 = self.limites(tx, ty)
+            xs, ys = np.nonzero(ocup[x0:x1, y0:y1])
+            partes_x.append(xs + x0)
+            partes_y.append(ys + y0)
+        if not partes_x:
+            vacio = np.zeros(0, dtype=np.intp)
+            return vacio, vacio
+        xs = np.concatenate(partes_x)
+        ys = np.concatenate(partes_y)
+        orden = np.argsort(xs * self.max_y + ys, kind='stable')
+        return xs[orden], ys[orden]
+
+    def vivos_por_colonia(self) -> List[int]:
+        """Cantidad de MOs vivos de cada colonia (índice 0 = colonia 1)"""
+        return self.conteo[1:].sum(axis=(1, 2)).tolist()
+
+    def energia_por_colonia(self, ocup: np.ndarray, ener: np.ndarray) -> List[float]:
+        """Energía total de cada colonia (índice 0 = colonia 1)"""
+        xs, ys = self.vivos(ocup)
+        n_col = self.conteo.shape[0] - 1
+        suma = np.bincount(ocup[xs, ys], weights=ener[xs, ys], minlength=n_col + 1)
+        return suma[1:n_col + 1].tolist()
+
+    def total_nutrientes(self, nutri: np.ndarray) -> float:
+        """Nutrientes de todo el agar, recalculando sólo las teselas que cambiaron"""
+        for tx, ty in self._nutri_pendientes:
+            x0, x1, y0, y1 = self.limites(tx, ty)
+            self.nutri_tesela[tx, ty] = nutri[x0:x1, y0:y1].sum()
+        self._nutri_pendientes.clear()
+        return float(self.nutri_tesela.sum())
+
+    def recalcular_nutrientes(self, nutri: np.ndarray) -> None:
+        """Marca todas las teselas para recalcular sus nutrientes"""
+        self._nutri_pendientes = {(tx, ty) for tx in range(self.n_tx) for ty in range(self.n_ty)}
+        self.sucias_nutri |= self._nutri_pendientes
+        self.total_nutrientes(nutri)
+
+    def tomar_sucias(self) -> Tuple[Set[Tuple[int, int]], Set[Tuple[int, int]]]:
+        """Devuelve y limpia las teselas sucias (de MOs y de nutrientes)"""
+        sucias = (self.sucias_mo, self.sucias_nutri)
+        self.sucias_mo = set()
+        self.sucias_nutri = set()
+        return sucias
@@ -0,0 +1,221 @@
+# =====================================================================
+# TORNEO: Planificador adaptativo de enfrentamientos
+# Juega por lotes y deja de programar las parejas cuyo resultado ya está
+# estadísticamente definido, gastando el resto del presupuesto en las
+# parejas parejas.
+# =====================================================================
+
+import math
+import zlib
+from itertools import combinations
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple, Type
+
+from .definiciones import *
+from .microorganismo import Microorganismo
+from .lote import CorredorLote
+from .ranking import RankingSystem
+from .terminacion import ReglaTerminacion
+from .dinamica import DinamicaNutrientes
+from .cache_resultados import CacheResultados
+
+
+class EstadoPareja:
+    """
+    Resultados acumulados de una pareja de microorganismos (a, b).
+
+    Un empate cuenta como media victoria para cada uno.
+    """
+
+    def __init__(self, a: int, b: int):
+        self.a: int = a
+        self.b: int = b
+        self.victorias_a: int = 0
+        self.victorias_b: int = 0
+        self.empates: int = 0
+
+    def partidas(self) -> int:
+        return self.victorias_a + self.victorias_b + self.empates
+
+    def proporcion(self) -> float:
+        """Estimación de la probabilidad de que gane `a`."""
+        n = self.partidas()
+        if n == 0:
+            return 0.5
+        return (self.victorias_a + 0.5 * self.empates) / n
+
+    def intervalo(self, z: float) -> Tuple[float, float]:
+        """Intervalo de confianza de Wilson para la probabilidad de que gane `a`."""
+        n = self.partidas()
+        if n == 0:
+            return 0.0, 1.0
+        p = self.proporcion()
+        den = 1 + z * z / n
+        centro = (p + z * z / (2 * n)) / den
+        radio = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / den
+        return max(0.0, centro - radio), min(1.0, centro + radio)
+
+    def decidida(self, z: float, min_partidas: int) -> bool:
+        """True si el intervalo de confianza ya no contiene 0.5."""
+        if self.partidas() < min_partidas:
+            return False
+        inf, sup = self.intervalo(z)
+        return inf > 0.5 or sup < 0.5
+
+    def incertidumbre(self, z: float) -> float:
+        """
+        Distancia de 0.5 a la estimación, medida en semi-anchos del intervalo.
+        Cuanto más chica, más pareja es la pareja.
+        """
+        inf, sup = self.intervalo(z)
+        semi = max((sup - inf) / 2, 1e-9)
+        return abs(self.proporcion() - 0.5) / semi
+
+
+class PlanificadorTorneo:
+    """
+    Planificador de una liga todos contra todos que juega por lotes.
+
+    Cada pareja se juega al menos `min_partidas` veces; después sólo siguen
+    en carrera las parejas cuyo intervalo de confianza todavía contiene 0.5,
+    y el presupuesto restante se reparte empezando por las más parejas.
+
+    La semilla de cada partida depende sólo de la semilla base, de la pareja
+    y del número de partida de la pareja, así con un cache de resultados una
+    liga repetida sólo simula las parejas cuyo código cambió.
+    """
+
+    def __init__(self, clases_mo: Dict[int, Type[Microorganismo]], participantes: List[int],
+                 distribuciones: List[int], presupuesto: int, lote: int = 4,
+                 confianza: float = 0.95, min_partidas: int = 4,
+                 max_partidas: Optional[int] = None, semilla: int = 0,
+                 ranking: Optional[RankingSystem] = None,
+                 reglas: Optional[List[ReglaTerminacion]] = None,
+                 dinamicas: Optional[List[DinamicaNutrientes]] = None,
+                 cache: Optional[CacheResultados] = None):
+        """
+        Args:
+            clases_mo: clases de microorganismos disponibles (por índice)
+            participantes: índices de los microorganismos que juegan la liga
+            distribuciones: distribuciones de nutrientes que se van alternando
+            presupuesto: cantidad máxima de partidas en toda la liga
+            lote: partidas que se juegan de una vez para cada pareja elegida
+            confianza: nivel de confianza del intervalo de cada pareja
+            min_partidas: partidas mínimas antes de dar por decidida una pareja
+            max_partidas: tope de partidas por pareja (None: sin tope)
+            semilla: semilla base de las partidas
+            ranking: sistema de ranking donde se guardan los resultados
+            reglas: reglas de terminación anticipada de cada partida
+            dinamicas: dinámicas de los nutrientes de cada partida
+            cache: cache de resultados de partidas ya jugadas (None: siempre se simula)
+
+        Raises:
+            ValueError: si la confianza no está entre 0 y 1 (sin incluirlos)
+        """
+        if not 0 < confianza < 1:
+            raise ValueError(f"la confianza debe estar entre 0 y 1 (sin incluirlos): {confianza}")
+        self.clases_mo = clases_mo
+        self.distribuciones = distribuciones
+        self.presupuesto = presupuesto
+        self.lote = max(1, lote)
+        self.z = NormalDist().inv_cdf(0.5 + confianza / 2)
+        self.min_partidas = min_partidas
+        self.max_partidas = max_partidas
+        self.semilla = semilla
+        self.ranking = ranking
+        self.reglas = reglas
+        self.jugadas = 0
+        # Todas las partidas se juegan sobre el mismo plato, que se reinicia
+        self.corredor = CorredorLote(clases_mo, reglas=reglas, dinamicas=dinamicas, cache=cache)
+        self.parejas: List[EstadoPareja] = [EstadoPareja(a, b) for a, b in combinations(participantes, 2)]
+
+    def activas(self) -> List[EstadoPareja]:
+        """Parejas que todavía necesitan partidas, de la más pareja a la menos."""
+        activas = [p for p in self.parejas
+                   if not p.decidida(self.z, self.min_partidas)
+                   and (self.max_partidas is None or p.partidas() < self.max_partidas)]
+        # Primero las que no llegaron al mínimo, después las más inciertas
+        activas.sort(key=lambda p: (p.partidas() >= self.min_partidas, p.incertidumbre(self.z)))
+        return activas
+
+    def semilla_partida(self, pareja: EstadoPareja, n: int) -> int:
+        """Semilla de la partida n de una pareja (no depende del orden de la liga)."""
+        a, b = self.clases_mo[pareja.a], self.clases_mo[pareja.b]
+        texto = f'{self.semilla}:{a.__module__}.{a.__qualname__}:{b.__module__}.{b.__qualname__}:{n}'
+        return zlib.crc32(texto.encode())
+
+    def jugar(self, pareja: EstadoPareja) -> dict:
+        """Juega una partida headless de la pareja y devuelve el resultado de la competencia."""
+        n = pareja.partidas()
+        dist = self.distribuciones[n % len(self.distribuciones)]
+        # Se alternan los lados para no favorecer a ninguna colonia
+        colonias = [pareja.a, pareja.b] if n % 2 == 0 else [pareja.b, pareja.a]
+        semilla = self.semilla_partida(pareja, n)
+
+        resultado = self.corredor.jugar(dist, colonias, semilla)
+        self.jugadas += 1
+
+        # Una partida cortada por un límite no tiene ganador: cuenta como empate
+        ganador = resultado.get('ganador') if resultado.get('completada', False) else None
+        if ganador == resultado.get('col1_nombre') and ganador != resultado.get('col2_nombre'):
+            ganador_id = colonias[0]
+        elif ganador == resultado.get('col2_nombre') and ganador != resultado.get('col1_nombre'):
+            ganador_id = colonias[1]
+        else:
+            ganador_id = None
+
+        if ganador_id == pareja.a:
+            pareja.victorias_a += 1
+        elif ganador_id == pareja.b:
+            pareja.victorias_b += 1
+        else:
+            pareja.empates += 1
+
+        if self.ranking is not None and resultado.get('completada', False):
+            self.ranking.guardar_resultado_competencia(resultado)
+        return resultado
+
+    def ejecutar(self) -> List[EstadoPareja]:
+        """Juega la liga hasta agotar el presupuesto o decidir todas las parejas."""
+        # Importar matplotlib en modo sin gráficos antes de usar Graficadora
+        import matplotlib
+        matplotlib.use('Agg')
+
+        while self.jugadas < self.presupuesto:
+            activas = self.activas()
+            if not activas:
+                break
+            for pareja in activas:
+                for _ in range(self.lote):
+                    if self.jugadas >= self.presupuesto:
+                        break
+                    self.jugar(pareja)
+                if pareja.decidida(self.z, self.min_partidas) or self.jugadas >= self.presupuesto:
+                    # Se recalculan prioridades con la nueva información
+                    break
+            print(f"  Partidas jugadas: {self.jugadas}/{self.presupuesto}, "
+                  f"parejas sin decidir: {len(self.activas())}")
+
+        if self.ranking is not None:
+            self.ranking.generar_ranking_diario()
+        return self.parejas
+
+    def informe(self) -> str:
+        """Resumen de la liga: estimación e intervalo de cada pareja."""
+        nombres = {i: cls().nombre() for i, cls in self.clases_mo.items()}
+        lineas = ["=" * 80,
+                  "TORNEO ADAPTATIVO",
+                  "=" * 80,
+                  f"{'Pareja':<40} {'Part':>5} {'P(a)':>6} {'Intervalo':>15} {'Estado':>10}",
+                  "-" * 80]
+        for p in self.parejas:
+            inf, sup = p.intervalo(self.z)
+            estado = "decidida" if p.decidida(self.z, self.min_partidas) else "abierta"
+            pareja = f"{nombres.get(p.a, p.a)} vs {nombres.get(p.b, p.b)}"
+            lineas.append(f"{pareja:<40} {p.partidas():>5} {p.proporcion():6.2f} "
+                          f"  [{inf:.2f}, {sup:.2f}] {estado:>10}")
+        lineas.append("-" * 80)
+        lineas.append(f"Partidas jugadas: {self.jugadas} (presupuesto {self.presupuesto}), "
+                      f"{self.corredor.reutilizadas} tomadas del cache")
+        lineas.append("=" * 80)
+        return "\n".join(lineas)